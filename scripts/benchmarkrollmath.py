@@ -0,0 +1,56 @@
+"""Compare the speed of roll arithmetic with sizebot.lib.mathexpr against numexpr (if it's installed)"""
+import random
+import timeit
+
+try:
+    import numexpr
+except ImportError:
+    numexpr = None
+
+from sizebot.lib import mathexpr
+
+templates = [
+    "_roll0",
+    "_roll0+5",
+    "(_roll0+_roll1)*2-3",
+    "_roll0+_roll1+_roll2+_roll3/2",
+    "sqrt(_roll0)*10+_roll1**2"
+]
+NUMBER = 10000
+
+
+def randomValues(template):
+    return [random.randint(1, 20) for _ in range(template.count("_roll"))]
+
+
+def fillTemplate(template, values):
+    for i, v in enumerate(values):
+        template = template.replace(f"_roll{i}", str(v))
+    return template
+
+
+def benchMathexpr(template):
+    names = tuple(f"_roll{i}" for i in range(template.count("_roll")))
+    values = randomValues(template)
+    return timeit.timeit(lambda: int(mathexpr.evaluate(template, names, values)), number = NUMBER)
+
+
+def benchNumexpr(template):
+    # The old roller built a new expression string for every roll, so numexpr's own cache rarely helped
+    expressions = iter([fillTemplate(template, randomValues(template)) for _ in range(NUMBER)])
+    return timeit.timeit(lambda: int(numexpr.evaluate(next(expressions), local_dict={}, global_dict={})), number = NUMBER)
+
+
+def main():
+    if numexpr is None:
+        print("numexpr isn't installed, only timing mathexpr.")
+    print(f"{'expression':<32} {'mathexpr':>12} {'numexpr':>12}")
+    for template in templates:
+        mathtime = benchMathexpr(template) / NUMBER * 1e6
+        numtime = benchNumexpr(template) / NUMBER * 1e6 if numexpr is not None else None
+        numstr = f"{numtime:10.2f}us" if numtime is not None else f"{'-':>12}"
+        print(f"{template:<32} {mathtime:10.2f}us {numstr}")
+
+
+if __name__ == "__main__":
+    main()
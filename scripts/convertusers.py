@@ -0,0 +1,47 @@
+"""Convert user files between formats
+
+    python -m scripts.convertusers binary           Save a binary copy of every user that only has a JSON file
+    python -m scripts.convertusers restore          Save every user that has a binary file back as JSON
+    python -m scripts.convertusers json OUTPUTDIR   Export every user as JSON, into OUTPUTDIR/guildid/userid.json
+
+The JSON files are kept when converting to binary, so "restore" only needs to be run to keep changes made since.
+"""
+import sys
+from pathlib import Path
+
+from sizebot import conf
+from sizebot.lib import userdb
+
+
+def convert(binary):
+    conf.binaryusers = binary
+    users = [(guildid, userid) for guildid, userid in userdb.listUsers()
+             if userdb.getUserPath(guildid, userid).exists() != binary]
+    print(f"Found {len(users)} users to convert")
+    for guildid, userid in users:
+        userdb.save(userdb.load(guildid, userid))
+    print(f"Converted {len(users)} users")
+
+
+def toJSON(outputdir):
+    users = userdb.listUsers()
+    for guildid, userid in users:
+        path = outputdir / str(guildid) / f"{userid}.json"
+        path.parent.mkdir(parents = True, exist_ok = True)
+        path.write_text(userdb.exportJSON(guildid, userid), encoding = "utf-8")
+    print(f"Exported {len(users)} users to {outputdir}")
+
+
+def main():
+    if len(sys.argv) == 2 and sys.argv[1] == "binary":
+        convert(binary = True)
+    elif len(sys.argv) == 2 and sys.argv[1] == "restore":
+        convert(binary = False)
+    elif len(sys.argv) == 3 and sys.argv[1] == "json":
+        toJSON(Path(sys.argv[2]))
+    else:
+        print(__doc__)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+"""Fuzz sizebot.lib.sizetag.parseSizeTag against the old sizetag regex, and compare their speed on nasty nicknames"""
+import random
+import sys
+import timeit
+
+from sizebot.lib.sizetag import parseSizeTag, re_sizetag
+
+numbers = ["1", "23", "456", "7890", "1,000", "12,34", ",", ".5", ".", "½", "⅝", "e5", "E-3", "e+", "e", "E", "0", "∞"]
+units = ["m", "km", "ft", "in", "mi", "Yuni", "kuni", "µm", "µ", "'", '"', "nuggets", "E", "e", "", "Mm"]
+names = ["Name", "[Name]", "", "a [1m,", "x [2m] y", "D̶̨i͏̢͟g͞i̴͡"]
+openings = [" [", "[", " \n[", "  ["]
+species = ["", ", Species", ",", ", ", ",\n x", ", a]b", " ", "\n", ", S̴pè͠cį͏e͘͜s̸̵̨"]
+closings = ["]", "]\n", "]]", ""]
+
+nasty = {
+    "spaces": " " * 4000 + "[1m" + " " * 4000 + "]",
+    "commas": "Name [" + "111," * 2000 + "1]x]",
+    "digits": "Name [" + "1" * 10000 + "m1" * 5 + "]!]",
+    "brackets": " [1m" * 2000 + "]x",
+    "species": "Name [1m, " + "a" * 10000 + "\n]"
+}
+
+
+def randomNick(rng):
+    size = "".join(rng.choice(numbers) + rng.choice(units) for _ in range(rng.randint(1, 3)))
+    return rng.choice(names) + rng.choice(openings) + size + rng.choice(species) + rng.choice(closings)
+
+
+def fuzz(count, seed = 0):
+    rng = random.Random(seed)
+    matches = 0
+    mismatches = []
+    for _ in range(count):
+        nick = randomNick(rng)
+        expected = re_sizetag.search(nick) is not None
+        matches += expected
+        if (parseSizeTag(nick) is not None) != expected:
+            mismatches.append(nick)
+    return matches, mismatches
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    matches, mismatches = fuzz(count)
+    print(f"{count} nicknames, {matches} with sizetags, {len(mismatches)} mismatches")
+    for nick in mismatches[:20]:
+        print(f"    {nick!r}")
+
+    for name, nick in nasty.items():
+        regextime = timeit.timeit(lambda: re_sizetag.search(nick), number = 3) / 3
+        parsertime = timeit.timeit(lambda: parseSizeTag(nick), number = 3) / 3
+        print(f"{name:10} regex: {regextime * 1000:8.3f}ms  parser: {parsertime * 1000:8.3f}ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -5,6 +5,9 @@ import discord
 
 from sizebot.discordplus import commands
 
+from sizebot.lib import converters
+from sizebot.lib.scheduler import scheduler
+
 logger = logging.getLogger("sizebot")
 
 
@@ -34,6 +37,29 @@ class AdminCog(commands.Cog):
         new_message.content = ctx.prefix + command
         await self.bot.process_commands(new_message)
 
+    @commands.command(
+        hidden = True
+    )
+    @commands.is_owner()
+    async def jobs(self, ctx):
+        """List scheduled jobs."""
+        lateness = scheduler.lateness
+        summary = scheduler.formatSummary() or "No jobs scheduled."
+        await ctx.send(
+            f"**{scheduler.depth}** jobs scheduled. "
+            f"Lateness: {lateness.mean * 1000:.1f}ms mean, {lateness.max * 1000:.1f}ms max over {lateness.count} runs.\n"
+            f"```\n{summary[:1800]}\n```"
+        )
+
+    @commands.command(
+        hidden = True
+    )
+    @commands.is_owner()
+    async def convtimes(self, ctx):
+        """Show how long argument conversions have taken."""
+        summary = converters.formatTimings() or "No arguments converted yet."
+        await ctx.send(f"```\n{summary}\n```")
+
 
 def setup(bot):
     bot.add_cog(AdminCog(bot))
@@ -1,10 +1,10 @@
 import logging
 import random
 
-from discord.ext import tasks
 from sizebot.discordplus import commands
 
 from sizebot.lib import changes, proportions, userdb
+from sizebot.lib.scheduler import scheduler
 from sizebot.lib.units import Rate
 
 logger = logging.getLogger("sizebot")
@@ -14,10 +14,15 @@ class ChangeCog(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
         changes.loadFromFile()
-        self.changeTask.start()
+        scheduler.register("change", self.onChangeTick)
 
     def cog_unload(self):
-        self.changeTask.cancel()
+        scheduler.unregister("change")
+
+    async def onChangeTick(self, job):
+        """Slow growth task"""
+        userid, guildid = job.key
+        return await changes.apply(self.bot, userid, guildid)
 
     @commands.command(
         usage = "<x,-,/,+> <amount>",
@@ -138,11 +143,6 @@ class ChangeCog(commands.Cog):
             f"They shrunk {randmult}x and are now {userdata.height:m} tall. ({userdata.height:u})")
         logger.info(f"User {ctx.author.id} ({ctx.author.display_name}) drank a potion and shrunk {randmult}.")
 
-    @tasks.loop(seconds=6)
-    async def changeTask(self):
-        """Slow growth task"""
-        await changes.apply(self.bot)
-
 
 def setup(bot):
     bot.add_cog(ChangeCog(bot))
@@ -1,16 +1,15 @@
 import re
-import requests
 
 from sizebot.discordplus import commands, Embed
 
 from sizebot import __version__
 from sizebot import conf
-from sizebot.lib.constants import emojis
+from sizebot.lib import colors
 
 
 re_hex = re.compile(r"#?((?:[0-9A-Fa-f]{3}){1,2})")
 re_digits = re.compile(r"\d+")
-re_percent = re.compile(r"\d+%?")
+re_percent = re.compile(r"(\d+)%?")
 re_dividers = re.compile(r"[\s,]+")
 coloricon = "https://cdn.discordapp.com/attachments/650460192009617433/676205298674958366/spinning-beachball-of-death-mac.png"
 
@@ -28,9 +27,6 @@ class ColorCog(commands.Cog):
     )
     async def color(self, ctx, arg1: str, *, arg2: str = None):
         """Get info about a color."""
-        outmessage = await ctx.send(emojis.loading)
-
-        url = "http://thecolorapi.com"
         schemeurl = "https://www.thecolorapi.com/scheme?hex={0}&format=html"
 
         # Default to hex.
@@ -41,76 +37,73 @@ class ColorCog(commands.Cog):
             colortype = arg1.lower()
             colorvalue = arg2
 
-        colorvalues = re_dividers.split(colorvalue)
+        colorvalues = re_dividers.split(colorvalue.strip())
 
-        # Make the color value we're putting into the URL be formatted in a way it likes,
-        # and also catch any malformed arguments.
+        # Convert the color to RGB, and catch any malformed arguments.
         if colortype == "hex":
             # HEX
-            match_hex = re_hex.match(colorvalue)
+            match_hex = re_hex.fullmatch(colorvalue.strip())
             if not match_hex:
-                await outmessage.edit(content = f"`{colorvalue}` is not an accepted hex color.")
+                await ctx.send(f"`{colorvalue}` is not an accepted hex color.")
                 return
-            colorvalueout = match_hex.group(1)
+            rgb = colors.hexToRGB(match_hex.group(1))
         elif colortype == "rgb":
             # RGB
             if len(colorvalues) != 3:
-                await outmessage.edit(content = f"A {colortype} color can only have 3 parts.")
+                await ctx.send(f"A {colortype} color can only have 3 parts.")
                 return
             for value in colorvalues:
-                if not re_digits.match(value):
-                    await outmessage.edit(content = f"{value} is not a valid color part for a {colortype}-type color.")
+                if not re_digits.fullmatch(value):
+                    await ctx.send(f"{value} is not a valid color part for a {colortype}-type color.")
                     return
-            colorvalueout = ",".join(colorvalues)
+            rgb = tuple(min(int(v), 255) for v in colorvalues)
         elif colortype in ["hsl", "hsv"]:
             # HSL/HSV
             if len(colorvalues) != 3:
-                await outmessage.edit(content = f"A {colortype} color can only have 3 parts.")
+                await ctx.send(f"A {colortype} color can only have 3 parts.")
                 return
-            if not re_digits.match(colorvalues[0]):
-                await outmessage.edit(content = f"{value} is not a valid color part for a {colortype}-type color.")
+            if not re_digits.fullmatch(colorvalues[0]):
+                await ctx.send(f"{colorvalues[0]} is not a valid color part for a {colortype}-type color.")
                 return
             for value in colorvalues[1:]:
-                if not re_percent.match(value):
-                    await outmessage.edit(content = f"{value} is not a valid color part for a {colortype}-type color.")
+                if not re_percent.fullmatch(value):
+                    await ctx.send(f"{value} is not a valid color part for a {colortype}-type color.")
                     return
-            colorvalueout = ",".join(colorvalues)
+            h, s, lv = (int(re_digits.match(v).group()) for v in colorvalues)
+            if colortype == "hsl":
+                rgb = colors.hslToRGB(h, s, lv)
+            else:
+                rgb = colors.hsvToRGB(h, s, lv)
         elif colortype in ["cmyk", "cymk"]:
             # CMYK
             colortype = "cmyk"
             if len(colorvalues) != 4:
-                await outmessage.edit(content = f"A {colortype} color can only have between 3 and 4 parts.")
+                await ctx.send(f"A {colortype} color can only have 4 parts.")
                 return
             for value in colorvalues:
-                if not re_percent.match(value):
-                    await outmessage.edit(content = f"{value} is not a valid color part for a {colortype}-type color.")
+                if not re_percent.fullmatch(value):
+                    await ctx.send(f"{value} is not a valid color part for a {colortype}-type color.")
                     return
-            colorvalueout = ",".join(colorvalues)
+            rgb = colors.cmykToRGB(*(int(re_digits.match(v).group()) for v in colorvalues))
         else:
             # Invalid color type
-            await outmessage.edit(content = f"`{colortype}` is not an accepted color type.\nAccepted types are hex, rgb, hsv, hsl, or cymk.")
+            await ctx.send(f"`{colortype}` is not an accepted color type.\nAccepted types are hex, rgb, hsv, hsl, or cymk.")
             return
 
-        r = requests.get(url + "/id?" + colortype + "=" + colorvalueout)
-        colorjson = r.json()
-
-        if r.status_code != 200:
-            await outmessage.edit(emojis.warning + "The Color API is not working as expected. Please try again later.")
-
-        hexstring = colorjson["hex"]["clean"]
+        hexstring = colors.rgbToHex(rgb)
         hexvalue = int(hexstring, 16)
         colorscheme = schemeurl.format(hexstring)
-        colorname = colorjson["name"]["value"]
-        printhex = colorjson["hex"]["value"]
-        colorrgb = colorjson["rgb"]["value"]
-        colorhsl = colorjson["hsl"]["value"]
-        colorhsv = colorjson["hsv"]["value"]
-        colorcmyk = colorjson["cmyk"]["value"]
+        colorname = colors.getColorName(rgb)
+        printhex = f"#{hexstring}"
+        colorrgb = "rgb({}, {}, {})".format(*rgb)
+        colorhsl = "hsl({}, {}%, {}%)".format(*colors.rgbToHSL(rgb))
+        colorhsv = "hsv({}, {}%, {}%)".format(*colors.rgbToHSV(rgb))
+        colorcmyk = "cmyk({}, {}, {}, {})".format(*colors.rgbToCMYK(rgb))
 
         embed = Embed(title=f"{colorname} [{printhex}]",
-                              description="",
-                              color=hexvalue,
-                              url=colorscheme)
+                      description="",
+                      color=hexvalue,
+                      url=colorscheme)
         embed.set_author(name=f"SizeBot {__version__} [{conf.prefix}color]", icon_url=coloricon)
         embed.add_field(name="Hex Value", value = printhex, inline = True)
         embed.add_field(name="RGB Value", value = colorrgb, inline = True)
@@ -121,7 +114,7 @@ class ColorCog(commands.Cog):
 
         embed.set_image(url = f"http://www.singlecolorimage.com/get/{hexstring}/400x200.png")
 
-        await outmessage.edit(content = "", embed = embed)
+        await ctx.send(embed = embed)
 
 
 def setup(bot):
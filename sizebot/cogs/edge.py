@@ -10,7 +10,7 @@ import discord
 
 from sizebot import conf
 from sizebot.discordplus import commands
-from sizebot.lib import proportions
+from sizebot.lib import persistence, proportions
 from sizebot.lib import userdb
 from sizebot.lib.checks import is_mod
 from sizebot.lib.decimal import Decimal
@@ -19,42 +19,74 @@ from sizebot.lib.units import SV
 logger = logging.getLogger("sizebot")
 
 
-# Read the edges file.
-def getEdgesFile(gid):
+class EdgeConfig:
+    """A guild's smallest and largest users"""
+
+    def __init__(self, smallest = None, largest = None):
+        self.smallest = smallest
+        self.largest = largest
+
+    def __contains__(self, uid):
+        return uid is not None and (uid == self.smallest or uid == self.largest)
+
+    def toJSON(self):
+        # toml can't store None, so unset edges are left out
+        return {k: v for k, v in [("smallest", self.smallest), ("largest", self.largest)] if v is not None}
+
+    @classmethod
+    def fromJSON(cls, jsondata):
+        return EdgeConfig(jsondata.get("smallest"), jsondata.get("largest"))
+
+
+# guild id -> EdgeConfig, loaded from the guild's edges file the first time it's needed
+_edges = {}
+
+
+def getEdgesDocument(gid):
     edgepath = conf.guilddbpath / str(gid) / "edges.ini"
+    return persistence.document(edgepath, dict, loads = toml.loads, dumps = toml.dumps)
+
+
+def getEdges(gid):
+    edges = _edges.get(gid)
+    if edges is None:
+        edges = _edges[gid] = EdgeConfig.fromJSON(getEdgesDocument(gid).get())
+    return edges
+
+
+def setEdges(gid, **kwargs):
+    """Update a guild's edge users, and save them in the background"""
+    edges = getEdges(gid)
+    for k, v in kwargs.items():
+        setattr(edges, k, v)
+    getEdgesDocument(gid).set(edges.toJSON())
 
-    try:
-        with open(edgepath, "r") as f:
-            edgedict = toml.loads(f.read())
-    except (FileNotFoundError, TypeError, toml.TomlDecodeError):
-        edgedict = {"edges": {"smallest": None, "largest": None}}
-        edgepath.parent.mkdir(parents = True, exist_ok = True)
-        with open(edgepath, "w") as f:
-            f.write(toml.dumps(edgedict))
 
-    return edgedict
+def isEdgeUser(gid, uid):
+    return uid in getEdges(gid)
 
 
-def getUserSizes(g):
+async def getUserSizes(g):
     # Find the largest and smallest current users.
     # TODO: Check to see if these users are recently active, which would determine if they count towards the check.
     smallestuser = 000000000000000000
-    smallestsize = SV(SV.infinity)
+    smallestsize = SV.intern(SV.infinity)
     largestuser = 000000000000000000
-    largestsize = SV(0)
+    largestsize = SV.intern(0)
     allusers = {}
-    for _, testid in userdb.listUsers(g.id):
-        if testid in list([m.id for m in g.members if str(m.status) != "offline"]):
-            testdata = userdb.load(g.id, testid)
-            allusers[testid] = testdata.height
-            if testdata.height <= 0 or testdata.height >= SV.infinity:
-                break
-            if testdata.height > largestsize:
-                largestuser = testid
-                largestsize = testdata.height
-            if testdata.height < smallestsize:
-                smallestuser = testid
-                smallestsize = testdata.height
+    online = {m.id for m in g.members if str(m.status) != "offline"}
+    userids = [testid for _, testid in userdb.listUsers(g.id) if testid in online]
+    async for testdata in userdb.loadMany(g.id, userids):
+        testid = testdata.id
+        allusers[testid] = testdata.height
+        if testdata.height <= 0 or testdata.height >= SV.infinity:
+            continue
+        if testdata.height > largestsize:
+            largestuser = testid
+            largestsize = testdata.height
+        if testdata.height < smallestsize:
+            smallestuser = testid
+            smallestsize = testdata.height
 
     smallestuser = int(smallestuser)
     largestuser = int(largestuser)
@@ -69,34 +101,32 @@ async def on_message(m):
     if not isinstance(m.author, discord.Member):
         return
 
-    edgedict = getEdgesFile(m.guild.id)
-    sm = edgedict.get("smallest", None)
-    lg = edgedict.get("largest", None)
-    if m.author.id != sm and m.author.id != lg:
+    edges = getEdges(m.guild.id)
+    if m.author.id not in edges:
         return  # The user is not set to be the smallest or the largest user.
 
     userdata = userdb.load(m.guild.id, m.author.id)
 
-    usersizes = getUserSizes(m.guild)
+    usersizes = await getUserSizes(m.guild)
     smallestuser = usersizes["smallest"]["id"]
     smallestsize = usersizes["smallest"]["size"]
     largestuser = usersizes["largest"]["id"]
     largestsize = usersizes["largest"]["size"]
 
-    if edgedict.get("smallest", None) == m.author.id:
+    if edges.smallest == m.author.id:
         if m.author.id == smallestuser:
             return
-        elif userdata.height == SV(0):
+        elif userdata.height == SV.intern(0):
             return
         else:
             userdata.height = smallestsize * Decimal(0.9)
             userdb.save(userdata)
             logger.info(f"User {m.author.id} ({m.author.display_name}) is now {userdata.height:m} tall, so that they stay the smallest.")
 
-    if edgedict.get("largest", None) == m.author.id:
+    if edges.largest == m.author.id:
         if m.author.id == largestuser:
             return
-        elif userdata.height == SV(SV.infinity):
+        elif userdata.height == SV.intern(SV.infinity):
             return
         else:
             userdata.height = largestsize * Decimal(1.1)
@@ -118,8 +148,8 @@ class EdgeCog(commands.Cog):
     )
     async def edges(self, ctx):
         """See who is set to be the smallest and largest users."""
-        edgedict = getEdgesFile(ctx.guild.id)
-        await ctx.send(f"**SERVER-SET SMALLEST AND LARGEST USERS:**\nSmallest: {edgedict.get('smallest', '*Unset*')}\nLargest: {edgedict.get('largest', '*Unset*')}")
+        edges = getEdges(ctx.guild.id)
+        await ctx.send(f"**SERVER-SET SMALLEST AND LARGEST USERS:**\nSmallest: {edges.smallest or '*Unset*'}\nLargest: {edges.largest or '*Unset*'}")
 
     @commands.command(
         aliases = ["smallest"],
@@ -130,10 +160,7 @@ class EdgeCog(commands.Cog):
     @is_mod()
     async def setsmallest(self, ctx, *, member: discord.Member):
         """Set the smallest user."""
-        edgedict = getEdgesFile(ctx.guild.id)
-        edgedict["smallest"] = member.id
-        with open(conf.edgepath, "w") as f:
-            f.write(toml.dumps(edgedict))
+        setEdges(ctx.guild.id, smallest = member.id)
         await ctx.send(f"<@{member.id}> is now the smallest user. They will be automatically adjusted to be the smallest user until they are removed from this role.")
         logger.info(f"{member.name} ({member.id}) is now the smallest user.")
 
@@ -146,10 +173,7 @@ class EdgeCog(commands.Cog):
     @is_mod()
     async def setlargest(self, ctx, *, member: discord.Member):
         """Set the largest user."""
-        edgedict = getEdgesFile(ctx.guild.id)
-        edgedict["largest"] = member.id
-        with open(conf.edgepath, "w") as f:
-            f.write(toml.dumps(edgedict))
+        setEdges(ctx.guild.id, largest = member.id)
         await ctx.send(f"<@{member.id}> is now the largest user. They will be automatically adjusted to be the largest user until they are removed from this role.")
         logger.info(f"{member.name} ({member.id}) is now the largest user.")
 
@@ -161,10 +185,7 @@ class EdgeCog(commands.Cog):
     @is_mod()
     async def clearsmallest(self, ctx):
         """Clear the role of 'smallest user.'"""
-        edgedict = getEdgesFile(ctx.guild.id)
-        edgedict["smallest"] = None
-        with open(conf.edgepath, "w") as f:
-            f.write(toml.dumps(edgedict))
+        setEdges(ctx.guild.id, smallest = None)
         await ctx.send("Smallest user unset.")
         logger.info("Smallest user unset.")
 
@@ -176,10 +197,7 @@ class EdgeCog(commands.Cog):
     @is_mod()
     async def clearlargest(self, ctx):
         """Clear the role of 'largest user.'"""
-        edgedict = getEdgesFile(ctx.guild.id)
-        edgedict["largest"] = None
-        with open(conf.edgepath, "w") as f:
-            f.write(toml.dumps(edgedict))
+        setEdges(ctx.guild.id, largest = None)
         await ctx.send("Largest user unset.")
         logger.info("Largest user unset.")
 
@@ -190,10 +208,10 @@ class EdgeCog(commands.Cog):
     @is_mod()
     async def edgedebug(self, ctx):
         userdata = userdb.load(ctx.guild.id, ctx.author.id)
-        usersizes = getUserSizes(ctx.guild)
-        edgedict = getEdgesFile(ctx.guild.id)
-        sm = edgedict.get("smallest", None)
-        lg = edgedict.get("largest", None)
+        usersizes = await getUserSizes(ctx.guild)
+        edges = getEdges(ctx.guild.id)
+        sm = edges.smallest
+        lg = edges.largest
 
         outstring = f"**CURRENT USER:**\nID: `{ctx.author.id}`\nHeight: `{userdata.height}`\n\n"
         outstring += f"**EDGES:**\nSmallest: {sm}\nLargest: {lg}\n\n"
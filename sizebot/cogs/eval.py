@@ -1,3 +1,4 @@
+import asyncio
 import logging
 
 import discord
@@ -5,15 +6,27 @@ from sizebot.discordplus import commands, Embed
 
 from sizebot.lib import utils
 from sizebot.lib.constants import emojis
-from sizebot.lib.eval import runEval
+from sizebot.lib.eval import runEval, ThreadedEval
 
 
 logger = logging.getLogger("sizebot")
 
+# How often to update the streamed output of a threaded eval (in seconds)
+OUTPUT_INTERVAL = 2
+# How long to wait past the time limit for an eval that's stuck in a call that can't be interrupted
+ABANDON_GRACE = 10
+
+
+def formatOutput(output):
+    """Format the end of an eval's output to fit in a message"""
+    output = output.replace("```", r"\`\`\`")[-1900:]
+    return f"```\n{output}\n```"
+
 
 class EvalCog(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
+        self.threadedeval = None
 
     @commands.command(
         hidden = True
@@ -68,6 +81,73 @@ class EvalCog(commands.Cog):
                 logger.error("eval error:\n" + utils.formatTraceback(err))
                 await ctx.author.send(emojis.warning + f" ` {utils.formatError(err)} `")
 
+    @commands.command(
+        aliases = ["threadeval"],
+        hidden = True
+    )
+    @commands.is_owner()
+    async def teval(self, ctx, *, evalStr):
+        """Evaluate a Python expression in a worker thread, with time and memory limits.
+
+        print() output is shown as it happens. Use `await onloop(coro)` to run coroutines on the bot's loop, e.g. `await onloop(ctx.send("hi"))`.
+        Memory is tracked with tracemalloc, which traces every allocation in the bot, so the whole bot runs slower until the eval ends."""
+        if self.threadedeval is not None and self.threadedeval.running:
+            await ctx.send(emojis.warning + " An eval is already running. Use `stopeval` to cancel it.")
+            return
+
+        evalStr = utils.removeCodeBlock(evalStr)
+
+        logger.info(f"{ctx.author.display_name} tried to eval {evalStr!r} in a thread.")
+
+        threadedeval = ThreadedEval(ctx, evalStr)
+        self.threadedeval = threadedeval
+        outputMsg = await ctx.send(emojis.loading)
+        shownOutput = ""
+        abandonTime = self.bot.loop.time() + threadedeval.timeout + ABANDON_GRACE
+        try:
+            future = threadedeval.start()
+            # Stream the output until the eval is done
+            while True:
+                done, _ = await asyncio.wait([future], timeout = OUTPUT_INTERVAL)
+                output = threadedeval.output.getvalue()
+                if output and output != shownOutput:
+                    shownOutput = output
+                    await outputMsg.edit(content = formatOutput(output))
+                if done:
+                    break
+                if self.bot.loop.time() > abandonTime:
+                    threadedeval.abandon()
+                    await ctx.send(emojis.warning + " Eval is stuck past its time limit, so I've stopped waiting for it. It'll stop when it gets back to the eval's own code.")
+                    return
+            result = future.result()
+        except Exception as err:
+            logger.error("eval error:\n" + utils.formatTraceback(err))
+            await ctx.send(emojis.warning + f" ` {utils.formatError(err)} `")
+            return
+        finally:
+            if not shownOutput:
+                await outputMsg.delete(delay = 0)
+
+        await ctx.send(f"Finished in {threadedeval.elapsed:.3f} seconds, using {threadedeval.peakmemory / 1024:,.1f} KiB of memory.")
+        if isinstance(result, Embed):
+            await ctx.send(embed=result)
+        else:
+            strResult = str(result).replace("```", r"\`\`\`")
+            for m in utils.chunkMsg(strResult):
+                await ctx.send(m)
+
+    @commands.command(
+        hidden = True
+    )
+    @commands.is_owner()
+    async def stopeval(self, ctx):
+        """Cancel the running threaded eval."""
+        if self.threadedeval is None or not self.threadedeval.running:
+            await ctx.send("No eval is running.")
+            return
+        self.threadedeval.cancel()
+        await ctx.send("Cancelling eval.")
+
 
 def setup(bot):
     bot.add_cog(EvalCog(bot))
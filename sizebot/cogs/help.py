@@ -1,5 +1,4 @@
 import logging
-import math
 
 from datetime import datetime
 
@@ -9,7 +8,7 @@ from sizebot import __version__
 from sizebot import conf
 from sizebot.lib import objs, userdb, utils
 from sizebot.lib.constants import emojis, ids
-from sizebot.lib.menu import Menu
+from sizebot.lib.menu import Menu, PagedMenu
 from sizebot.lib.units import SV, WV
 
 
@@ -32,31 +31,111 @@ logger = logging.getLogger("sizebot")
 #     If True, the default help command does not show this in the help output.
 # aliases = []
 
+# How many names go in each column of a list page, and how many columns there are
+COLUMN_LENGTH = 15
+COLUMNS = 3
+
+
+def buildListPages(title, sections):
+    """Build embeds listing names in columns, a few columns per page
+
+    sections: a list of (heading, names) tuples. Each section starts on a new page."""
+    pages = []
+    for heading, names in sections:
+        columns = list(utils.chunkList(names, COLUMN_LENGTH))
+        for pagecolumns in utils.chunkList(columns, COLUMNS):
+            page = Embed(title=title)
+            for n, column in enumerate(pagecolumns):
+                page.add_field(name=heading if n == 0 else "\u200b", value="\n".join(column))
+            pages.append(page)
+    for n, page in enumerate(pages, 1):
+        page.set_footer(text=f"Page {n}/{len(pages)}")
+    return pages
+
+
+def buildUnitsPages():
+    heightobjectunits = [su.unit for su in SV._systems["o"]._systemunits]
+    weightobjectunits = [su.unit for su in WV._systems["o"]._systemunits]
+
+    heightunits = [str(u) for u in sorted(SV._units) if u not in heightobjectunits]
+    weightunits = [str(u) for u in sorted(WV._units) if u not in weightobjectunits]
+
+    return buildListPages(f"Units [SizeBot {__version__}]", [("Height", heightunits), ("Weight", weightunits)])
+
+
+def buildObjsPages():
+    objectunits = []
+    for obj in objs.objects:
+        objectunits += obj.singularNames
+
+    objectunits.sort()
+
+    return buildListPages(f"Objects [SizeBot {__version__}]", [("Objects", objectunits)])
+
+
+def buildCategoryPages(bot):
+    """Build the summary help embed, and the detailed embed for each category"""
+    # Get all non-hidden commands, sorted by name
+    commands = (c for c in bot.commands if not c.hidden)
+    commands = sorted(commands, key=lambda c: c.name)
+
+    # Divide commands into categories
+    commands_by_cat = {cat.cid: [] for cat in categories}
+
+    for c in commands:
+        cmd_category = c.category or "misc"
+        if cmd_category not in commands_by_cat:
+            logger.warn(f"Command category {cmd_category!r} does not exist.")
+            cmd_category = "misc"
+        commands_by_cat[cmd_category].append(c)
+
+    summary = Embed(title=f"Help [SizeBot {__version__}]")
+    summary.description = "*Select an emoji to see details about a category.*"
+
+    fields_text = ""
+    deepembeds = {}
+
+    for cat in categories:
+        cat_cmds = commands_by_cat.get(cat.cid, [])
+        if not cat_cmds:
+            logger.warn(f"Command category {cat.cid!r} is empty.")
+            continue
+        fields_text += f"\n\n**{cat.emoji} {cat.name}**\n" + (", ".join(f"`{c.name}`" for c in cat_cmds))
+
+        deepembed = Embed(title=f"{cat.name} Help [SizeBot {__version__}]")
+        deepembed.add_field(value=f"**{cat.emoji}{cat.name}**\n\n" + ("\n".join(f"`{c.name}` {c.alias_string}\n{c.short_doc}" for c in cat_cmds)))
+        deepembeds[cat.emoji] = deepembed
+
+    summary.add_field(value=fields_text)
+
+    return summary, deepembeds
+
 
 class HelpCog(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
+        # Prebuilt embeds, rebuilt when the units or commands change
+        self.unitsPages = None
+        self.objsPages = None
+        self.categoryPages = None
+
+    @commands.Cog.listener()
+    async def on_units_loaded(self):
+        self.unitsPages = buildUnitsPages()
+        self.objsPages = buildObjsPages()
+
+    @commands.Cog.listener()
+    async def on_commands_changed(self):
+        self.categoryPages = None
 
     @commands.command(
         category = "help"
     )
     async def units(self, ctx):
         """Get a list of the various units SizeBot accepts."""
-        heightobjectunits = [su.unit for su in SV._systems["o"]._systemunits]
-        weightobjectunits = [su.unit for su in WV._systems["o"]._systemunits]
-
-        heightunits = [str(u) for u in sorted(SV._units) if u not in heightobjectunits]
-        weightunits = [str(u) for u in sorted(WV._units) if u not in weightobjectunits]
-
-        embed = Embed(title=f"Units [SizeBot {__version__}]")
-
-        for n, units in enumerate(utils.chunkList(heightunits, math.ceil(len(heightunits) / 3))):
-            embed.add_field(name="Height" if n == 0 else "\u200b", value="\n".join(units))
-
-        for n, units in enumerate(utils.chunkList(weightunits, math.ceil(len(weightunits) / 3))):
-            embed.add_field(name="Weight" if n == 0 else "\u200b", value="\n".join(units))
-
-        await ctx.send(embed=embed)
+        if self.unitsPages is None:
+            self.unitsPages = buildUnitsPages()
+        await PagedMenu.display(ctx, self.unitsPages)
 
     @commands.command(
         aliases = ["objects"],
@@ -64,18 +143,9 @@ class HelpCog(commands.Cog):
     )
     async def objs(self, ctx):
         """Get a list of the various objects SizeBot accepts."""
-        objectunits = []
-        for obj in objs.objects:
-            objectunits += obj.singularNames
-
-        objectunits.sort()
-
-        embed = Embed(title=f"Objects [SizeBot {__version__}]")
-
-        for n, units in enumerate(utils.chunkList(objectunits, math.ceil(len(objectunits) / 3))):
-            embed.add_field(name="Objects" if n == 0 else "\u200b", value="\n".join(units))
-
-        await ctx.send(embed=embed)
+        if self.objsPages is None:
+            self.objsPages = buildObjsPages()
+        await PagedMenu.display(ctx, self.objsPages)
 
     async def send_summary_help(self, ctx):
         """Sends help summary.
@@ -89,47 +159,19 @@ class HelpCog(commands.Cog):
         ...
         """
 
-        embed = Embed(title=f"Help [SizeBot {__version__}]")
-        embed.description = "*Select an emoji to see details about a category.*"
-        embed.set_author(name = ctx.author.name, icon_url = ctx.author.avatar_url)
-
-        # Get all non-hidden commands, sorted by name
-        commands = (c for c in ctx.bot.commands if not c.hidden)
-        commands = sorted(commands, key=lambda c: c.name)
-
-        # Divide commands into categories
-        commands_by_cat = {cat.cid: [] for cat in categories}
+        if self.categoryPages is None:
+            self.categoryPages = buildCategoryPages(ctx.bot)
+        summary, deepembeds = self.categoryPages
 
-        for c in commands:
-            cmd_category = c.category or "misc"
-            if cmd_category not in commands_by_cat:
-                logger.warn(f"Command category {cmd_category!r} does not exist.")
-                cmd_category = "misc"
-            commands_by_cat[cmd_category].append(c)
-
-        fields_text = ""
-
-        for cat in categories:
-            cat_cmds = commands_by_cat.get(cat.cid, [])
-            if not cat_cmds:
-                logger.warn(f"Command category {cat.cid!r} is empty.")
-                continue
-            fields_text += f"\n\n**{cat.emoji} {cat.name}**\n" + (", ".join(f"`{c.name}`" for c in cat_cmds))
-
-        embed.add_field(value=fields_text)
-
-        categoryoptions = {cat.emoji: cat for cat in categories}
+        embed = Embed.from_dict(summary.to_dict())
+        embed.set_author(name = ctx.author.name, icon_url = ctx.author.avatar_url)
 
-        reactionmenu, answer = await Menu.display(ctx, categoryoptions.keys(), cancel_emoji = emojis.cancel,
+        reactionmenu, answer = await Menu.display(ctx, deepembeds.keys(), cancel_emoji = emojis.cancel,
                                                   initial_embed = embed, delete_after = False)
 
-        if answer in categoryoptions.keys():
-            selectedcategory = categoryoptions[answer]
-            deepembed = Embed(title=f"{selectedcategory.name} Help [SizeBot {__version__}]")
+        if answer in deepembeds:
+            deepembed = Embed.from_dict(deepembeds[answer].to_dict())
             deepembed.set_author(name = ctx.author.name, icon_url = ctx.author.avatar_url)
-            cat_cmds = commands_by_cat.get(selectedcategory.cid, [])
-            fields_text = f"**{selectedcategory.emoji}{selectedcategory.name}**\n\n" + ("\n".join(f"`{c.name}` {c.alias_string}\n{c.short_doc}" for c in cat_cmds))
-            deepembed.add_field(value=fields_text)
             await reactionmenu.message.edit(embed = deepembed)
 
     async def send_command_help(self, ctx, cmd):
@@ -2,10 +2,10 @@ import logging
 from datetime import datetime, time, timedelta
 
 import discord
-from discord.ext import commands, tasks
-from discord.utils import sleep_until
+from discord.ext import commands
 
 from sizebot import conf
+from sizebot.lib.scheduler import scheduler
 from sizebot.lib.utils import intToRoman, formatTraceback
 
 logger = logging.getLogger("sizebot")
@@ -16,19 +16,20 @@ class HolidayCog(commands.Cog):
 
     def __init__(self, bot):
         self.bot = bot
-        self.holidayTask.start()
+        scheduler.register("holiday", self.holidayTask)
+        # Check right away (the scheduler only starts once the bot is ready), and then every midnight
+        scheduler.schedule("holiday", None, datetime.now().timestamp())
 
     def cog_unload(self):
-        self.holidayTask.cancel()
+        scheduler.unregister("holiday")
+        scheduler.cancel("holiday", None)
 
-    @tasks.loop(seconds=60)
-    async def holidayTask(self):
+    async def holidayTask(self, job):
         """Holiday checker"""
+        now = datetime.now()
         try:
             logger.info("Checking for holidays")
 
-            now = datetime.now()
-
             # Holiday checks.
             newnick = conf.name
             newactivityname = conf.activity
@@ -64,17 +65,13 @@ class HolidayCog(commands.Cog):
                 logger.info(f"Updating bot activity to \"{newactivityname}\".")
                 newactivity = discord.Game(name = newactivityname)
                 await self.bot.change_presence(activity = newactivity)
-
-            midnight = datetime.combine(now, time(hour = 0, minute = 0, second = 0))
-            next_midnight = midnight + timedelta(days = 1)
-            await sleep_until(next_midnight)
-
         except Exception as err:
             logger.error(formatTraceback(err))
 
-    @holidayTask.before_loop
-    async def before_holidayTask(self):
-        await self.bot.wait_until_ready()
+        # Check again at midnight
+        midnight = datetime.combine(now, time(hour = 0, minute = 0, second = 0))
+        next_midnight = midnight + timedelta(days = 1)
+        return next_midnight.timestamp()
 
 
 def setup(bot):
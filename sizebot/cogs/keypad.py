@@ -2,6 +2,7 @@ import asyncio
 
 from sizebot.discordplus import commands
 
+from sizebot.lib import reactions
 from sizebot.lib.constants import emojis
 
 inputdict = {
@@ -33,32 +34,22 @@ class KeypadCog(commands.Cog):
 
         outputmsg = await ctx.send(defaultmessage)
 
-        def check(reaction, reacter):
-            return reaction.message.id == outputmsg.id \
-                and reacter.id == author.id \
-                and (str(reaction.emoji) in inputdict.keys()
-                     or str(reaction.emoji) == emojis.cancel)
-
-        for emoji in inputdict.keys():
-            await outputmsg.add_reaction(emoji)
-        await outputmsg.add_reaction(emojis.cancel)
-
-        listening = True
-
-        while listening:
-            try:
-                reaction, user = await self.bot.wait_for("reaction_add", timeout=60.0, check=check)
-            except asyncio.TimeoutError:
-                # User took too long to respond
-                listening = False
-                break
-
-            if str(reaction.emoji) in inputdict.keys():
-                await outputmsg.edit(content = outputmsg.content + inputdict[str(reaction.emoji)])
-                await reaction.remove(user)
-            if str(reaction.emoji) == emojis.cancel:
-                await outputmsg.edit(content = defaultmessage)
-                await reaction.remove(user)
+        options = list(inputdict.keys()) + [emojis.cancel]
+
+        async with reactions.listen(outputmsg, options, user=author, timeout=60.0) as waiter:
+            while True:
+                try:
+                    reaction, user = await waiter.get()
+                except asyncio.TimeoutError:
+                    # User took too long to respond
+                    break
+
+                if str(reaction.emoji) in inputdict.keys():
+                    await outputmsg.edit(content = outputmsg.content + inputdict[str(reaction.emoji)])
+                    await reaction.remove(user)
+                if str(reaction.emoji) == emojis.cancel:
+                    await outputmsg.edit(content = defaultmessage)
+                    await reaction.remove(user)
 
         await outputmsg.clear_reactions()
 
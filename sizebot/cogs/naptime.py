@@ -1,9 +1,9 @@
 import logging
 
-from discord.ext import tasks
 from sizebot.discordplus import commands
 
 from sizebot.lib import naps
+from sizebot.lib.scheduler import scheduler
 from sizebot.lib.units import TV
 
 logger = logging.getLogger("sizebot")
@@ -14,10 +14,14 @@ class NaptimeCog(commands.Cog):
 
     def __init__(self, bot):
         self.bot = bot
-        self.nannyTask.start()
+        naps.loadFromFile()
+        scheduler.register("nap", self.onNaptime)
 
     def cog_unload(self):
-        self.nannyTask.cancel()
+        scheduler.unregister("nap")
+
+    async def onNaptime(self, job):
+        await naps.wake(self.bot, job.key)
 
     @commands.command(
         aliases = ["chloroform"],
@@ -43,7 +47,7 @@ class NaptimeCog(commands.Cog):
         """
         logger.info(f"{ctx.author.display_name} wants to cancel bedtime.")
 
-        nanny = naps.stop(ctx.author.id)
+        nanny = naps.stop(ctx.author.id, ctx.guild.id)
         if nanny is not None:
             await ctx.send("Naptime has been cancelled.")
 
@@ -66,11 +70,6 @@ class NaptimeCog(commands.Cog):
         await ctx.author.send("**WAITING NANNIES**\n" + nannyDump)
         logger.info(f"User {ctx.author.id} ({ctx.author.display_name}) dumped the waiting nannies.")
 
-    @tasks.loop(seconds=60)
-    async def nannyTask(self):
-        """Nanny task"""
-        await naps.check(self.bot)
-
 
 def setup(bot):
     bot.add_cog(NaptimeCog(bot))
@@ -1,12 +1,11 @@
 import asyncio
 import logging
-from shutil import copyfile
 
 from discord.utils import get
 from sizebot.discordplus import commands
 
 from sizebot import conf
-from sizebot.lib import errors, proportions, userdb
+from sizebot.lib import errors, proportions, reactions, userdb
 from sizebot.lib.constants import ids, emojis
 from sizebot.lib.units import SV, WV
 
@@ -68,30 +67,22 @@ class RegisterCog(commands.Cog):
             logger.warn(f"User already registered on user registration: {ctx.author}.")
             return
 
-        currentusers = userdb.listUsers()
-        guildsregisteredin = [self.bot.get_guild(int(g)).name for g, u in currentusers if u == ctx.author.id]
+        guilds = (self.bot.get_guild(g) for g in userdb.listGuilds(ctx.author.id))
+        guildsregisteredin = [g.name for g in guilds if g is not None]
         if guildsregisteredin != []:
-            guildsstring = guildsregisteredin.join('\n')
-            sentMsg = await ctx.send(f"You are already registed with SizeBot in these servers:\n{guildsstring}"
+            guildsstring = "\n".join(guildsregisteredin)
+            sentMsg = await ctx.send(f"You are already registed with SizeBot in these servers:\n{guildsstring}\n"
                                      f"You can copy a profile from one of these guilds to this one using `{conf.prefix}copy.`\n"
                                      "Proceed with registration anyway?")
-            await sentMsg.add_reaction(emojis.check)
-            await sentMsg.add_reaction(emojis.cancel)
 
             # Wait for requesting user to react to sent message with emojis.check or emojis.cancel
-            def check(reaction, reacter):
-                return reaction.message.id == sentMsg.id \
-                    and reacter.id == ctx.author.id \
-                    and (
-                        str(reaction.emoji) == emojis.check
-                        or str(reaction.emoji) == emojis.cancel
-                    )
-
-            try:
-                reaction, ctx.author = await self.bot.wait_for("reaction_add", timeout=60.0, check=check)
-            except asyncio.TimeoutError:
-                # User took too long to respond
-                await sentMsg.delete()
+            async with reactions.listen(sentMsg, [emojis.check, emojis.cancel], user=ctx.author, timeout=60.0) as waiter:
+                try:
+                    reaction, reacter = await waiter.get()
+                except asyncio.TimeoutError:
+                    # User took too long to respond
+                    await sentMsg.delete()
+                    return
 
             # if the reaction isn't the right one, stop.
             if reaction.emoji != emojis.check:
@@ -171,26 +162,17 @@ class RegisterCog(commands.Cog):
         # Send a confirmation request
         # TODO: Replace this with a Menu.
         sentMsg = await ctx.send(f"To unregister, react with {emojis.check}.")
-        await sentMsg.add_reaction(emojis.check)
-        await sentMsg.add_reaction(emojis.cancel)
 
         # Wait for requesting user to react to sent message with emojis.check or emojis.cancel
-        def check(reaction, reacter):
-            return reaction.message.id == sentMsg.id \
-                and reacter.id == user.id \
-                and (
-                    str(reaction.emoji) == emojis.check
-                    or str(reaction.emoji) == emojis.cancel
-                )
-
-        try:
-            reaction, user = await self.bot.wait_for("reaction_add", timeout=60.0, check=check)
-        except asyncio.TimeoutError:
-            # User took too long to respond
-            return
-        finally:
-            # User took too long OR User clicked the emoji
-            await sentMsg.delete()
+        async with reactions.listen(sentMsg, [emojis.check, emojis.cancel], user=user, timeout=60.0) as waiter:
+            try:
+                reaction, user = await waiter.get()
+            except asyncio.TimeoutError:
+                # User took too long to respond
+                return
+            finally:
+                # User took too long OR User clicked the emoji
+                await sentMsg.delete()
 
         # if the reaction isn't the right one, stop.
         if reaction.emoji != emojis.check:
@@ -224,16 +206,14 @@ class RegisterCog(commands.Cog):
             "0️⃣": 10
         }
 
-        currentusers = userdb.listUsers()
-        guildsregisteredin = [g for g, u in currentusers if u == ctx.author.id]
-        guildsregisteredinnames = [self.bot.get_guild(g).name for g, u in currentusers if u == ctx.author.id]
+        guildsregisteredin = [g for g in userdb.listGuilds(ctx.author.id) if self.bot.get_guild(g) is not None]
+        guildsregisteredinnames = [self.bot.get_guild(g).name for g in guildsregisteredin]
 
         if guildsregisteredin == []:
             await ctx.send("You are not registered with SizeBot in any guilds."
                            f"To register, use `{conf.prefix}register`.")
             return
 
-        # TODO: This doesn't seem to work.
         if guildsregisteredin == [ctx.guild.id]:
             await ctx.send("You are not registered with SizeBot in any other guilds.")
             return
@@ -247,30 +227,24 @@ class RegisterCog(commands.Cog):
         outstring += "Copy profile from what guild?\n"
 
         # TODO: Replace this with a Menu.
+        options = []
         for i in range(min(len(guildsregisteredin), 10)):  # Loops over either the whole list of guilds, or if that's longer than 10, 10 times.
             outstring += f"{list(inputdict.keys())[i]} *{guildsregisteredinnames[i]}*\n"
-            await outmsg.add_reaction(list(inputdict.keys())[i])
-        await outmsg.add_reaction(emojis.cancel)
+            options.append(list(inputdict.keys())[i])
+        options.append(emojis.cancel)
 
         outstring += f"\nClick {emojis.cancel} to cancel."
 
         await outmsg.edit(content = outstring)
 
-        # Wait for requesting user to react to sent message with emojis.check or emojis.cancel
-        def check(reaction, reacter):
-            return reaction.message.id == outmsg.id \
-                and reacter.id == ctx.author.id \
-                and (
-                    str(reaction.emoji) == emojis.check
-                    or str(reaction.emoji) in inputdict.keys()
-                )
-
-        try:
-            reaction, ctx.author = await self.bot.wait_for("reaction_add", timeout=60.0, check=check)
-        except asyncio.TimeoutError:
-            # User took too long to respond
-            await outmsg.delete()
-            return
+        # Wait for requesting user to react to sent message with one of the options, or emojis.cancel
+        async with reactions.listen(outmsg, options, user=ctx.author, timeout=60.0) as waiter:
+            try:
+                reaction, reacter = await waiter.get()
+            except asyncio.TimeoutError:
+                # User took too long to respond
+                await outmsg.delete()
+                return
 
         # if the reaction isn't the right one, stop.
         if reaction.emoji == emojis.cancel:
@@ -281,12 +255,9 @@ class RegisterCog(commands.Cog):
             chosen = inputdict[reaction.emoji] - 1
             chosenguild = guildsregisteredin[chosen]
 
-            frompath = conf.guilddbpath / str(chosenguild) / "users" / f"{ctx.author.id}.json"
-            topath = conf.guilddbpath / str(ctx.guild.id) / "users" / f"{ctx.author.id}.json"
-
-            topath.parent.mkdir(parents = True, exist_ok = True)
-
-            copyfile(frompath, topath)
+            userdata = userdb.load(int(chosenguild), ctx.author.id)
+            userdata.guildid = ctx.guild.id
+            userdb.save(userdata)
 
             await outmsg.delete()
             await ctx.send(f"Successfully copied profile from *{self.bot.get_guild(int(chosenguild)).name}* to here!")
@@ -7,6 +7,10 @@ from sizebot.lib import roller
 logger = logging.getLogger("sizebot")
 
 
+def formatChance(p):
+    return f"{p * 100:.3g}%"
+
+
 class RollCog(commands.Cog):
     """Commands for dice rolling."""
 
@@ -38,10 +42,10 @@ class RollCog(commands.Cog):
         for i, r in enumerate(result.rolls):
             rollheader = f"Roll {i+1}: **{r.total}** | "
             dicestrings = []
-            if r.used:
-                dicestrings.append(f"{', '.join([str(u) for u in r.used])}")
-            if r.dropped:
-                dicestrings.append(f"~~{', '.join([str(d) for d in r.dropped])}~~")
+            if len(r.used):
+                dicestrings.append(roller.formatDice(r.used))
+            if len(r.dropped):
+                dicestrings.append(f"~~{roller.formatDice(r.dropped)}~~")
             rollstrings.append(rollheader + ", ".join(dicestrings))
 
         sendstring = header + "\n".join(rollstrings)
@@ -65,6 +69,30 @@ class RollCog(commands.Cog):
         result = roller.roll(dString)
         await ctx.send(f"{ctx.author.display_name} rolled `{dString}` = **{result.total}**")
 
+    @commands.command(
+        aliases = ["rollstats", "chances"],
+        usage = "<dice>d<sides>[d/k][num]",
+        category = "fun"
+    )
+    async def odds(self, ctx, *, dString):
+        """Roll some dice, and see how lucky you got.
+
+        Works out the exact odds of a roll made of dice and numbers being added or subtracted.
+        For example:
+        `&odds 4d6k3+2d8` will roll 4 six-sided dice (keeping the highest 3) and 2 eight-sided dice, and tell you how likely that total was.
+        """
+        logger.info(f"{ctx.author.display_name} rolled {dString} with odds.")
+        result = roller.roll(dString)
+        dist = await self.bot.loop.run_in_executor(None, roller.distribution, dString)
+        percentiles = ", ".join(f"{p}%: {dist.percentile(p / 100)}" for p in [5, 25, 50, 75, 95])
+        await ctx.send(
+            f"{ctx.author.display_name} rolled `{dString}` = **{result.total}**\n"
+            f"Chance of rolling exactly {result.total}: **{formatChance(dist.probability(result.total))}**\n"
+            f"Chance of rolling {result.total} or higher: **{formatChance(dist.atLeast(result.total))}**\n"
+            f"Average: {dist.mean:,.2f} | Range: {dist.min} to {dist.max}\n"
+            f"Percentiles: {percentiles}"
+        )
+
 
 def setup(bot):
     bot.add_cog(RollCog(bot))
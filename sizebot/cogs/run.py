@@ -1,34 +1,62 @@
+import asyncio
 import logging
+from collections import defaultdict
 from time import time
 
-from discord.ext import tasks
+import discord
 from sizebot.discordplus import commands
 
 from sizebot.lib import utils
 from sizebot.lib.decimal import Decimal
+from sizebot.lib.scheduler import scheduler
 from sizebot.lib.units import TV
 
 
 logger = logging.getLogger("sizebot")
 
-runners = []
+NYAN_STEPS = 33
+RUN_STEPS = 167
+# Fastest a runner will update (in seconds)
+MIN_INTERVAL = 1
+# Most runner edits in flight at once, across all channels
+MAX_CONCURRENT_EDITS = 4
 
 
 def buildNyan(progress):
     nyanTrail = "<a:nyanTrail:667175870711988254>"
     nyanCat = "<a:nyanEnd:667175883697684510>"
-    maxRun = 33
-    steps = utils.clamp(0, int(progress * maxRun), maxRun)
+    steps = utils.clamp(0, int(progress * NYAN_STEPS), NYAN_STEPS)
     return f"\u200b{steps * nyanTrail}{nyanCat}"
 
 
 def buildRun(progress):
-    maxRun = 167
-    steps = utils.clamp(0, int(progress * maxRun), maxRun)
-    remaining = maxRun - steps
+    steps = utils.clamp(0, int(progress * RUN_STEPS), RUN_STEPS)
+    remaining = RUN_STEPS - steps
     return f"\u200b🏁{remaining * ' '}🏃‍♀️"
 
 
+class TokenBucket:
+    """Allows `rate` actions every `per` seconds, in bursts of up to `rate`"""
+
+    def __init__(self, rate, per):
+        self.rate = rate
+        self.per = per
+        self.tokens = rate
+        self.updated = time()
+
+    def take(self, now = None):
+        """Take a token, returning 0 if one was available, or else how many seconds until one will be"""
+        if now is None:
+            now = time()
+        elapsed = max(0, now - self.updated)
+        self.tokens = min(self.rate, self.tokens + elapsed * self.rate / self.per)
+        self.updated = now
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return 0
+        return (1 - self.tokens) * self.per / self.rate
+
+
 class Runner:
     def __init__(self, channelId, messageId, *, startTime, duration, nyan=False):
         self.channelId = channelId
@@ -37,14 +65,12 @@ class Runner:
         self.duration = TV(duration)
         self.nyan = nyan
         self.now = Decimal(startTime)
+        self.lastContent = None
 
-    async def step(self, bot):
-        self.now = Decimal(time())
-        channel = bot.get_channel(self.channelId)
-        message = await channel.fetch_message(self.messageId)
-        await message.edit(content=self.formatRunner())
-        running = self.running
-        return running
+    async def edit(self, bot, content):
+        # Edit by id, so we never have to fetch the message first
+        await bot.http.edit_message(self.channelId, self.messageId, content=content)
+        self.lastContent = content
 
     @property
     def progress(self):
@@ -54,7 +80,7 @@ class Runner:
 
     @property
     def running(self):
-        running = self.progress <= Decimal(1)
+        running = self.now < self.endtime
         return running
 
     @property
@@ -62,6 +88,12 @@ class Runner:
         endtime = self.startTime + self.duration
         return endtime
 
+    @property
+    def interval(self):
+        """How often the bar can visibly change (in seconds)"""
+        steps = NYAN_STEPS if self.nyan else RUN_STEPS
+        return max(MIN_INTERVAL, float(self.duration) / steps)
+
     def formatRunner(self):
         if self.nyan:
             formatted = buildNyan(self.progress)
@@ -69,20 +101,63 @@ class Runner:
             formatted = buildRun(self.progress)
         return formatted
 
+    def toJSON(self):
+        return {
+            "channelId": self.channelId,
+            "messageId": self.messageId,
+            "startTime": str(self.startTime),
+            "duration": str(self.duration),
+            "nyan": self.nyan
+        }
+
+    @classmethod
+    def fromJSON(cls, jsondata):
+        return cls(jsondata["channelId"], jsondata["messageId"], startTime=jsondata["startTime"], duration=jsondata["duration"], nyan=jsondata["nyan"])
+
     @classmethod
     def start(cls, channelId, messageId, *, duration, nyan):
         startTime = Decimal(time())
         runner = cls(channelId, messageId, startTime=startTime, duration=duration, nyan=nyan)
-        runners.append(runner)
+        scheduler.schedule("run", messageId, time(), interval=MIN_INTERVAL, data=runner.toJSON())
+        return runner
 
 
 class RunCog(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
-        self.runTask.start()
+        self.runners = {}
+        # Discord allows 5 message edits per 5 seconds in each channel
+        self.buckets = defaultdict(lambda: TokenBucket(5, 5))
+        self.editLimit = asyncio.Semaphore(MAX_CONCURRENT_EDITS)
+        scheduler.register("run", self.onRunTick)
 
     def cog_unload(self):
-        self.runTask.cancel()
+        scheduler.unregister("run")
+
+    async def onRunTick(self, job):
+        """Update a runner, and return when it should next be updated"""
+        runner = self.runners.get(job.key)
+        if runner is None:
+            runner = self.runners[job.key] = Runner.fromJSON(job.data)
+
+        now = time()
+        runner.now = Decimal(now)
+        content = runner.formatRunner()
+        if content != runner.lastContent:
+            # Out of edits for this channel, try again once there's room
+            wait = self.buckets[runner.channelId].take(now)
+            if wait:
+                return now + wait
+            try:
+                async with self.editLimit:
+                    await runner.edit(self.bot, content)
+            except discord.NotFound:
+                runner.now = runner.endtime
+
+        if not runner.running:
+            del self.runners[job.key]
+            return False
+        return min(now + runner.interval, float(runner.endtime))
 
     @commands.command(
         hidden = True,
@@ -93,14 +168,6 @@ class RunCog(commands.Cog):
         msg = await ctx.send("Ready... Set... GO")
         Runner.start(ctx.channel.id, msg.id, duration=duration, nyan=nyan)
 
-    @tasks.loop(seconds=1)
-    async def runTask(self):
-        global runners
-        try:
-            runners = [r for r in runners if await r.step(self.bot)]
-        except Exception as e:
-            logger.error(e)
-
 
 def setup(bot):
     bot.add_cog(RunCog(bot))
@@ -5,6 +5,7 @@ import discord
 from sizebot.discordplus import commands
 
 from sizebot.lib import proportions, userdb
+from sizebot.lib.converters import MemberOrSize, Target
 from sizebot.lib.objs import DigiObject
 from sizebot.lib.units import SV
 
@@ -20,7 +21,7 @@ class StatsCog(commands.Cog):
         category = "stats"
     )
     @commands.guild_only()
-    async def stats(self, ctx, *, memberOrHeight: typing.Union[discord.Member, SV] = None, customName = None):
+    async def stats(self, ctx, *, memberOrHeight: MemberOrSize = None, customName = None):
         """User stats command.
 
         Get tons of user stats about yourself, a user, or a raw height.
@@ -53,7 +54,7 @@ class StatsCog(commands.Cog):
         category = "stats"
     )
     @commands.guild_only()
-    async def statstxt(self, ctx, *, memberOrHeight: typing.Union[discord.Member, SV] = None):
+    async def statstxt(self, ctx, *, memberOrHeight: MemberOrSize = None):
         """User stats command, raw text version.
 
         Get tons of user stats about yourself, a user, or a raw height.
@@ -81,7 +82,7 @@ class StatsCog(commands.Cog):
         category = "stats"
     )
     @commands.guild_only()
-    async def stat(self, ctx, stat, *, memberOrHeight: typing.Union[discord.Member, SV] = None, customName = None):
+    async def stat(self, ctx, stat, *, memberOrHeight: MemberOrSize = None, customName = None):
         """User stat command.
 
         Get a single stat about yourself, a user, or a raw height.
@@ -159,7 +160,7 @@ class StatsCog(commands.Cog):
         category = "stats"
     )
     @commands.guild_only()
-    async def compare(self, ctx, memberOrHeight1: typing.Union[discord.Member, SV] = None, *, memberOrHeight2: typing.Union[discord.Member, SV] = None):
+    async def compare(self, ctx, memberOrHeight1: MemberOrSize = None, *, memberOrHeight2: MemberOrSize = None):
         """Compare two users' size."""
         if memberOrHeight2 is None:
             memberOrHeight2 = ctx.author
@@ -185,7 +186,7 @@ class StatsCog(commands.Cog):
         category = "stats"
     )
     @commands.guild_only()
-    async def comparetxt(self, ctx, memberOrHeight1: typing.Union[discord.Member, SV] = None, *, memberOrHeight2: typing.Union[discord.Member, SV] = None):
+    async def comparetxt(self, ctx, memberOrHeight1: MemberOrSize = None, *, memberOrHeight2: MemberOrSize = None):
         """Compare two users' size, raw text version."""
         if memberOrHeight2 is None:
             memberOrHeight2 = ctx.author
@@ -208,7 +209,7 @@ class StatsCog(commands.Cog):
         category = "stats"
     )
     @commands.guild_only()
-    async def naturalstats(self, ctx, *, memberOrHeight: typing.Union[discord.Member, SV] = None):
+    async def naturalstats(self, ctx, *, memberOrHeight: MemberOrSize = None):
         """See how tall you are in comparison to an object."""
         if memberOrHeight is None:
             memberOrHeight = ctx.author
@@ -234,7 +235,7 @@ class StatsCog(commands.Cog):
         category = "stats"
     )
     @commands.guild_only()
-    async def onewaycompare(self, ctx, *, what: typing.Union[DigiObject, discord.Member, SV, str], who: typing.Union[discord.Member, SV] = None):  # TODO: Allow a second argument here.
+    async def onewaycompare(self, ctx, *, what: Target, who: MemberOrSize = None):  # TODO: Allow a second argument here.
         """See what an object looks like to you.
 
         Used to see how an object would look at your scale.
@@ -276,7 +277,7 @@ class StatsCog(commands.Cog):
         category = "stats"
     )
     @commands.guild_only()
-    async def lookat(self, ctx, *, what: typing.Union[DigiObject, discord.Member, SV, str]):
+    async def lookat(self, ctx, *, what: Target):
         """See what an object looks like to you.
 
         Used to see how an object would look at your scale.
@@ -1,57 +1,145 @@
-import json
+import re
+from bisect import bisect_left, insort
+from collections import defaultdict, deque
 from datetime import datetime
 from dateutil.tz import tzlocal
 
 import discord
+from discord.ext import tasks
 from sizebot.discordplus import commands, Embed
 
 from sizebot import __version__
 from sizebot import conf
+from sizebot.lib import listeners, persistence
 
 
-class ThisTracker():
+class Leaderboard():
+    """Points for a set of users, kept sorted from most to fewest points"""
+
     def __init__(self, points=None):
         if points is None:
             points = {}
-        else:
-            # Convert keys to integers
-            points = {int(k): v for k, v in points.items()}
-        self.points = points
+        self.points = {int(k): v for k, v in points.items()}
+        self.ranking = sorted((-v, k) for k, v in self.points.items())
+        self.total = sum(self.points.values())
 
-    def incrementPoints(self, id):
+    def incrementPoints(self, id, amount = 1):
         count = self.points.get(id, 0)
-        self.points[id] = count + 1
+        if count:
+            del self.ranking[bisect_left(self.ranking, (-count, id))]
+        self.points[id] = count + amount
+        insort(self.ranking, (-(count + amount), id))
+        self.total += amount
+
+    def top(self, k):
+        """Return the top k (userid, points) pairs"""
+        return [(id, -negpoints) for negpoints, id in self.ranking[:k]]
+
+    def toJSON(self):
+        return self.points
+
+
+def getPeriods(when):
+    """Return the keys of the all-time, weekly and monthly boards that a point scored at `when` counts towards"""
+    year, week, _ = when.isocalendar()
+    return ["all", f"{year}-W{week:02}", when.strftime("%Y-%m")]
+
+
+class ThisTracker():
+    """Agreement points, partitioned by guild and by week and month
+
+    Every point counts towards the boards (period, guildid) for each period it falls in, and for both its own
+    guild and the global board (guildid None)."""
+    # How many of the most recent weeks and months to keep boards for
+    keepweeks = 4
+    keepmonths = 3
+
+    def __init__(self, boards=None):
+        if boards is None:
+            boards = {}
+        self.boards = boards
+
+        self.dirty = False
+
+    @property
+    def points(self):
+        return self.getBoard().points
+
+    def getBoard(self, period = "all", guildid = None):
+        board = self.boards.get((period, guildid))
+        if board is None:
+            board = Leaderboard()
+        return board
+
+    def incrementPoints(self, id, guildid = None, when = None):
+        if when is None:
+            when = datetime.now(tzlocal())
+        newboards = False
+        for period in getPeriods(when):
+            for gid in {None, guildid}:
+                board = self.boards.get((period, gid))
+                if board is None:
+                    board = self.boards[(period, gid)] = Leaderboard()
+                    newboards = True
+                board.incrementPoints(id)
+        if newboards:
+            self.prune()
+        self.dirty = True
+
+    def prune(self):
+        """Forget weekly and monthly boards that are too old to be asked for"""
+        weeks = sorted({p for p, _ in self.boards if "W" in p}, reverse = True)
+        months = sorted({p for p, _ in self.boards if p != "all" and "W" not in p}, reverse = True)
+        expired = set(weeks[self.keepweeks:] + months[self.keepmonths:])
+        if expired:
+            self.boards = {k: v for k, v in self.boards.items() if k[0] not in expired}
 
     def save(self):
-        conf.thispath.parent.mkdir(exist_ok = True)
-        jsondata = self.toJSON()
-        with open(conf.thispath, "w") as f:
-            json.dump(jsondata, f, indent = 4)
+        persistence.document(conf.thispath).set(self.toJSON())
+        self.dirty = False
 
     def toJSON(self):
         """Return a python dictionary for json exporting"""
         return {
-            "points": self.points,
+            "boards": [
+                {
+                    "period": period,
+                    "guildid": guildid,
+                    "points": board.toJSON()
+                }
+                for (period, guildid), board in self.boards.items()
+            ]
         }
 
     @classmethod
     def load(cls):
-        try:
-            with open(conf.thispath, "r") as f:
-                jsondata = json.load(f)
-        except FileNotFoundError:
-            return ThisTracker()
+        jsondata = persistence.document(conf.thispath).get()
         return ThisTracker.fromJSON(jsondata)
 
     @classmethod
     def fromJSON(cls, jsondata):
-        points = jsondata["points"]
-        return ThisTracker(points)
+        if not jsondata:
+            return ThisTracker()
+        if "boards" not in jsondata:
+            # Old format, only global all-time points
+            return ThisTracker({("all", None): Leaderboard(jsondata["points"])})
+        boards = {
+            (b["period"], b["guildid"]): Leaderboard(b["points"])
+            for b in jsondata["boards"]
+        }
+        return ThisTracker(boards)
+
+
+discordagreements = ["this", "brilliancethis", "braverythis", "balancethis", "123this"]
+unicodeagreements = ["🔼", "⬆️", "⤴️", "☝️"]
+textagreements = ["this", "agree"]
+# A whole message of "this", "agree" or an agreement emoji, or anything starting with "^"
+agreementPattern = (r"\A(?:(?i:" + "|".join(textagreements) + r")\Z|(?:"
+                    + "|".join(re.escape(e) for e in unicodeagreements) + r")\Z|\^)")
+agreementRegex = re.compile(agreementPattern)
 
 
 def isAgreementEmoji(emoji):
-    discordagreements = ["this", "brilliancethis", "braverythis", "balancethis", "123this"]
-    unicodeagreements = ["🔼", "⬆️", "⤴️", "☝️"]
     if isinstance(emoji, (discord.Emoji, discord.PartialEmoji)):
         if emoji.name.lower() in discordagreements:
             return True
@@ -61,8 +149,7 @@ def isAgreementEmoji(emoji):
 
 
 def isAgreementMessage(message):
-    textagreements = ["this", "^", "agree"]
-    return isAgreementEmoji(message) or message.lower() in textagreements or message.startswith("^")
+    return agreementRegex.match(message) is not None
 
 
 def findLatestNonThis(messages):
@@ -71,44 +158,119 @@ def findLatestNonThis(messages):
             return message
 
 
+class RecentMessages:
+    """Ring buffer of the latest non-agreement messages in a channel, newest last"""
+    maxlen = 100
+
+    def __init__(self):
+        self._messages = deque(maxlen=self.maxlen)
+
+    def add(self, messageid, authorid):
+        self._messages.append((messageid, authorid))
+
+    def remove(self, messageid):
+        for item in self._messages:
+            if item[0] == messageid:
+                self._messages.remove(item)
+                return
+
+    def latestAuthor(self):
+        if not self._messages:
+            return None
+        _, authorid = self._messages[-1]
+        return authorid
+
+    def __len__(self):
+        return len(self._messages)
+
+
 class ThisCog(commands.Cog):
     """This Points!"""
 
     def __init__(self, bot):
         self.bot = bot
+        self.tracker = ThisTracker.load()
+        # channel id -> RecentMessages
+        self.recent = defaultdict(RecentMessages)
+        # channels we've already backfilled from the message history
+        self.seeded = set()
+        self.flushTask.start()
+        listeners.register(self.on_agreement, pattern = agreementPattern)
+        listeners.register(self.on_other_message, pattern = agreementPattern, invert = True)
+
+    def cog_unload(self):
+        listeners.unregister(self.on_agreement)
+        listeners.unregister(self.on_other_message)
+        self.flushTask.cancel()
+        if self.tracker.dirty:
+            self.tracker.save()
+
+    async def seedChannel(self, channel, before):
+        """Backfill a channel's recent messages from its history, once per channel"""
+        self.seeded.add(channel.id)
+        messages = await channel.history(limit=RecentMessages.maxlen, before=before).flatten()
+        latest = findLatestNonThis(messages)
+        if latest is not None:
+            self.recent[channel.id].add(latest.id, latest.author.id)
 
     @commands.command(
         aliases = ["points", "board"],
+        usage = "[server] [week/month]",
         category = "misc"
     )
-    @commands.guild_only()
-    async def leaderboard(self, ctx):
-        """See who's the most agreeable!"""
+    async def leaderboard(self, ctx, *options):
+        """See who's the most agreeable!
+
+        By default, shows the all-time leaderboard across every server.
+        Add `server` to only count this server, and `week` or `month` to only count recent agreements.
+        In DMs, `server` is ignored and the board across every server is shown.
+        """
         now = datetime.now(tzlocal())
-        tracker = ThisTracker.load()
-        trackerlist = sorted(tracker.points.items(), key=lambda i: i[1], reverse= True)
-        embed = Embed(title=f"The Most Agreeable Users", color=0x31eff9)
+        options = [o.lower() for o in options]
+        guildid = ctx.guild.id if "server" in options and ctx.guild is not None else None
+        allperiod, weekperiod, monthperiod = getPeriods(now)
+        if "week" in options:
+            period, periodname = weekperiod, "This Week"
+        elif "month" in options:
+            period, periodname = monthperiod, "This Month"
+        else:
+            period, periodname = allperiod, None
+
+        board = self.tracker.getBoard(period, guildid)
+        title = "The Most Agreeable Users"
+        if guildid is not None:
+            title += f" in {ctx.guild.name}"
+        if periodname is not None:
+            title += f" {periodname}"
+        embed = Embed(title=title, color=0x31eff9)
         embed.set_author(name=f"SizeBot {__version__}")
         messagetosend = ""
-        totalpoints = sum(tracker.points.values())
-        for userid, points in trackerlist[0:10]:
-            messagetosend += f"**{self.bot.get_user(userid).display_name}**: {points}\n"
-        embed.add_field(name=f"{totalpoints} total agreements", value=messagetosend.strip(), inline=False)
+        for userid, points in board.top(10):
+            user = self.bot.get_user(userid)
+            username = user.display_name if user else f"Unknown user {userid}"
+            messagetosend += f"**{username}**: {points}\n"
+        embed.add_field(name=f"{board.total} total agreements", value=messagetosend.strip() or "Nobody yet!", inline=False)
         embed.set_footer(text=f"{now.strftime('%d %b %Y %H:%M:%S %Z')}")
         await ctx.send(embed = embed)
 
-    @commands.Cog.listener()
-    async def on_message(self, m):
+    async def on_other_message(self, m):
+        self.recent[m.channel.id].add(m.id, m.author.id)
+
+    async def on_agreement(self, m):
+        recent = self.recent[m.channel.id]
         if m.author.bot:
             return
-        if isAgreementMessage(m.content):
-            channel = m.channel
-            messages = await channel.history(limit=100).flatten()
-            if findLatestNonThis(messages).author.id == m.author.id:
-                return
-            tracker = ThisTracker.load()
-            tracker.incrementPoints(findLatestNonThis(messages).author.id)
-            tracker.save()
+        if not recent and m.channel.id not in self.seeded:
+            await self.seedChannel(m.channel, m)
+        agreedwith = recent.latestAuthor()
+        if agreedwith is None or agreedwith == m.author.id:
+            return
+        self.tracker.incrementPoints(agreedwith, m.guild and m.guild.id)
+
+    @commands.Cog.listener()
+    async def on_message_delete(self, m):
+        if m.channel.id in self.recent:
+            self.recent[m.channel.id].remove(m.id)
 
     @commands.Cog.listener()
     async def on_reaction_add(self, r, u):
@@ -117,9 +279,13 @@ class ThisCog(commands.Cog):
         if r.message.author.id == u.id:
             return
         if isAgreementEmoji(r.emoji):
-            tracker = ThisTracker.load()
-            tracker.incrementPoints(r.message.author.id)
-            tracker.save()
+            self.tracker.incrementPoints(r.message.author.id, r.message.guild and r.message.guild.id)
+
+    @tasks.loop(seconds=60)
+    async def flushTask(self):
+        """Save the points to disk, if they've changed"""
+        if self.tracker.dirty:
+            self.tracker.save()
 
 
 def setup(bot):
@@ -5,7 +5,7 @@ from datetime import datetime, timedelta
 from sizebot.discordplus import commands
 
 from sizebot import conf
-from sizebot.lib import utils
+from sizebot.lib import listeners, persistence, utils
 from sizebot.lib.constants import ids
 
 logger = logging.getLogger("sizebot")
@@ -15,21 +15,20 @@ starttime = datetime(2019, 9, 15)
 milestones = [1000, 2500, 4200, 5000, 6900, 7500, 9001, 10000, 25000, 42000, 50000, 69000, 75000, 100000]
 
 
+def getWinksDocument():
+    return persistence.document(conf.winkpath, int, loads = int, dumps = str)
+
+
 def getWinks():
-    try:
-        with open(conf.winkpath, "r") as f:
-            winkcount = int(f.read())
-    except (FileNotFoundError, ValueError):
-        winkcount = 0
-    return winkcount
+    return getWinksDocument().get()
 
 
 def addWinks(count = 1):
-    winkcount = getWinks()
-    winkcount += count
-    with open(conf.winkpath, "w") as winkfile:
-        winkfile.write(str(winkcount))
-    return winkcount
+    return getWinksDocument().update(lambda winkcount: winkcount + count)
+
+
+def isYukio(message):
+    return message.author.id == ids.yukio
 
 
 def countWinks(s):
@@ -61,12 +60,12 @@ class WinksCog(commands.Cog):
 
     def __init__(self, bot):
         self.bot = bot
+        listeners.register(self.on_message, isYukio, pattern = winkPattern.pattern)
 
-    @commands.Cog.listener()
-    async def on_message(self, message):
-        if message.author.id != ids.yukio:
-            return
+    def cog_unload(self):
+        listeners.unregister(self.on_message)
 
+    async def on_message(self, message):
         winksSeen = countWinks(message.content)
         if winksSeen == 0:
             return
@@ -32,6 +32,7 @@ guilddbpath = None
 telemetrypath = None
 changespath = None
 naptimepath = None
+schedulepath = None
 edgepath = None
 prefix = "&"
 name = "SizeBot"
@@ -39,6 +40,8 @@ activity = "Ratchet and Clank: Size Matters"
 authtoken = None
 admins = []             # List of admins # TODO: (deprecated?)
 logchannelid = None
+maxdice = 1000000       # Most dice that can be rolled in one roll command
+binaryusers = False     # Save users in the compact binary format, instead of JSON
 
 # File paths
 datadir = getDataDir()
@@ -48,12 +51,13 @@ telemetrypath = datadir / "telemetry.json"
 thispath = datadir / "thistracker.json"
 changespath = datadir / "changes.json"
 naptimepath = datadir / "naptime.json"
+schedulepath = datadir / "schedule.json"
 edgepath = datadir / "edgeusers.ini"
 confpath = datadir / "sizebot.conf"
 
 
 def load():
-    global prefix, name, activity, authtoken, admins, logchannelid
+    global prefix, name, activity, authtoken, admins, logchannelid, maxdice, binaryusers
     configDict = toml.load(confpath)
 
     # SizeBot
@@ -63,6 +67,10 @@ def load():
         name = utils.getPath(configDict, "sizebot.name")
     if utils.hasPath(configDict, "sizebot.activity"):
         activity = utils.getPath(configDict, "sizebot.activity")
+    if utils.hasPath(configDict, "sizebot.maxdice"):
+        maxdice = int(utils.getPath(configDict, "sizebot.maxdice"))
+    if utils.hasPath(configDict, "sizebot.binaryusers"):
+        binaryusers = bool(utils.getPath(configDict, "sizebot.binaryusers"))
 
     # Discord
     if utils.hasPath(configDict, "discord.authtoken"):
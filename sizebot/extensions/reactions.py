@@ -0,0 +1,5 @@
+from sizebot.lib import reactions
+
+
+def setup(bot):
+    bot.add_listener(reactions.router.on_reaction_add, "on_reaction_add")
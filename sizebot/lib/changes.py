@@ -1,16 +1,19 @@
-import json
 import logging
 import time
 
 from sizebot import conf
-from sizebot.lib import proportions, userdb
+from sizebot.lib import persistence, proportions, userdb
 from sizebot.lib.decimal import Decimal
+from sizebot.lib.logvalue import LogValue
+from sizebot.lib.scheduler import scheduler
 from sizebot.lib.units import SV, TV
 
 logger = logging.getLogger("sizebot")
 
 
 _activeChanges = {}
+# How often running changes are applied (in seconds)
+TICK = 6
 
 
 class Change:
@@ -33,9 +36,16 @@ class Change:
         seconds = now - self.lastRan
         self.lastRan = now
         addPerTick = self.addPerSec * seconds
-        mulPerTick = self.mulPerSec ** seconds
         userdata = userdb.load(self.guildid, self.userid)
-        newheight = (userdata.height * mulPerTick) + addPerTick
+        newheight = userdata.height
+        if self.mulPerSec != 1:
+            # A Decimal to a fractional power is slow, so the tick's multiplier is worked out in log space.
+            # That's accurate to about 1e-15, which loses nothing real: seconds comes from time.time(), a float, so the
+            # exponent was never more precise than that. The height itself is still multiplied as a Decimal, so the
+            # stored height picks up at most ~1e-15 relative error per tick (~1e-11 after a day of ticks).
+            mulPerTick = (LogValue(self.mulPerSec) ** seconds).toDecimal()
+            newheight = newheight * mulPerTick
+        newheight = newheight + addPerTick
         if self.stopSV is not None and ((newheight < userdata.height and self.stopSV >= newheight) or (newheight > userdata.height and self.stopSV <= newheight)):
             newheight = self.stopSV
             running = False
@@ -81,51 +91,50 @@ def stop(userid, guildid):
     return change
 
 
-async def apply(bot):
-    """Apply slow growth changes"""
-    global _activeChanges
-    runningChanges = {}
-    for key, change in _activeChanges.items():
-        try:
-            running = await change.apply(bot)
-            if running:
-                runningChanges[key] = change
-        except Exception as e:
-            logger.error(e)
-    _activeChanges = runningChanges
-    saveToFile()
+async def apply(bot, userid, guildid):
+    """Apply a slow growth change (called by the scheduler every tick), and return whether it's still running"""
+    change = _activeChanges.get((userid, guildid))
+    if change is None:
+        return False
+    try:
+        running = await change.apply(bot)
+    except Exception as e:
+        logger.error(e)
+        running = False
+    if running:
+        saveToFile()
+    else:
+        _deactivate(userid, guildid)
+    return running
 
 
 def _activate(change):
     """Activate a new change task"""
     _activeChanges[change.userid, change.guildid] = change
+    scheduler.schedule("change", (change.userid, change.guildid), time.time() + TICK, interval = TICK)
     saveToFile()
 
 
 def _deactivate(userid, guildid):
     """Deactivate a running change task"""
     change = _activeChanges.pop((userid, guildid), None)
+    scheduler.cancel("change", (userid, guildid))
     saveToFile()
     return change
 
 
 def loadFromFile():
     """Load all change tasks from a file"""
-    try:
-        with open(conf.changespath, "r") as f:
-            changesJson = json.load(f)
-    except FileNotFoundError:
-        changesJson = []
+    changesJson = persistence.document(conf.changespath, list).get()
     for changeJson in changesJson:
-        change = Change(**changesJson)
+        change = Change(**changeJson)
         _activate(change)
 
 
 def saveToFile():
     """Save all change tasks to a file"""
     changesJson = [c.toJson() for c in _activeChanges.values()]
-    with open(conf.changespath, "w") as f:
-        json.dump(changesJson, f)
+    persistence.document(conf.changespath, list).set(changesJson)
 
 
 def formatSummary():
@@ -0,0 +1,112 @@
+import colorsys
+import importlib.resources as pkg_resources
+import json
+from functools import lru_cache
+
+import numpy as np
+
+import sizebot.data
+from sizebot.lib.utils import clamp
+
+
+def hexToRGB(s):
+    """Convert a 3 or 6 digit hex string (without the #) to an (r, g, b) tuple"""
+    if len(s) == 3:
+        s = "".join(c * 2 for c in s)
+    value = int(s, 16)
+    return (value >> 16) & 0xFF, (value >> 8) & 0xFF, value & 0xFF
+
+
+def rgbToHex(rgb):
+    r, g, b = rgb
+    return f"{r:02X}{g:02X}{b:02X}"
+
+
+def _toByte(f):
+    return int(round(clamp(0, f, 1) * 255))
+
+
+def _toPercent(f):
+    return int(round(f * 100))
+
+
+def hslToRGB(h, s, lightness):
+    """h in degrees, s and lightness in percent"""
+    r, g, b = colorsys.hls_to_rgb((h % 360) / 360, clamp(0, lightness, 100) / 100, clamp(0, s, 100) / 100)
+    return _toByte(r), _toByte(g), _toByte(b)
+
+
+def hsvToRGB(h, s, v):
+    """h in degrees, s and v in percent"""
+    r, g, b = colorsys.hsv_to_rgb((h % 360) / 360, clamp(0, s, 100) / 100, clamp(0, v, 100) / 100)
+    return _toByte(r), _toByte(g), _toByte(b)
+
+
+def cmykToRGB(c, m, y, k):
+    """c, m, y and k in percent"""
+    c, m, y, k = (clamp(0, x, 100) / 100 for x in (c, m, y, k))
+    return _toByte((1 - c) * (1 - k)), _toByte((1 - m) * (1 - k)), _toByte((1 - y) * (1 - k))
+
+
+def rgbToHSL(rgb):
+    h, lightness, s = colorsys.rgb_to_hls(*(x / 255 for x in rgb))
+    return int(round(h * 360)) % 360, _toPercent(s), _toPercent(lightness)
+
+
+def rgbToHSV(rgb):
+    h, s, v = colorsys.rgb_to_hsv(*(x / 255 for x in rgb))
+    return int(round(h * 360)) % 360, _toPercent(s), _toPercent(v)
+
+
+def rgbToCMYK(rgb):
+    r, g, b = (x / 255 for x in rgb)
+    k = 1 - max(r, g, b)
+    if k == 1:
+        return 0, 0, 0, 100
+    c, m, y = ((1 - x - k) / (1 - k) for x in (r, g, b))
+    return _toPercent(c), _toPercent(m), _toPercent(y), _toPercent(k)
+
+
+def rgbToLab(rgb):
+    """Convert an array of sRGB colors (0-255, shape (..., 3)) to CIELAB, with a D65 white point"""
+    srgb = np.asarray(rgb, dtype = float) / 255
+    linear = np.where(srgb <= 0.04045, srgb / 12.92, ((srgb + 0.055) / 1.055) ** 2.4)
+    matrix = np.array([
+        [0.4124564, 0.3575761, 0.1804375],
+        [0.2126729, 0.7151522, 0.0721750],
+        [0.0193339, 0.1191920, 0.9503041]
+    ])
+    xyz = linear @ matrix.T / np.array([0.95047, 1.0, 1.08883])
+    f = np.where(xyz > (6 / 29) ** 3, np.cbrt(xyz), xyz / (3 * (6 / 29) ** 2) + 4 / 29)
+    fx, fy, fz = f[..., 0], f[..., 1], f[..., 2]
+    return np.stack([116 * fy - 16, 500 * (fx - fy), 200 * (fy - fz)], axis = -1)
+
+
+class ColorNames:
+    """Named colors, indexed for nearest-color lookups in CIELAB space"""
+
+    def __init__(self, colors):
+        self.names = list(colors.keys())
+        self.rgbs = [hexToRGB(h.lstrip("#")) for h in colors.values()]
+        self.labs = rgbToLab(self.rgbs)
+
+    def nearest(self, rgb):
+        """Return the name and (r, g, b) of the named color that looks closest to `rgb`"""
+        distances = ((self.labs - rgbToLab(rgb)) ** 2).sum(axis = 1)
+        i = int(distances.argmin())
+        return self.names[i], self.rgbs[i]
+
+    @classmethod
+    def loadFromFile(cls, filename):
+        return cls(json.loads(pkg_resources.read_text(sizebot.data, filename)))
+
+
+@lru_cache(maxsize = None)
+def getColorNames():
+    return ColorNames.loadFromFile("colors.json")
+
+
+@lru_cache(maxsize = 1024)
+def getColorName(rgb):
+    name, _ = getColorNames().nearest(rgb)
+    return name
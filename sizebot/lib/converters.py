@@ -0,0 +1,113 @@
+import re
+import time
+from collections import defaultdict
+
+from discord.ext import commands
+
+from sizebot.lib import errors
+from sizebot.lib.objs import DigiObject
+from sizebot.lib.units import SV
+
+# A mention, or a raw user ID
+re_member = re.compile(r"\A(?:<@!?\d{15,21}>|\d{15,21})\Z")
+# Anything that starts like a number is probably a size
+re_size = re.compile(r"\A[-+]?(?:\d|\.\d|[⅛¼⅜½⅝¾⅞∞])")
+
+
+class Timing:
+    """How long conversions have taken, in seconds"""
+    __slots__ = ["count", "total", "max"]
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def add(self, seconds):
+        self.count += 1
+        self.total += seconds
+        self.max = max(self.max, seconds)
+
+    @property
+    def mean(self):
+        if self.count == 0:
+            return 0.0
+        return self.total / self.count
+
+
+# Conversion times, by the kind of value each argument turned out to be
+timings = defaultdict(Timing)
+
+
+def formatTimings():
+    return "\n".join(f"{kind:8} {t.count:6} runs, {t.mean * 1000:8.3f}ms mean, {t.max * 1000:8.3f}ms max"
+                     for kind, t in sorted(timings.items()))
+
+
+def classify(argument, *, objects = False):
+    """Work out which kinds of value an argument could be, most likely first
+
+    Looking at the text first means mentions and sizes go straight to the right converter, instead of searching every
+    member's name before trying to parse a size."""
+    argument = argument.strip()
+    if re_member.match(argument):
+        return ["member"]
+    if objects and DigiObject.findByName(argument) is not None:
+        return ["object"]
+    if re_size.match(argument):
+        # Member names can start with a number too
+        return ["size", "member"]
+    return ["member", "size"]
+
+
+async def _toMember(ctx, argument):
+    return await commands.MemberConverter().convert(ctx, argument)
+
+
+async def _toSize(ctx, argument):
+    return SV.parse(argument)
+
+
+async def _toObject(ctx, argument):
+    return await DigiObject.convert(ctx, argument)
+
+
+_converters = {
+    "member": _toMember,
+    "size": _toSize,
+    "object": _toObject
+}
+
+
+async def convert(ctx, argument, *, objects = False, text = False):
+    """Convert an argument to a member, a size, an object (if objects is True), or leave it as text (if text is True)"""
+    start = time.perf_counter()
+    kind = "failed"
+    try:
+        for tryKind in classify(argument, objects = objects):
+            try:
+                result = await _converters[tryKind](ctx, argument)
+            except (commands.BadArgument, errors.DigiException):
+                continue
+            kind = tryKind
+            return result
+        if text:
+            kind = "text"
+            return argument
+        raise commands.BadArgument(f"{argument!r} is not a member or a size.")
+    finally:
+        timings[kind].add(time.perf_counter() - start)
+
+
+class MemberOrSize:
+    """Converter for a member or a size"""
+    @classmethod
+    async def convert(cls, ctx, argument):
+        return await convert(ctx, argument)
+
+
+class Target:
+    """Converter for an object, a member or a size. Anything else is left as text."""
+    @classmethod
+    async def convert(cls, ctx, argument):
+        return await convert(ctx, argument, objects = True, text = True)
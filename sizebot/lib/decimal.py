@@ -4,7 +4,7 @@ import random
 import re
 from decimal import Decimal as RawDecimal
 from decimal import ROUND_DOWN
-from functools import total_ordering
+from functools import lru_cache, total_ordering
 
 from sizebot.lib.utils import minmax
 
@@ -41,11 +41,15 @@ def unwrapDecimal(value):
 
 @total_ordering
 class Decimal():
+    """An immutable, hashable wrapper around decimal.Decimal, that handles infinities and fractions"""
+    __slots__ = ["_rawvalue"]
     infinity = RawDecimal("infinity")
     _infinity = RawDecimal("1e100")
 
-    def __init__(self, value):
-        # initialize from Decimal
+    def __new__(cls, value):
+        # Decimals are immutable, so one that's already the right type can be shared instead of copied
+        if type(value) is cls:
+            return value
         rawvalue = unwrapDecimal(value)
         if isinstance(rawvalue, str):
             if rawvalue == "∞":
@@ -57,7 +61,29 @@ class Decimal():
             if len(values) == 2:
                 numberator, denominator = values
                 rawvalue = unwrapDecimal(Decimal(numberator) / Decimal(denominator))
-        self._rawvalue = clampInf(RawDecimal(rawvalue), unwrapDecimal(self._infinity))
+        self = super().__new__(cls)
+        object.__setattr__(self, "_rawvalue", clampInf(RawDecimal(rawvalue), unwrapDecimal(cls._infinity)))
+        return self
+
+    @classmethod
+    def intern(cls, value):
+        """Return a shared instance for a constant that gets used a lot"""
+        return _intern(cls, value)
+
+    def __setattr__(self, name, value):
+        raise AttributeError(f"{type(self).__name__} is immutable")
+
+    def __delattr__(self, name):
+        raise AttributeError(f"{type(self).__name__} is immutable")
+
+    def __reduce__(self):
+        return (type(self), (str(self._rawvalue),))
+
+    def __copy__(self):
+        return self
+
+    def __deepcopy__(self, memo):
+        return self
 
     def __format__(self, spec):
         if self.is_infinite():
@@ -130,9 +156,8 @@ class Decimal():
     def __bool__(value):
         return bool(value)
 
-    @values
-    def __hash__(value):
-        raise hash(value)
+    def __hash__(self):
+        return hash(self._rawvalue)
 
     # Math Methods
     @values
@@ -348,6 +373,11 @@ class Decimal():
         return Decimal(value.log10())
 
 
+@lru_cache(maxsize = None)
+def _intern(cls, value):
+    return cls(value)
+
+
 class DecimalSpec:
     formatSpecRe = re.compile(r"""\A
     (?:
@@ -1,37 +1,151 @@
 import asyncio
 import logging
 
-from sizebot.lib.utils import chunkMsg
+from sizebot.lib.utils import chunkLines, chunkMsg
+
+# Longest chunk of lines that still fits in a message after chunkMsg() wraps it in a code block
+MAX_CHUNK_LEN = 2000 - len("```python\n") - len("\n```")
+
+
+def aggregateMessages(messages):
+    """Collapse runs of identical messages into [message, count] pairs"""
+    groups = []
+    for message in messages:
+        if groups and groups[-1][0] == message:
+            groups[-1][1] += 1
+        else:
+            groups.append([message, 1])
+    return groups
+
+
+def formatGroup(message, count):
+    if count == 1:
+        return message
+    return f"{message} (x{count})"
+
+
+def _pack(groups, maxchunks, reserve):
+    """Pack groups into at most maxchunks chunks, keeping reserve characters free at the end of the last one"""
+    def capacity(index):
+        return MAX_CHUNK_LEN - reserve if index == maxchunks - 1 else MAX_CHUNK_LEN
+
+    chunks = []
+    suppressed = 0
+    for message, count in groups:
+        line = formatGroup(message, count)
+        if suppressed:
+            suppressed += count
+        elif chunks and len(chunks[-1]) + 1 + len(line) <= capacity(len(chunks) - 1):
+            chunks[-1] += "\n" + line
+        else:
+            linechunks = list(chunkLines(line, MAX_CHUNK_LEN))
+            last = len(chunks) + len(linechunks) - 1
+            if last >= maxchunks or len(linechunks[-1]) > capacity(last):
+                suppressed += count
+            else:
+                chunks.extend(linechunks)
+    return chunks, suppressed
+
+
+def packMessages(messages, maxchunks, dropped = 0):
+    """Pack messages into at most maxchunks chunks of lines
+
+    Messages that don't fit, and dropped messages, are counted in a "N messages suppressed." line at the end, and room
+    is kept for that line, so there are never more than maxchunks chunks.
+    Returns the chunks, and how many messages were suppressed."""
+    groups = aggregateMessages(messages)
+    chunks, suppressed = _pack(groups, maxchunks, 0)
+    if not suppressed and not dropped:
+        return chunks, 0
+    # Pack again, leaving room for the longest summary this batch could need
+    reserve = len(f"\n{len(messages) + dropped} messages suppressed.")
+    chunks, suppressed = _pack(groups, maxchunks, reserve)
+    suppressed += dropped
+    summary = f"{suppressed} messages suppressed."
+    if chunks and len(chunks[-1]) + 1 + len(summary) <= MAX_CHUNK_LEN:
+        chunks[-1] += "\n" + summary
+    else:
+        chunks.append(summary)
+    return chunks, suppressed
 
 
 class AsyncHandler(logging.Handler):
-    def __init__(self, *args, **kwargs):
-        self.__queue = asyncio.Queue()
+    """Logging handler that queues records and hands them to a coroutine in batches.
+
+    batchwindow: how long to wait after the first record of a batch for more records to arrive (in seconds.)
+    maxqueue: how many records can wait in the queue before new ones are dropped. 0 is unbounded.
+
+    Records can be logged from any thread. Records from other threads are handed to the event loop the handler was
+    made on, since asyncio queues aren't thread-safe.
+    """
+
+    def __init__(self, *args, batchwindow = 0, maxqueue = 0, **kwargs):
+        self.__eventloop = asyncio.get_event_loop()
+        self.__queue = asyncio.Queue(maxqueue)
+        self.__dropped = 0
+        self.batchwindow = batchwindow
+        self.maxqueue = maxqueue
         asyncio.create_task(self.__loop())
         super().__init__(*args, **kwargs)
 
     def emit(self, record):
-        self.__queue.put_nowait(record)
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        if running is self.__eventloop:
+            self.__put(record)
+            return
+        try:
+            self.__eventloop.call_soon_threadsafe(self.__put, record)
+        except RuntimeError:
+            # The event loop is closed
+            pass
+
+    def __put(self, record):
+        try:
+            self.__queue.put_nowait(record)
+        except asyncio.QueueFull:
+            self.__dropped += 1
 
-    def asyncemit(self, record):
+    async def asyncemit(self, records, dropped):
         raise NotImplementedError
 
     async def __loop(self):
         while True:
-            record = await self.__queue.get()
+            records = [await self.__queue.get()]
+            await asyncio.sleep(self.batchwindow)
+            while not self.__queue.empty():
+                records.append(self.__queue.get_nowait())
+            dropped, self.__dropped = self.__dropped, 0
             try:
-                await self.asyncemit(record)
+                await self.asyncemit(records, dropped)
             except Exception:
                 pass
 
 
 class DiscordHandler(AsyncHandler):
-    def __init__(self, channel):
-        super().__init__()
+    """Sends log records to a Discord channel, packing each batch into as few messages as possible.
+
+    When a batch would take more than maxmessages messages, the oldest lines are kept and the rest
+    are replaced with a "N messages suppressed" summary. During a log storm (records are being dropped,
+    or a batch fills half the queue), that limit drops to 1.
+    """
+
+    def __init__(self, channel, *, batchwindow = 2, maxqueue = 500, maxmessages = 3):
+        super().__init__(batchwindow = batchwindow, maxqueue = maxqueue)
         self.__channel = channel
+        self.maxmessages = maxmessages
+
+    async def asyncemit(self, records, dropped):
+        messages = [record.getMessage().replace("```", r"\`\`\`") for record in records]
+
+        maxmessages = self.maxmessages
+        if dropped or (self.maxqueue and len(records) >= self.maxqueue // 2):
+            maxmessages = 1
 
-    async def asyncemit(self, record):
-        message = record.getMessage().replace("```", r"\`\`\`")
+        chunks, _ = packMessages(messages, maxmessages, dropped)
 
-        for m in chunkMsg(message):
-            await self.__channel.send(m)
+        for chunk in chunks:
+            for m in chunkMsg(chunk):
+                await self.__channel.send(m)
@@ -95,6 +95,16 @@ class CannotSaveWithoutIDException(DigiException):
         return "Tried to save a user without an ID."
 
 
+class InvalidUserRecordException(DigiException):
+    level = logging.ERROR
+
+    def __init__(self, reason):
+        self.reason = reason
+
+    def formatMessage(self):
+        return f"Invalid user record: {self.reason}."
+
+
 class NoPermissionsException(DigiException):
     level = logging.ERROR
 
@@ -140,6 +150,44 @@ class InvalidRollException(DigiException):
         return f"Invalid roll string `{self.dString}`."
 
 
+class TooManyDiceException(DigiException):
+    def __init__(self, count, maxdice):
+        self.count = count
+        self.maxdice = maxdice
+
+    def formatUserMessage(self):
+        return f"That's {self.count:,} dice! You can only roll up to {self.maxdice:,} dice at once."
+
+
+class UnsupportedRollDistributionException(DigiException):
+    def __init__(self, dString):
+        self.dString = dString
+
+    def formatUserMessage(self):
+        return f"I can't work out the odds for `{self.dString}`. I can only handle dice and numbers being added or subtracted, and not too many sides."
+
+
+class EvalTimeoutException(DigiException):
+    def __init__(self, timeout):
+        self.timeout = timeout
+
+    def formatMessage(self):
+        return f"Eval ran for longer than {self.timeout} seconds."
+
+
+class EvalMemoryException(DigiException):
+    def __init__(self, memorylimit):
+        self.memorylimit = memorylimit
+
+    def formatMessage(self):
+        return f"Eval used more than {self.memorylimit:,} bytes of memory."
+
+
+class EvalCancelledException(DigiException):
+    def formatMessage(self):
+        return "Eval was cancelled."
+
+
 class AdminPermissionException(DigiContextException):
     async def formatMessage(self, ctx):
         usernick = ctx.author.display_name
@@ -1,8 +1,15 @@
+import asyncio
 import builtins
+import concurrent.futures
 import inspect
+import io
 import itertools
 import logging
 import math
+import sys
+import threading
+import time as timer
+import tracemalloc
 from datetime import date, datetime, time, timedelta
 
 import discord
@@ -10,7 +17,7 @@ from sizebot.discordplus import Embed
 
 from sizebot import conf
 from sizebot.cogs import thistracker
-from sizebot.lib import userdb, utils
+from sizebot.lib import errors, userdb, utils
 from sizebot.lib.constants import emojis, ids
 from sizebot.lib.decimal import Decimal
 from sizebot.lib.objs import objects
@@ -147,14 +154,14 @@ def buildEvalWrapper(evalStr, addReturn = True):
     return evalWrapper, evalWrapperStr
 
 
-async def runEval(ctx, evalStr):
+async def runEval(ctx, evalStr, returnValue = True):
     evalGlobals = getEvalGlobals()
     evalLocals = {}
 
     # Add ctx to the globals
     evalGlobals["ctx"] = ctx
 
-    evalWrapper, evalWrapperStr = buildEvalWrapper(evalStr)
+    evalWrapper, evalWrapperStr = buildEvalWrapper(evalStr, returnValue)
 
     logger.debug(f"Executing eval:\n{evalWrapperStr}")
 
@@ -166,3 +173,126 @@ async def runEval(ctx, evalStr):
     evalFn = evalLocals["__ex"]
 
     return await evalFn()
+
+
+class ThreadedEval:
+    """An eval that runs in its own thread (with its own event loop), so it can't block the bot
+
+    The time limit, memory limit and cancellation are checked between lines of the eval's own code, so a long
+    call into a library or C (like a huge multiplication) can't be interrupted until it returns. Memory is measured with tracemalloc, which counts every
+    thread's allocations, so the memory numbers are approximate.
+
+    tracemalloc is process-wide: while an eval runs, every allocation in the bot is traced, which slows the whole bot
+    down. Tracing is only started if nothing else had already started it, and it's stopped as soon as the eval finishes
+    or is abandoned (see abandon()), not when a stuck thread finally returns.
+
+    In the eval, `print()` output is collected in `output`, and `await onloop(coro)` runs a coroutine on the
+    bot's event loop (which is needed for anything that talks to discord, like `ctx.send()`).
+    """
+    # Only check the memory every this many traced events, because it's slow
+    memorycheckinterval = 1000
+
+    def __init__(self, ctx, evalStr, *, timeout = 60, memorylimit = 256 * 1024 * 1024):
+        self.ctx = ctx
+        self.evalStr = evalStr
+        self.timeout = timeout
+        self.memorylimit = memorylimit
+        self.output = io.StringIO()
+        self.starttime = None
+        self.elapsed = None
+        self.peakmemory = None
+        self._cancelled = threading.Event()
+        self._future = concurrent.futures.Future()
+        self._deadline = None
+        self._basememory = 0
+        self._events = 0
+        self._tracinglock = threading.Lock()
+        # Whether this eval started tracemalloc, and so has to stop it
+        self._ownstracing = False
+
+    def start(self):
+        """Start the eval, and return a future for its result"""
+        loop = asyncio.get_running_loop()
+
+        async def onloop(coro):
+            return await asyncio.wrap_future(asyncio.run_coroutine_threadsafe(coro, loop))
+
+        def evalPrint(*args, sep = " ", end = "\n", **kwargs):
+            self.output.write(sep.join(str(a) for a in args) + end)
+
+        evalGlobals = getEvalGlobals()
+        evalGlobals["ctx"] = self.ctx
+        evalGlobals["print"] = evalPrint
+        evalGlobals["onloop"] = onloop
+        evalLocals = {}
+
+        evalWrapper, evalWrapperStr = buildEvalWrapper(self.evalStr)
+        logger.debug(f"Executing threaded eval:\n{evalWrapperStr}")
+        exec(evalWrapper, evalGlobals, evalLocals)
+        evalFn = evalLocals["__ex"]
+
+        self.starttime = timer.perf_counter()
+        thread = threading.Thread(target = self._run, args = (evalFn,), name = "eval", daemon = True)
+        thread.start()
+        return asyncio.wrap_future(self._future)
+
+    def cancel(self):
+        self._cancelled.set()
+
+    def abandon(self):
+        """Cancel the eval, and stop tracing memory now instead of waiting for a stuck thread to return"""
+        self.cancel()
+        self._stopTracing()
+
+    def _startTracing(self):
+        with self._tracinglock:
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+                # The peak is shared too, so only reset it if nobody else is using it
+                tracemalloc.reset_peak()
+                self._ownstracing = True
+            self._basememory = tracemalloc.get_traced_memory()[0]
+
+    def _stopTracing(self):
+        with self._tracinglock:
+            if self.peakmemory is None:
+                self.peakmemory = max(0, tracemalloc.get_traced_memory()[1] - self._basememory)
+            if self._ownstracing:
+                self._ownstracing = False
+                tracemalloc.stop()
+
+    @property
+    def running(self):
+        return self.starttime is not None and not self._future.done()
+
+    def _run(self, evalFn):
+        self._deadline = timer.monotonic() + self.timeout
+        self._startTracing()
+        sys.settrace(self._trace)
+        try:
+            result = asyncio.run(evalFn())
+            error = None
+        except BaseException as e:
+            error = e
+        finally:
+            sys.settrace(None)
+            self.elapsed = timer.perf_counter() - self.starttime
+            self._stopTracing()
+        if error is not None:
+            self._future.set_exception(error)
+        else:
+            self._future.set_result(result)
+
+    def _trace(self, frame, event, arg):
+        # Only interrupt the eval's own code, so nothing gets raised inside asyncio or library internals
+        if frame.f_code.co_filename != "<eval>":
+            return None
+        if self._cancelled.is_set():
+            raise errors.EvalCancelledException
+        if timer.monotonic() > self._deadline:
+            raise errors.EvalTimeoutException(self.timeout)
+        self._events += 1
+        if self._events % self.memorycheckinterval == 0:
+            if tracemalloc.get_traced_memory()[0] - self._basememory > self.memorylimit:
+                raise errors.EvalMemoryException(self.memorylimit)
+        return self._trace
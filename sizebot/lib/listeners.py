@@ -0,0 +1,77 @@
+import asyncio
+import logging
+import re
+from functools import lru_cache
+
+from sizebot.lib import utils
+
+logger = logging.getLogger("sizebot")
+
+
+class Listener:
+    __slots__ = ["handler", "predicate", "pattern", "invert"]
+
+    def __init__(self, handler, predicate = None, pattern = None, invert = False):
+        self.handler = handler
+        self.predicate = predicate
+        self.pattern = pattern
+        self.invert = invert
+
+
+_listeners = []
+
+
+def register(handler, predicate = None, *, pattern = None, invert = False):
+    """Register a coroutine to run on messages
+
+    predicate: a cheap, synchronous check that a message is worth handling. It should not touch the disk or the network.
+    pattern: a regex that the message content must contain (or must not contain, if invert is True). Every listener's
+        pattern is combined into one regex, so messages that match none of them are only scanned once, however many
+        listeners there are. Patterns can't use named groups or numbered backreferences.
+    """
+    _listeners.append(Listener(handler, predicate, pattern, invert))
+
+
+def unregister(handler):
+    _listeners[:] = [listener for listener in _listeners if listener.handler != handler]
+
+
+@lru_cache(maxsize = 16)
+def _compileScanner(patterns):
+    return re.compile("|".join(f"(?P<p{i}>{p})" for i, p in enumerate(patterns)))
+
+
+def scan(content, patterns):
+    """Return the set of patterns found in content
+
+    A message that matches none of the patterns is ruled out in a single pass. Where two patterns match at the same
+    place, the combined regex only reports the first, so once anything matches, the patterns it didn't report are
+    checked on their own."""
+    scanner = _compileScanner(patterns)
+    found = set()
+    for match in scanner.finditer(content):
+        found.add(patterns[int(match.lastgroup[1:])])
+        if len(found) == len(patterns):
+            return found
+    if found:
+        found.update(p for p in patterns if p not in found and re.search(p, content))
+    return found
+
+
+def _isWanted(listener, message, found):
+    if listener.pattern is not None and (listener.pattern in found) == listener.invert:
+        return False
+    return listener.predicate is None or listener.predicate(message)
+
+
+async def dispatch(message):
+    """Run every listener whose pattern and predicate accept this message, concurrently"""
+    patterns = tuple(dict.fromkeys(listener.pattern for listener in _listeners if listener.pattern is not None))
+    found = scan(message.content, patterns) if patterns else set()
+    handlers = [listener.handler for listener in _listeners if _isWanted(listener, message, found)]
+    if not handlers:
+        return
+    results = await asyncio.gather(*(h(message) for h in handlers), return_exceptions = True)
+    for handler, result in zip(handlers, results):
+        if isinstance(result, Exception):
+            logger.error(f"Error in message listener {handler.__qualname__}:\n{utils.formatTraceback(result)}")
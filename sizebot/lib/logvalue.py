@@ -0,0 +1,163 @@
+import math
+import sys
+from decimal import Decimal as RawDecimal
+from functools import total_ordering
+
+from sizebot.lib.decimal import Decimal, unwrapDecimal
+
+__all__ = ["LogValue"]
+
+LN10 = math.log(10)
+FLOAT_MAX_LOG = math.log10(sys.float_info.max)
+
+
+@total_ordering
+class LogValue:
+    """A number stored as the log10 of its magnitude, and its sign
+
+    Multiplying, dividing and raising to a power are float additions and multiplications, no matter how big or small
+    the numbers get, so these are much faster than Decimals for chains of scaling.
+    A float only keeps about 15 significant digits, so these are only used where that error is acceptable (the
+    per-tick multiplier of slow changes), and Decimals are kept for everything that's stored or shown.
+
+    Zero has a sign of 0 and a log of -inf. Infinity has a log of inf.
+    """
+    __slots__ = ["log", "sign"]
+
+    def __init__(self, value):
+        if isinstance(value, LogValue):
+            self.log, self.sign = value.log, value.sign
+            return
+        value = unwrapDecimal(value)
+        if not isinstance(value, (int, float)):
+            value = RawDecimal(value)
+        if value != value:
+            raise ValueError("LogValue can't be NaN")
+        if value == 0:
+            self.log, self.sign = -math.inf, 0
+            return
+        self.sign = -1 if value < 0 else 1
+        if not isinstance(value, RawDecimal):
+            self.log = math.log10(abs(value))
+        elif value.is_infinite():
+            self.log = math.inf
+        else:
+            # Split off the exponent, so values outside of a float's range still work
+            exponent = value.adjusted()
+            self.log = exponent + math.log10(abs(float(value.scaleb(-exponent))))
+
+    @classmethod
+    def fromLog(cls, log, sign = 1):
+        """Make a LogValue straight from log10(abs(value))"""
+        self = cls.__new__(cls)
+        if sign == 0 or log == -math.inf:
+            self.log, self.sign = -math.inf, 0
+        else:
+            self.log, self.sign = log, sign
+        return self
+
+    def toRawDecimal(self):
+        if self.sign == 0:
+            return RawDecimal(0)
+        if self.log == math.inf:
+            return RawDecimal("infinity") * self.sign
+        exponent = math.floor(self.log)
+        mantissa = 10 ** (self.log - exponent) * self.sign
+        return RawDecimal(f"{mantissa!r}e{exponent}")
+
+    def toDecimal(self):
+        """Convert back to a Decimal, with about 15 significant digits"""
+        return Decimal(self.toRawDecimal())
+
+    def __mul__(self, other):
+        if not isinstance(other, LogValue):
+            other = LogValue(other)
+        return LogValue.fromLog(self.log + other.log, self.sign * other.sign)
+
+    __rmul__ = __mul__
+
+    def __truediv__(self, other):
+        if not isinstance(other, LogValue):
+            other = LogValue(other)
+        if other.sign == 0:
+            raise ZeroDivisionError("LogValue division by zero")
+        return LogValue.fromLog(self.log - other.log, self.sign * other.sign)
+
+    def __rtruediv__(self, other):
+        return LogValue(other) / self
+
+    def __pow__(self, exponent):
+        exponent = float(exponent)
+        if self.sign == 0:
+            if exponent < 0:
+                raise ZeroDivisionError("LogValue zero to a negative power")
+            return LogValue(1) if exponent == 0 else self
+        sign = 1
+        if self.sign < 0:
+            if not exponent.is_integer():
+                raise ValueError("LogValue negative number to a fractional power")
+            sign = -1 if exponent % 2 else 1
+        return LogValue.fromLog(self.log * exponent, sign)
+
+    def __add__(self, other):
+        other = LogValue(other)
+        if other.sign == 0:
+            return self
+        if self.sign == 0:
+            return other
+        big, small = (self, other) if self.log >= other.log else (other, self)
+        if big.log == math.inf:
+            if small.log == math.inf and small.sign != big.sign:
+                raise ValueError("LogValue infinity minus infinity")
+            return big
+        ratio = 10 ** (small.log - big.log)
+        if big.sign == small.sign:
+            return LogValue.fromLog(big.log + math.log1p(ratio) / LN10, big.sign)
+        if ratio == 1:
+            return LogValue(0)
+        return LogValue.fromLog(big.log + math.log1p(-ratio) / LN10, big.sign)
+
+    __radd__ = __add__
+
+    def __sub__(self, other):
+        return self + -LogValue(other)
+
+    def __rsub__(self, other):
+        return LogValue(other) + -self
+
+    def __neg__(self):
+        return LogValue.fromLog(self.log, -self.sign)
+
+    def __abs__(self):
+        return LogValue.fromLog(self.log, abs(self.sign))
+
+    def __bool__(self):
+        return self.sign != 0
+
+    def __float__(self):
+        if self.sign == 0:
+            return 0.0
+        # Past a float's range, 10 ** log overflows
+        if self.log > FLOAT_MAX_LOG:
+            return self.sign * math.inf
+        return self.sign * 10 ** self.log
+
+    def _key(self):
+        return (self.sign, self.sign * self.log if self.sign else 0)
+
+    def __eq__(self, other):
+        if not isinstance(other, LogValue):
+            try:
+                other = LogValue(other)
+            except (TypeError, ValueError, ArithmeticError):
+                return NotImplemented
+        return self._key() == other._key()
+
+    def __lt__(self, other):
+        return self._key() < LogValue(other)._key()
+
+    def __hash__(self):
+        return hash(self._key())
+
+    def __repr__(self):
+        return f"LogValue({self.toDecimal()})"
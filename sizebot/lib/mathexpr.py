@@ -0,0 +1,98 @@
+import ast
+import math
+import operator
+from functools import lru_cache
+
+# Biggest power allowed (in bits), so a roll can't make python build a number with millions of digits
+MAX_POWER_BITS = 10000
+
+
+class UnsafeExpressionError(ValueError):
+    pass
+
+
+def safePow(base, exponent):
+    # Float powers raise OverflowError on their own, and 0, 1 and -1 can be raised to anything
+    if isinstance(base, int) and isinstance(exponent, int) and abs(base) > 1:
+        if abs(base).bit_length() * exponent > MAX_POWER_BITS:
+            raise UnsafeExpressionError(f"{base} ** {exponent} is too big")
+    return base ** exponent
+
+
+binaryops = {
+    ast.Add: operator.add,
+    ast.Sub: operator.sub,
+    ast.Mult: operator.mul,
+    ast.Div: operator.truediv,
+    ast.FloorDiv: operator.floordiv,
+    ast.Mod: operator.mod,
+    ast.Pow: safePow
+}
+
+unaryops = {
+    ast.UAdd: operator.pos,
+    ast.USub: operator.neg
+}
+
+functions = {
+    "abs": abs,
+    "sqrt": math.sqrt,
+    "floor": math.floor,
+    "ceil": math.ceil,
+    "exp": math.exp,
+    "log": math.log,
+    "log10": math.log10,
+    "sin": math.sin,
+    "cos": math.cos,
+    "tan": math.tan
+}
+
+
+def _compileNode(node, names):
+    """Turn an AST node into a function of the values of `names`"""
+    if isinstance(node, ast.Expression):
+        return _compileNode(node.body, names)
+
+    if isinstance(node, ast.Constant) and type(node.value) in (int, float):
+        value = node.value
+        return lambda values: value
+
+    if isinstance(node, ast.Name) and node.id in names:
+        index = names.index(node.id)
+        return lambda values: values[index]
+
+    if isinstance(node, ast.BinOp) and type(node.op) in binaryops:
+        op = binaryops[type(node.op)]
+        left = _compileNode(node.left, names)
+        right = _compileNode(node.right, names)
+        return lambda values: op(left(values), right(values))
+
+    if isinstance(node, ast.UnaryOp) and type(node.op) in unaryops:
+        op = unaryops[type(node.op)]
+        operand = _compileNode(node.operand, names)
+        return lambda values: op(operand(values))
+
+    if (isinstance(node, ast.Call) and isinstance(node.func, ast.Name) and node.func.id in functions
+            and len(node.args) == 1 and not node.keywords):
+        fn = functions[node.func.id]
+        arg = _compileNode(node.args[0], names)
+        return lambda values: fn(arg(values))
+
+    raise UnsafeExpressionError(f"Unsupported expression: {ast.dump(node)}")
+
+
+@lru_cache(maxsize = 1024)
+def compileExpression(expression, names = ()):
+    """Compile an arithmetic expression into a function that takes a sequence of values for `names`
+
+    Only numbers, the names given, + - * / // % **, and a few math functions are allowed."""
+    try:
+        tree = ast.parse(expression.strip(), mode = "eval")
+    except SyntaxError as e:
+        raise UnsafeExpressionError(str(e))
+    return _compileNode(tree, names)
+
+
+def evaluate(expression, names = (), values = ()):
+    """Evaluate an arithmetic expression"""
+    return compileExpression(expression, tuple(names))(values)
@@ -3,6 +3,8 @@ import asyncio
 import discord
 from sizebot.discordplus import Embed
 
+from sizebot.lib import reactions
+from sizebot.lib.constants import emojis
 from sizebot.lib.errors import DigiException
 
 
@@ -54,28 +56,20 @@ class Menu:
     async def run(self):
         self.message = await self.ctx.send(self.initial_message, embed = self.initial_embed)
 
-        # Add all the reactions we need.
-        for option in self.options:
-            await self.message.add_reaction(option)
+        # All the reactions we need.
+        options = list(self.options)
         if self.cancel_emoji:
-            await self.message.add_reaction(self.cancel_emoji)
-
-        # Wait for requesting user to react to sent message with emojis.check or emojis.cancel
-        def check(reaction, reacter):
-            return reaction.message.id == self.message.id \
-                and (self.allow_any or reacter.id == self.menu_owner.id) \
-                and (
-                    str(reaction.emoji) == self.cancel_emoji
-                    or str(reaction.emoji) in self.options
-                )
+            options.append(self.cancel_emoji)
+        user = None if self.allow_any else self.menu_owner
 
         # Wait for a reaction.
         reaction = None
-        try:
-            reaction, reacter = await self.ctx.bot.wait_for("reaction_add", timeout=self.timeout, check=check)
-        except asyncio.TimeoutError:
-            # User took too long to respond
-            pass
+        async with reactions.listen(self.message, options, user = user, timeout = self.timeout) as waiter:
+            try:
+                reaction, reacter = await waiter.get()
+            except asyncio.TimeoutError:
+                # User took too long to respond
+                pass
 
         if self.delete_after:
             await self.message.delete()
@@ -100,6 +94,56 @@ class Menu:
         answer = await reactionmenu.run()
         return reactionmenu, answer
 
+
+class PagedMenu:
+    """Shows a list of embeds one page at a time, with reactions to flip between them.
+
+    Required Arguments:
+    ctx: A Discord context (discord.ext.commands.context.Context).
+    pages: a list of embeds.
+
+    Keyword Arguments:
+    timeout: when to stop accepting reactions (a seconds value as a float). Default = 120.0
+    """
+
+    def __init__(self, ctx, pages, *, timeout: float = 120):
+        self.ctx = ctx
+        self.pages = pages
+        self.timeout = timeout
+        self.page = 0
+        self.message = None
+
+    async def run(self):
+        self.message = await self.ctx.send(embed = self.pages[0])
+        if len(self.pages) == 1:
+            return
+
+        options = [emojis.previous, emojis.next]
+        async with reactions.listen(self.message, options, user = self.ctx.author, timeout = self.timeout) as waiter:
+            while True:
+                try:
+                    reaction, reacter = await waiter.get()
+                except asyncio.TimeoutError:
+                    break
+                step = -1 if str(reaction.emoji) == emojis.previous else 1
+                self.page = (self.page + step) % len(self.pages)
+                await self.message.edit(embed = self.pages[self.page])
+                try:
+                    await self.message.remove_reaction(reaction.emoji, reacter)
+                except discord.Forbidden:
+                    pass
+
+        try:
+            await self.message.clear_reactions()
+        except discord.Forbidden:
+            pass
+
+    @classmethod
+    async def display(cls, *args, **kwargs):
+        pagedmenu = cls(*args, **kwargs)
+        await pagedmenu.run()
+        return pagedmenu
+
 # class LoopingMenu:
 #     """Creates a reaction-based menu in a Discord message that can accept multiple inputs.
 
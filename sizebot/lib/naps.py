@@ -1,13 +1,17 @@
-import json
+import asyncio
 import logging
+import math
 import time
 
 from sizebot import conf
+from sizebot.lib import persistence, utils
 from sizebot.lib.decimal import Decimal
+from sizebot.lib.scheduler import scheduler
 
 logger = logging.getLogger("sizebot")
 
 
+# Keyed by (guildid, userid)
 _activeNannies = {}
 
 
@@ -17,15 +21,19 @@ class Nanny:
         self.guildid = guildid
         self.endtime = Decimal(endtime)
 
-    async def check(self, bot):
-        if time.time() < self.endtime:
-            return True
-        guild = await bot.fetch_guild(self.guildid)
-        member = await guild.fetch_member(self.userid)
+    async def wake(self, bot):
+        """Kick the user from voice, using the gateway cache where possible and only asking the API on a cache miss"""
+        guild = bot.get_guild(self.guildid)
+        member = guild and guild.get_member(self.userid)
+        if member is not None:
+            # Cached members have up-to-date voice states, so we can skip users who already went to bed
+            if member.voice is None:
+                return
+        else:
+            if guild is None:
+                guild = await bot.fetch_guild(self.guildid)
+            member = await guild.fetch_member(self.userid)
         await member.move_to(None, reason="Naptime!")
-        # member = bot.get_guild(self.guildid).get_member(self.memberid)
-        # TODO: Kick user from their voice channel
-        return False
 
     def toJson(self):
         return {
@@ -34,65 +42,69 @@ class Nanny:
             "endtime": str(self.endtime),
         }
 
+    def __str__(self):
+        return f"gid:{self.guildid}/uid:{self.userid} naptime in {self.endtime - Decimal(time.time()):.0f}s"
+
 
 def start(userid, guildid, durationTV):
     """Start a new naptime nanny"""
     endtime = Decimal(time.time()) + durationTV
     nanny = Nanny(userid, guildid, endtime)
     _activate(nanny)
+    saveToFile()
 
 
-def stop(userid):
+def stop(userid, guildid):
     """Stop a waiting naptime nanny"""
-    nanny = _deactivate(userid)
+    nanny = _deactivate(guildid, userid)
+    if nanny is not None:
+        saveToFile()
     return nanny
 
 
-async def check(bot):
-    """Have the nannies check their watches"""
-    global _activeNannies
-    runningNannies = {}
-    for userid, nanny in _activeNannies.items():
-        try:
-            running = await nanny.check(bot)
-            if running:
-                runningNannies[userid] = nanny
-        except Exception as e:
-            logger.error(e)
-    _activeNannies = runningNannies
+async def wake(bot, now):
+    """It's naptime! (Called by the scheduler, once per second that has nannies due)
+
+    Every nanny due by `now` is woken together, so a group bedtime is a single batch of disconnects."""
+    due = [n for n in _activeNannies.values() if n.endtime <= now]
+    if not due:
+        return
+    for nanny in due:
+        _deactivate(nanny.guildid, nanny.userid)
     saveToFile()
+    results = await asyncio.gather(*(n.wake(bot) for n in due), return_exceptions = True)
+    for nanny, result in zip(due, results):
+        if isinstance(result, Exception):
+            logger.error(f"Unable to put {nanny.userid} in guild {nanny.guildid} to bed:\n{utils.formatTraceback(result)}")
 
 
 def _activate(nanny):
     """Activate a new naptime nanny"""
-    _activeNannies[nanny.userid] = nanny
-    saveToFile()
+    _activeNannies[nanny.guildid, nanny.userid] = nanny
+    # Nap jobs are shared by every nanny due in the same second
+    second = int(math.ceil(nanny.endtime))
+    if scheduler.get("nap", second) is None:
+        scheduler.schedule("nap", second, second)
 
 
-def _deactivate(userid):
+def _deactivate(guildid, userid):
     """Deactivate a waiting naptime nanny"""
-    nanny = _activeNannies.pop(userid, None)
-    saveToFile()
-    return nanny
+    return _activeNannies.pop((guildid, userid), None)
 
 
 def loadFromFile():
     """Load all naptime nannies from file"""
-    try:
-        with open(conf.naptimepath, "r") as f:
-            nanniesJson = json.load(f)
-    except FileNotFoundError:
-        nanniesJson = []
+    nanniesJson = persistence.document(conf.naptimepath, list).get()
     for nannyJson in nanniesJson:
         nanny = Nanny(**nannyJson)
         _activate(nanny)
+    saveToFile()
 
 
 def saveToFile():
     """Save all naptime nannies to a file"""
     nanniesJson = [n.toJson() for n in _activeNannies.values()]
-    with open(conf.naptimepath, "w") as f:
-        json.dump(nanniesJson, f)
+    persistence.document(conf.naptimepath, list).set(nanniesJson)
 
 
 def formatSummary():
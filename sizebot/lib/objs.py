@@ -12,6 +12,9 @@ from sizebot.lib.language import getPlural, getIndefiniteArticle
 from sizebot.lib.units import SV, WV, Unit, SystemUnit
 
 objects = []
+# Every name, plural and alias of every object, lowercased, so finding an object by name is one lookup.
+# Built on first use.
+_objectsByName = None
 
 
 class DigiObject:
@@ -167,11 +170,14 @@ class DigiObject:
 
     @classmethod
     def findByName(cls, name):
-        lowerName = name.lower()
-        for o in objects:
-            if o == lowerName:
-                return o
-        return None
+        global _objectsByName
+        if _objectsByName is None:
+            _objectsByName = {}
+            for o in objects:
+                for n in [o.name.lower(), o.namePlural] + [a.lower() for a in o.aliases]:
+                    # The first object with a name wins, same as searching the list in order
+                    _objectsByName.setdefault(n, o)
+        return _objectsByName.get(name.lower())
 
     @classmethod
     def fromJson(cls, objJson):
@@ -194,8 +200,10 @@ def loadObjFile(filename):
 
 
 def loadObjJson(fileJson):
+    global _objectsByName
     for objJson in fileJson:
         objects.append(DigiObject.fromJson(objJson))
+    _objectsByName = None
 
 
 async def init():
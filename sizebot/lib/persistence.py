@@ -0,0 +1,136 @@
+import asyncio
+import json
+import logging
+import os
+import tempfile
+from pathlib import Path
+
+logger = logging.getLogger("sizebot")
+
+_documents = {}
+
+
+def atomicWrite(path, data):
+    """Write a file by writing a temporary file next to it and renaming it over the original
+
+    A crash mid-write leaves the old file intact, instead of a half-written one. data can be text or bytes."""
+    path.parent.mkdir(parents = True, exist_ok = True)
+    fd, tmppath = tempfile.mkstemp(dir = path.parent, prefix = f".{path.name}.", suffix = ".tmp")
+    try:
+        if isinstance(data, bytes):
+            f = os.fdopen(fd, "wb")
+        else:
+            f = os.fdopen(fd, "w", encoding = "utf-8")
+        with f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmppath, path)
+    except BaseException:
+        try:
+            os.remove(tmppath)
+        except FileNotFoundError:
+            pass
+        raise
+
+
+def _jsondumps(data):
+    return json.dumps(data, indent = 4)
+
+
+class Document:
+    """A small state file, kept in memory and written to disk in the background.
+
+    Reads come from memory after the first load. Saves made while the event loop is running are written
+    from a worker thread, after a short delay so that a burst of saves only writes the file once.
+    Outside of the event loop, saves are written immediately.
+
+    default: a function returning the data to use when the file doesn't exist or can't be parsed.
+    """
+    delay = 1
+
+    def __init__(self, path, default = dict, *, loads = json.loads, dumps = _jsondumps):
+        self.path = Path(path)
+        self.default = default
+        self.loads = loads
+        self.dumps = dumps
+        self._data = None
+        self._loaded = False
+        self._dirty = False
+        self._task = None
+
+    def get(self):
+        """Return the document's data"""
+        if not self._loaded:
+            self._data = self._read()
+            self._loaded = True
+        return self._data
+
+    def set(self, data):
+        """Replace the document's data, and save it"""
+        self._data = data
+        self._loaded = True
+        self.save()
+
+    def update(self, fn):
+        """Replace the document's data with fn(data), and save it"""
+        self.set(fn(self.get()))
+        return self._data
+
+    def save(self):
+        """Schedule the document to be written to disk"""
+        self._dirty = True
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            self.flush()
+            return
+        if self._task is None or self._task.done():
+            self._task = loop.create_task(self._writeLoop())
+
+    def flush(self):
+        """Write the document to disk now, if it has unsaved changes"""
+        if not self._dirty:
+            return
+        self._dirty = False
+        atomicWrite(self.path, self.dumps(self._data))
+
+    async def _writeLoop(self):
+        loop = asyncio.get_running_loop()
+        while self._dirty:
+            await asyncio.sleep(self.delay)
+            self._dirty = False
+            # Serialize on the loop, so the data can't change underneath us
+            try:
+                text = self.dumps(self._data)
+                await loop.run_in_executor(None, atomicWrite, self.path, text)
+            except Exception as e:
+                logger.error(f"Unable to save {self.path}: {e}")
+
+    def _read(self):
+        try:
+            with open(self.path, "r", encoding = "utf-8") as f:
+                return self.loads(f.read())
+        except FileNotFoundError:
+            return self.default()
+        except ValueError as e:
+            logger.error(f"Unable to load {self.path}, starting fresh: {e}")
+            return self.default()
+
+
+def document(path, default = dict, **kwargs):
+    """Return the Document for a path, creating it if it isn't open yet"""
+    path = Path(path)
+    doc = _documents.get(path)
+    if doc is None:
+        doc = _documents[path] = Document(path, default, **kwargs)
+    return doc
+
+
+def flush():
+    """Write every document with unsaved changes to disk"""
+    for doc in _documents.values():
+        try:
+            doc.flush()
+        except Exception as e:
+            logger.error(f"Unable to save {doc.path}: {e}")
@@ -339,16 +339,16 @@ class PersonComparison:  # TODO: Make a one-sided comparison option.
 
 class PersonStats:
     # Conversion constants
-    footfactor = 1 / Decimal("7")
-    footwidthfactor = footfactor / Decimal("2.5")
-    toeheightfactor = 1 / Decimal("65")
-    thumbfactor = 1 / Decimal("69.06")
-    fingerprintfactor = 1 / Decimal("35080")
-    hairfactor = 1 / Decimal("23387")
-    pointerfactor = 1 / Decimal("17.26")
-    nailthickfactor = 1 / Decimal("2920")
-    shoeprintfactor = 1 / Decimal("135")
-    eyewidthfactor = 1 / Decimal("73.083")
+    footfactor = Decimal.intern(1 / Decimal("7"))
+    footwidthfactor = Decimal.intern(footfactor / Decimal("2.5"))
+    toeheightfactor = Decimal.intern(1 / Decimal("65"))
+    thumbfactor = Decimal.intern(1 / Decimal("69.06"))
+    fingerprintfactor = Decimal.intern(1 / Decimal("35080"))
+    hairfactor = Decimal.intern(1 / Decimal("23387"))
+    pointerfactor = Decimal.intern(1 / Decimal("17.26"))
+    nailthickfactor = Decimal.intern(1 / Decimal("2920"))
+    shoeprintfactor = Decimal.intern(1 / Decimal("135"))
+    eyewidthfactor = Decimal.intern(1 / Decimal("73.083"))
 
     def __init__(self, userdata):
         self.nickname = userdata.nickname
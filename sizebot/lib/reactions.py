@@ -0,0 +1,125 @@
+import asyncio
+import logging
+import time
+
+import discord
+
+from sizebot.lib.scheduler import scheduler as defaultscheduler
+
+logger = logging.getLogger("sizebot")
+
+TIMEOUT = object()
+
+
+class ReactionWaiter:
+    """Waits for reactions on one message
+
+    Use as an async context manager, so the message stops being watched when you're done with it.
+    """
+
+    def __init__(self, router, message, emojis = None, *, user = None, timeout = 60, addreactions = True):
+        self.router = router
+        self.message = message
+        self.emojis = None if emojis is None else [str(e) for e in emojis]
+        self.userid = user and user.id
+        self.timeout = timeout
+        self.addreactions = addreactions
+        self._queue = asyncio.Queue()
+        self._addtask = None
+
+    def accepts(self, reaction, user):
+        if user.bot:
+            return False
+        if self.userid is not None and user.id != self.userid:
+            return False
+        return self.emojis is None or str(reaction.emoji) in self.emojis
+
+    async def get(self):
+        """Wait for the next reaction, returning (reaction, user). Raises asyncio.TimeoutError if it takes too long."""
+        if not self._queue.empty():
+            item = self._queue.get_nowait()
+        else:
+            self.router._setTimeout(self)
+            item = await self._queue.get()
+            self.router._clearTimeout(self)
+        if item is TIMEOUT:
+            raise asyncio.TimeoutError
+        return item
+
+    async def __aenter__(self):
+        self.router._add(self)
+        if self.addreactions and self.emojis:
+            # Start listening right away, and add the reactions in the background
+            self._addtask = asyncio.create_task(addReactions(self.message, self.emojis))
+        return self
+
+    async def __aexit__(self, *exc):
+        self.router._remove(self)
+        if self._addtask is not None and not self._addtask.done():
+            self._addtask.cancel()
+
+
+async def addReactions(message, emojis):
+    """Add reactions to a message in order, stopping quietly if the message goes away"""
+    try:
+        for emoji in emojis:
+            await message.add_reaction(emoji)
+    except discord.NotFound:
+        pass
+
+
+class ReactionRouter:
+    """Sends reactions to whoever is waiting on that message
+
+    Waiters are kept in a dict by message id, so each reaction is a single lookup, no matter how many menus are open.
+    Timeouts are scheduler jobs, so they all share one timer heap. The scheduler is started the first time a timeout
+    is set, if it isn't running yet, so waiters can't hang.
+    """
+
+    def __init__(self, scheduler = defaultscheduler):
+        self.scheduler = scheduler
+        self._waiters = {}
+        self.scheduler.register("reactiontimeout", self._onTimeout)
+
+    def listen(self, message, emojis = None, **kwargs):
+        """Watch a message for reactions
+
+        emojis: the reactions to listen for (any, if None). They're added to the message, unless addreactions is False.
+        user: only listen for reactions from this user.
+        timeout: how long get() waits for a reaction, in seconds.
+        """
+        return ReactionWaiter(self, message, emojis, **kwargs)
+
+    async def on_reaction_add(self, reaction, user):
+        waiter = self._waiters.get(reaction.message.id)
+        if waiter is not None and waiter.accepts(reaction, user):
+            waiter._queue.put_nowait((reaction, user))
+
+    def _add(self, waiter):
+        self._waiters[waiter.message.id] = waiter
+
+    def _remove(self, waiter):
+        if self._waiters.get(waiter.message.id) is waiter:
+            del self._waiters[waiter.message.id]
+        self._clearTimeout(waiter)
+
+    def _setTimeout(self, waiter):
+        if not self.scheduler.running:
+            logger.warning("Reaction timeout set before the scheduler started, starting it now.")
+            self.scheduler.start()
+        self.scheduler.schedule("reactiontimeout", waiter.message.id, time.time() + waiter.timeout)
+
+    def _clearTimeout(self, waiter):
+        self.scheduler.cancel("reactiontimeout", waiter.message.id)
+
+    async def _onTimeout(self, job):
+        waiter = self._waiters.get(job.key)
+        if waiter is not None:
+            waiter._queue.put_nowait(TIMEOUT)
+
+
+router = ReactionRouter()
+
+
+def listen(message, emojis = None, **kwargs):
+    return router.listen(message, emojis, **kwargs)
@@ -1,13 +1,35 @@
-import random
 import re
+from functools import lru_cache
 
-import numexpr
+import numpy as np
 
-from sizebot.lib import errors
+from sizebot import conf
+from sizebot.lib import errors, mathexpr
 
+rng = np.random.default_rng()
+# numpy can't draw integers any bigger than this
+MAX_SIDES = np.iinfo(np.int64).max
+# Most possible totals a distribution can cover
+MAX_OUTCOMES = 1000000
+# Limits for the keep-highest DP: how many floats it can hold at once (128MiB), and roughly how many
+# multiply-adds it can do (a second or two)
+MAX_DP_CELLS = 2 ** 24
+MAX_DP_OPS = 2 * 10 ** 10
+# Convolutions that would take more multiplications than this use FFTs instead
+FFT_THRESHOLD = 2 ** 20
+# Most dice to list when showing a roll, for each of the used and dropped dice
+MAX_SHOWN_DICE = 50
 
-def evalmath(expression):
-    return int(numexpr.evaluate(expression, local_dict={}, global_dict={}))
+
+def formatDice(dice):
+    shown = ", ".join(str(d) for d in dice[:MAX_SHOWN_DICE].tolist())
+    if len(dice) > MAX_SHOWN_DICE:
+        shown += f" ...and {len(dice) - MAX_SHOWN_DICE:,} more"
+    return shown
+
+
+def evalmath(expression, names = (), values = ()):
+    return int(mathexpr.evaluate(expression, names, values))
 
 
 class RollArg:
@@ -21,20 +43,14 @@ class RollArg:
         self.drop = drop
 
     def roll(self):
-        # roll the dice
-        rolls = [random.randint(1, self.sides) for _ in range(self.rolls)]
-        # get list of lowest dice to drop
-        lowest = sorted(rolls)[:self.drop]
-        # make lists of used and dropped rolls, in the order they were rolled
-        used = []
-        dropped = []
-        for r in rolls:
-            if r in lowest:
-                lowest.remove(r)
-                dropped.append(r)
-            else:
-                used.append(r)
-        return RollResult(used, dropped)
+        # roll all the dice at once
+        rolls = rng.integers(1, self.sides, size = self.rolls, endpoint = True)
+        # find the lowest dice to drop, without sorting all of them
+        dropmask = np.zeros(self.rolls, dtype = bool)
+        if self.drop > 0:
+            dropmask[np.argpartition(rolls, self.drop - 1)[:self.drop]] = True
+        # make arrays of used and dropped rolls, in the order they were rolled
+        return RollResult(rolls[~dropmask], rolls[dropmask], self.sides)
 
     @classmethod
     def parse(cls, s):
@@ -56,16 +72,20 @@ class RollArg:
 class RollResult:
     __slots__ = ["total", "used", "dropped"]
 
-    def __init__(self, used, dropped):
-        self.total = sum(used)
+    def __init__(self, used, dropped, sides):
+        if len(used) * sides <= MAX_SIDES:
+            self.total = int(used.sum())
+        else:
+            # The sum might overflow an int64, so add them up as python ints instead
+            self.total = sum(used.tolist())
         self.used = used
         self.dropped = dropped
 
     def __str__(self):
         output = (f"    Total: {self.total}\n"
-                  f"    Used: {self.used}\n")
+                  f"    Used: [{formatDice(self.used)}]\n")
         if len(self.dropped) > 0:
-            output += f"    Dropped: {self.dropped}\n"
+            output += f"    Dropped: [{formatDice(self.dropped)}]\n"
         return output
 
 
@@ -86,19 +106,226 @@ class Result:
 def roll(argstring):
     # Split up and categorize parameters
     argstrings = RollArg.re_pattern_all.split(argstring)
+    rollargs = [RollArg.parse(s) for s in argstrings]
+
+    # Check the limits before rolling anything
+    dicecount = sum(r.rolls for r in rollargs if r is not None)
+    if dicecount > conf.maxdice:
+        raise errors.TooManyDiceException(dicecount, conf.maxdice)
+    if any(r is not None and not (1 <= r.sides <= MAX_SIDES) for r in rollargs):
+        raise errors.InvalidRollException(argstring)
+
+    # Swap each dice term for a name, so the expression is the same for every roll of this string, and only
+    # has to be compiled once
     rolls = []
-    rollexpr = ""
-    for s in argstrings:
-        rollarg = RollArg.parse(s)
+    names = []
+    template = ""
+    for s, rollarg in zip(argstrings, rollargs):
         if rollarg is not None:
-            result = rollarg.roll()
-            rolls.append(result)
-            s = result.total
-        rollexpr += str(s)
+            rolls.append(rollarg.roll())
+            s = f"_roll{len(names)}"
+            names.append(s)
+        template += s
 
     try:
-        total = evalmath(rollexpr)
+        total = evalmath(template, names, [r.total for r in rolls])
     except Exception:
         raise errors.InvalidRollException(argstring)
 
     return Result(total, rolls)
+
+
+class Distribution:
+    """Probability distribution of an integer total
+
+    pmf[i] is the probability that the total is offset + i."""
+    __slots__ = ["offset", "pmf"]
+
+    def __init__(self, offset, pmf):
+        self.offset = offset
+        self.pmf = pmf
+        self.pmf.flags.writeable = False
+
+    @classmethod
+    def constant(cls, value):
+        return cls(value, np.ones(1))
+
+    @property
+    def min(self):
+        return self.offset
+
+    @property
+    def max(self):
+        return self.offset + len(self.pmf) - 1
+
+    @property
+    def mean(self):
+        return self.offset + float(np.dot(np.arange(len(self.pmf)), self.pmf))
+
+    def probability(self, total):
+        """Probability that the total is exactly `total`"""
+        i = total - self.offset
+        if not 0 <= i < len(self.pmf):
+            return 0.0
+        return float(self.pmf[i])
+
+    def atLeast(self, total):
+        """Probability that the total is `total` or more"""
+        i = max(0, total - self.offset)
+        return float(min(1.0, self.pmf[i:].sum()))
+
+    def percentile(self, p):
+        """Smallest total that at least p (between 0 and 1) of rolls will be at or below"""
+        cdf = np.cumsum(self.pmf)
+        i = int(np.searchsorted(cdf, p - 1e-12))
+        return self.offset + min(i, len(self.pmf) - 1)
+
+    def __add__(self, other):
+        return Distribution(self.offset + other.offset, convolve(self.pmf, other.pmf))
+
+    def __neg__(self):
+        return Distribution(-self.max, self.pmf[::-1].copy())
+
+    def __sub__(self, other):
+        return self + (-other)
+
+
+def convolve(a, b):
+    """Convolve two pmfs, using FFTs for large ones"""
+    if len(a) * len(b) < FFT_THRESHOLD:
+        return np.convolve(a, b)
+    size = len(a) + len(b) - 1
+    # FFTs are much faster on power of two lengths
+    fftsize = 1 << (size - 1).bit_length()
+    result = np.fft.irfft(np.fft.rfft(a, fftsize) * np.fft.rfft(b, fftsize), fftsize)[:size]
+    # FFT rounding can leave tiny negative probabilities
+    result = np.clip(result, 0, None)
+    return result / result.sum()
+
+
+def _logFactorials(n):
+    return np.concatenate(([0.0], np.cumsum(np.log(np.arange(1, n + 1)))))
+
+
+def _binomialPMF(n, p, logfactorials):
+    """Probability of each number of successes, from 0 to n"""
+    if p >= 1:
+        pmf = np.zeros(n + 1)
+        pmf[n] = 1
+        return pmf
+    c = np.arange(n + 1)
+    logpmf = logfactorials[n] - logfactorials[c] - logfactorials[n - c] + c * np.log(p) + (n - c) * np.log1p(-p)
+    return np.exp(logpmf)
+
+
+def _keepHighestPMF(rolls, sides, keep):
+    """pmf of the sum of the highest `keep` of `rolls` dice, from 0
+
+    Works through the faces from highest to lowest, tracking how many dice have been seen so far (all of them
+    showing that face or higher) and the sum of the ones kept. Once `keep` dice have been seen, the rest don't
+    matter, so those states are moved into the final pmf."""
+    logfactorials = _logFactorials(rolls)
+    size = keep * sides + 1
+    # states[j] is the pmf of the kept sum, given that j (< keep) dice have been seen so far
+    states = np.zeros((keep, size))
+    states[0, 0] = 1
+    final = np.zeros(size)
+    for face in range(sides, 0, -1):
+        # transitions[j, j2]: probability of going from j dice seen to j2, if j2 < keep
+        transitions = np.zeros((keep, keep))
+        for seen in range(keep):
+            # How many of the remaining dice show this face, given that none of them show anything higher
+            counts = _binomialPMF(rolls - seen, 1 / face, logfactorials)
+            notdone = keep - seen
+            transitions[seen, seen:] = counts[:notdone]
+            done = counts[notdone:].sum()
+            shift = notdone * face
+            final[shift:] += done * states[seen, :size - shift]
+        # Going from j to j2 seen adds (j2 - j) * face to the sum. Shifting each row j left by j * face makes
+        # that the same for every pair, so the whole step is one matrix product.
+        pad = keep * face
+        aligned = np.zeros((keep, size + pad))
+        for seen in range(keep):
+            aligned[seen, pad - seen * face:pad - seen * face + size] = states[seen]
+        aligned = transitions.T @ aligned
+        for seen in range(keep):
+            states[seen] = aligned[seen, pad - seen * face:pad - seen * face + size]
+    return final
+
+
+def _keepHighestCost(rolls, sides, keep):
+    """Estimate the memory (in floats) and work (in multiply-adds) _keepHighestPMF needs, without running it"""
+    size = keep * sides + 1
+    # states, plus the widest aligned array
+    cells = keep * size + keep * (size + keep * sides)
+    # A keep x keep matrix product over each aligned array, plus the binomials, for every face
+    ops = sides * (keep * keep * (size + keep * sides) + keep * rolls)
+    return cells, ops
+
+
+@lru_cache(maxsize = 256)
+def termDistribution(rolls, sides, drop):
+    """Distribution of a single dice term, like 4d6k3"""
+    keep = rolls - drop
+    if keep == 0:
+        return Distribution.constant(0)
+    if drop == 0:
+        # Square and multiply, so 1000d6 takes ~10 convolutions instead of 1000
+        result = Distribution.constant(0)
+        die = Distribution(1, np.full(sides, 1 / sides))
+        n = rolls
+        while n:
+            if n & 1:
+                result = result + die
+            n >>= 1
+            if n:
+                die = die + die
+        return result
+    pmf = _keepHighestPMF(rolls, sides, keep)
+    return Distribution(keep, pmf[keep:].copy())
+
+
+re_term = re.compile(r"\s*([+-])?\s*(?:(\d+d\d+(?:[dk]\d+)?)|(\d+))\s*")
+
+
+def distribution(argstring):
+    """Exact distribution of the total of a roll string
+
+    Only sums and differences of dice and numbers are supported."""
+    pos = 0
+    total = Distribution.constant(0)
+    outcomes = 1
+    while pos < len(argstring):
+        match = re_term.match(argstring, pos)
+        sign, dice, number = match.groups() if match else (None, None, None)
+        if match is None or (pos > 0 and sign is None):
+            raise errors.UnsupportedRollDistributionException(argstring)
+        pos = match.end()
+
+        if dice is not None:
+            rollarg = RollArg.parse(dice)
+            if rollarg.sides < 1:
+                raise errors.InvalidRollException(argstring)
+            outcomes += (rollarg.rolls - rollarg.drop) * (rollarg.sides - 1)
+            if outcomes > MAX_OUTCOMES or rollarg.rolls > conf.maxdice:
+                raise errors.UnsupportedRollDistributionException(argstring)
+            keep = rollarg.rolls - rollarg.drop
+            if rollarg.drop and keep:
+                cells, ops = _keepHighestCost(rollarg.rolls, rollarg.sides, keep)
+                if cells > MAX_DP_CELLS or ops > MAX_DP_OPS:
+                    raise errors.UnsupportedRollDistributionException(argstring)
+            try:
+                term = termDistribution(rollarg.rolls, rollarg.sides, rollarg.drop)
+            except MemoryError:
+                raise errors.UnsupportedRollDistributionException(argstring)
+        else:
+            term = Distribution.constant(int(number))
+
+        if sign == "-":
+            total = total - term
+        else:
+            total = total + term
+
+    if pos == 0:
+        raise errors.InvalidRollException(argstring)
+    return total
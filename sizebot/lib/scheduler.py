@@ -0,0 +1,253 @@
+import asyncio
+import heapq
+import itertools
+import logging
+import time
+
+from sizebot import conf
+from sizebot.lib import persistence, utils
+
+logger = logging.getLogger("sizebot")
+
+
+class Job:
+    """Something to run at a deadline (a unix timestamp)
+
+    Jobs with data are saved to disk, and picked back up after a restart. data must be json-serializable.
+    They're saved when they're scheduled or cancelled, not each time they run, so a job that was running when the bot
+    stopped is just run straight away after a restart."""
+    __slots__ = ["kind", "key", "deadline", "interval", "data", "cancelled", "seq"]
+
+    def __init__(self, kind, key, deadline, *, interval = None, data = None, seq = 0):
+        self.kind = kind
+        self.key = key
+        self.deadline = deadline
+        self.interval = interval
+        self.data = data
+        self.cancelled = False
+        self.seq = seq
+
+    def __lt__(self, other):
+        return (self.deadline, self.seq) < (other.deadline, other.seq)
+
+    def __str__(self):
+        return f"{self.kind}/{self.key} in {self.deadline - time.time():.1f}s" + (f" every {self.interval}s" if self.interval else "")
+
+    def toJSON(self):
+        return {
+            "kind": self.kind,
+            "key": self.key,
+            "deadline": self.deadline,
+            "interval": self.interval,
+            "data": self.data
+        }
+
+    @classmethod
+    def fromJSON(cls, jsondata):
+        key = jsondata["key"]
+        if isinstance(key, list):
+            key = tuple(key)
+        return cls(jsondata["kind"], key, jsondata["deadline"], interval = jsondata["interval"], data = jsondata["data"])
+
+
+class Lateness:
+    """How late jobs have been run, in seconds"""
+    __slots__ = ["count", "total", "max", "last"]
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.last = 0.0
+
+    def add(self, seconds):
+        self.count += 1
+        self.total += seconds
+        self.max = max(self.max, seconds)
+        self.last = seconds
+
+    @property
+    def mean(self):
+        if self.count == 0:
+            return 0.0
+        return self.total / self.count
+
+
+class Scheduler:
+    """Runs jobs at their deadlines, sleeping until the next one is due
+
+    Jobs are kept in a min-heap by deadline. Each job has a kind, which decides which handler runs it, and a key that
+    is unique within that kind. Scheduling a job with the same kind and key replaces the old one. Cancelled jobs are
+    just marked, and skipped when they reach the top of the heap.
+
+    A handler is a coroutine function that takes the job. If it returns a unix timestamp, the job is run again then.
+    Otherwise, if the job has an interval, it's run again after that interval, unless the handler returns False.
+
+    clock: returns the current unix timestamp. Tests can pass a fake one, and call _wake() after changing it.
+    """
+
+    def __init__(self, clock = time.time):
+        self._clock = clock
+        self._heap = []
+        self._jobs = {}
+        self._handlers = {}
+        # Due jobs that don't have a handler registered yet
+        self._orphans = []
+        self._seq = itertools.count()
+        self._wakeup = None
+        self._task = None
+        self.lateness = Lateness()
+
+    @property
+    def running(self):
+        return self._task is not None
+
+    @property
+    def depth(self):
+        """How many jobs are waiting to run"""
+        return len(self._jobs)
+
+    def register(self, kind, handler):
+        """Set the handler for a kind of job"""
+        self._handlers[kind] = handler
+        orphans = [j for j in self._orphans if j.kind == kind]
+        self._orphans = [j for j in self._orphans if j.kind != kind]
+        for job in orphans:
+            if not job.cancelled:
+                self._push(job)
+
+    def unregister(self, kind):
+        self._handlers.pop(kind, None)
+
+    def schedule(self, kind, key, deadline, *, interval = None, data = None):
+        """Schedule a job to run at deadline (a unix timestamp), replacing any job with the same kind and key"""
+        self._remove(kind, key)
+        job = Job(kind, key, deadline, interval = interval, data = data, seq = next(self._seq))
+        self._push(job)
+        if data is not None:
+            self._save()
+        return job
+
+    def cancel(self, kind, key):
+        """Cancel a job, returning it (or None if there wasn't one)"""
+        job = self._remove(kind, key)
+        if job is not None and job.data is not None:
+            self._save()
+        return job
+
+    def reschedule(self, kind, key, deadline):
+        """Move a job to a new deadline"""
+        job = self._jobs.get((kind, key))
+        if job is None:
+            return None
+        return self.schedule(kind, key, deadline, interval = job.interval, data = job.data)
+
+    def get(self, kind, key):
+        return self._jobs.get((kind, key))
+
+    def jobs(self, kind = None):
+        return sorted(j for j in self._jobs.values() if kind is None or j.kind == kind)
+
+    def start(self):
+        """Load saved jobs, and start running jobs. Must be called from inside the event loop."""
+        if self._task is not None:
+            return
+        for jobJson in persistence.document(conf.schedulepath, list).get():
+            job = Job.fromJSON(jobJson)
+            # Jobs scheduled since the bot started take priority over saved ones
+            if (job.kind, job.key) not in self._jobs:
+                job.seq = next(self._seq)
+                self._push(job)
+        self._wakeup = asyncio.Event()
+        self._task = asyncio.create_task(self._loop())
+
+    def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    def formatSummary(self):
+        return "\n".join(str(j) for j in self.jobs())
+
+    def _push(self, job):
+        self._jobs[(job.kind, job.key)] = job
+        heapq.heappush(self._heap, job)
+        if self._heap[0] is job:
+            self._wake()
+
+    def _remove(self, kind, key):
+        job = self._jobs.pop((kind, key), None)
+        if job is not None:
+            job.cancelled = True
+            # Don't let cancelled jobs pile up in the heap
+            if len(self._heap) > 64 and len(self._heap) > 2 * len(self._jobs):
+                self._heap = [j for j in self._heap if not j.cancelled]
+                heapq.heapify(self._heap)
+        return job
+
+    def _wake(self):
+        if self._wakeup is not None:
+            self._wakeup.set()
+
+    def _save(self):
+        jobsJson = [j.toJSON() for j in self._jobs.values() if j.data is not None]
+        persistence.document(conf.schedulepath, list).set(jobsJson)
+
+    def _popDue(self, now):
+        """Pop every job that's due"""
+        due = []
+        while self._heap and (self._heap[0].cancelled or self._heap[0].deadline <= now):
+            job = heapq.heappop(self._heap)
+            if job.cancelled:
+                continue
+            if job.kind in self._handlers:
+                due.append(job)
+            else:
+                self._orphans.append(job)
+        return due
+
+    async def _loop(self):
+        while True:
+            self._wakeup.clear()
+            now = self._clock()
+            for job in self._popDue(now):
+                self.lateness.add(now - job.deadline)
+                asyncio.create_task(self._run(job))
+
+            # Sleep until the next deadline, or until something changes
+            timeout = None
+            if self._heap:
+                timeout = max(0, self._heap[0].deadline - self._clock())
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout)
+            except asyncio.TimeoutError:
+                pass
+
+    async def _run(self, job):
+        handler = self._handlers[job.kind]
+        try:
+            result = await handler(job)
+        except Exception as err:
+            logger.error(f"Error in scheduled job {job.kind}/{job.key}:\n{utils.formatTraceback(err)}")
+            result = None
+
+        # The job might have been cancelled or replaced while it was running
+        if self._jobs.get((job.kind, job.key)) is not job:
+            return
+
+        if isinstance(result, (int, float)) and not isinstance(result, bool):
+            nextdeadline = result
+        elif job.interval and result is not False:
+            nextdeadline = job.deadline + job.interval
+            # If we fell behind, skip the missed runs instead of running them all at once
+            if nextdeadline < self._clock():
+                nextdeadline = self._clock() + job.interval
+        else:
+            self.cancel(job.kind, job.key)
+            return
+        # Only the deadline changed, so the saved jobs aren't rewritten
+        self._remove(job.kind, job.key)
+        self._push(Job(job.kind, job.key, nextdeadline, interval = job.interval, data = job.data, seq = next(self._seq)))
+
+
+scheduler = Scheduler()
@@ -0,0 +1,175 @@
+import re
+
+FRACTIONS = "⅛¼⅜½⅝¾⅞"
+SI_PREFIXES = "YZEPTGMkcmnpfazy"
+MICRO = "µ"
+ZERO_SIZES = "0∞"
+
+# The old sizetag regex. It backtracks badly on some nicknames, so it's only kept as the reference the parser is fuzzed
+# against (see scripts/fuzzsizetag.py).
+re_sizetag = re.compile(r"""
+\s+\[  # start with a left bracket
+# the size bit
+(
+    # a standard quantity + unit
+    (
+        # the quantity bit
+        (
+            (\d{1,3},)*      # which might have some groups of numbers with commas
+            (\d+|[⅛¼⅜½⅝¾⅞])  # but it will definitely have a group of numbers in it, or a single fraction
+            # maybe even a fraction or decimal part
+            (
+                \.\d+       # decimal
+                |[⅛¼⅜½⅝¾⅞]  # or fractional
+            )?
+            # it might even have Es
+            (
+                [Ee]   # uppercase or lowercase E
+                [-+]?  # it might have a sign
+                \d+    # E values are always integers
+            )?
+        )
+        # the unit bit
+        (
+            [YZEPTGMkcmµnpfazy]?    # might have a SI prefix
+            [a-zA-Z]{1,3}           # between 1-3 letters
+            |[\'\"]                 # or ' or "
+        )
+    ){1,2}  # either 1 or 2 units per tag
+    |0      # or the whole unit can just be zero
+    |∞   # or infinity
+)
+# the species bit (optional)
+(,\s*.+)?   # a comma, a space, and some characters
+# and a right bracket at the end of the name
+\]$
+""", re.VERBOSE)
+
+
+class SizeTag:
+    """A nickname split into its name, and the size and species from its trailing [size, species] tag"""
+    __slots__ = ["name", "size", "species"]
+
+    def __init__(self, name, size, species = None):
+        self.name = name
+        self.size = size
+        self.species = species
+
+    def __repr__(self):
+        return f"SizeTag({self.name!r}, {self.size!r}, {self.species!r})"
+
+
+def _isAsciiLetter(c):
+    return "a" <= c <= "z" or "A" <= c <= "Z"
+
+
+def _skipDigits(s, i):
+    while i < len(s) and s[i].isdecimal():
+        i += 1
+    return i
+
+
+def _skipLetters(s, i):
+    while i < len(s) and _isAsciiLetter(s[i]):
+        i += 1
+    return i
+
+
+def _numberEnds(s, i):
+    """Yield every position where a number starting at s[i] could end
+
+    The only real choices are how many comma groups there are, and whether a trailing E is an exponent or a unit.
+    Everything else is greedy, since nothing that can follow it could start with a digit."""
+    starts = [i]
+    j = i
+    while True:
+        k = _skipDigits(s, j)
+        if not (1 <= k - j <= 3 and k < len(s) and s[k] == ","):
+            break
+        j = k + 1
+        starts.append(j)
+
+    for start in starts:
+        if start < len(s) and s[start] in FRACTIONS:
+            end = start + 1
+        else:
+            end = _skipDigits(s, start)
+            if end == start:
+                continue
+        # Decimal or fractional part
+        if end < len(s) and s[end] == "." and _skipDigits(s, end + 1) > end + 1:
+            end = _skipDigits(s, end + 1)
+        elif end < len(s) and s[end] in FRACTIONS:
+            end += 1
+        yield end
+        # Exponent
+        if end < len(s) and s[end] in "Ee":
+            k = end + 1
+            if k < len(s) and s[k] in "+-":
+                k += 1
+            e = _skipDigits(s, k)
+            if e > k:
+                yield e
+
+
+def _unitEnd(s, i):
+    """Return where a unit starting at s[i] ends, or None
+
+    A unit is always followed by a digit, a comma or the closing bracket, so it has to use up every letter in a row."""
+    if i >= len(s):
+        return None
+    if s[i] in "'\"":
+        return i + 1
+    if s[i] == MICRO:
+        end = _skipLetters(s, i + 1)
+        return end if 1 <= end - (i + 1) <= 3 else None
+    end = _skipLetters(s, i)
+    maxlen = 4 if s[i] in SI_PREFIXES else 3
+    return end if 1 <= end - i <= maxlen else None
+
+
+def _sizeEnds(s, i):
+    """Yield every position where a size starting at s[i] could end"""
+    if i < len(s) and s[i] in ZERO_SIZES:
+        yield i + 1
+    for numberEnd in _numberEnds(s, i):
+        unitEnd = _unitEnd(s, numberEnd)
+        if unitEnd is None:
+            continue
+        yield unitEnd
+        for secondNumberEnd in _numberEnds(s, unitEnd):
+            secondUnitEnd = _unitEnd(s, secondNumberEnd)
+            if secondUnitEnd is not None:
+                yield secondUnitEnd
+
+
+def parseSizeTag(s):
+    """Find the [size, species] tag at the end of a nickname, returning a SizeTag, or None if there isn't a valid one
+
+    Scans right-to-left over the possible opening brackets, so the tag found is the last valid one. Sizes can't contain
+    whitespace or brackets, so every character is looked at a constant number of times."""
+    # The closing bracket, which might be followed by a single newline
+    last = len(s) - 1
+    if s.endswith("\n"):
+        last -= 1
+    if last < 0 or s[last] != "]":
+        return None
+
+    # The species (if there is one) can contain newlines, as long as they're all in the leading whitespace
+    lastNewline = s.rfind("\n", 0, last)
+    speciesStart = lastNewline
+    while speciesStart > 0 and s[speciesStart - 1].isspace():
+        speciesStart -= 1
+
+    bracket = s.rfind("[", 0, last)
+    while bracket > 0:
+        if s[bracket - 1].isspace():
+            for end in _sizeEnds(s, bracket + 1):
+                if end == last:
+                    return SizeTag(s[:bracket].rstrip(), s[bracket + 1:last])
+                if s[end] == ",":
+                    hasSpecies = end + 1 < last if lastNewline < end else (end + 1 >= speciesStart and lastNewline + 1 < last)
+                    if hasSpecies:
+                        return SizeTag(s[:bracket].rstrip(), s[bracket + 1:end], s[end + 1:last].lstrip())
+        bracket = s.rfind("[", 0, bracket)
+    return None
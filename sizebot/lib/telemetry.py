@@ -1,6 +1,5 @@
-import json
-
 from sizebot import conf
+from sizebot.lib import persistence
 
 
 class Telemetry():
@@ -27,10 +26,7 @@ class Telemetry():
         self.permissionerrors[name] = count + 1
 
     def save(self):
-        conf.telemetrypath.parent.mkdir(exist_ok = True)
-        jsondata = self.toJSON()
-        with open(conf.telemetrypath, "w") as f:
-            json.dump(jsondata, f, indent = 4)
+        persistence.document(conf.telemetrypath).set(self.toJSON())
 
     def toJSON(self):
         """Return a python dictionary for json exporting"""
@@ -43,11 +39,7 @@ class Telemetry():
 
     @classmethod
     def load(cls):
-        try:
-            with open(conf.telemetrypath, "r") as f:
-                jsondata = json.load(f)
-        except FileNotFoundError:
-            return Telemetry()
+        jsondata = persistence.document(conf.telemetrypath).get()
         return Telemetry.fromJSON(jsondata)
 
     @classmethod
@@ -3,7 +3,7 @@ import importlib.resources as pkg_resources
 import json
 import logging
 import re
-from functools import total_ordering
+from functools import lru_cache, total_ordering
 
 import sizebot.data
 from sizebot.lib import errors, utils
@@ -284,6 +284,7 @@ class SystemRegistry():
     def getBestUnit(self, value):
         if not self.isSorted:
             self._systemunits.sort()
+            self.isSorted = True
         value = abs(value)
         # Pair each unit with the unit following it
         for sunit, nextsunit in zip(self._systemunits[:-1], self._systemunits[1:]):
@@ -297,6 +298,7 @@ class SystemRegistry():
     def getGoodUnit(self, value):
         if not self.isSorted:
             self._systemunits.sort()
+            self.isSorted = True
         systemunit = getRandomCloseUnit(value, self._systemunits)
         if systemunit is None:
             return self.getBestUnit(value)
@@ -344,33 +346,11 @@ class SystemUnit():
 
 class Dimension(Decimal):
     """Dimension"""
-    def __format__(self, spec):
-        value = Decimal(self)
-        dSpec = DecimalSpec.parse(spec)
-
-        systems = dSpec.type or ""
-
-        if systems and all(s.casefold() in self._systems.keys() for s in systems):
-            dSpec.type = None
-            numspec = str(dSpec)
-
-            formattedUnits = []
-            for s in systems:
-                preferName = s.upper() == s
-                system = self._systems[s.casefold()]
-                unit = system.getBestUnit(value)
-                formattedUnits.append(unit.format(value, numspec, preferName))
-
-            # Remove duplicates
-            uniqUnits = []
-            for u in formattedUnits:
-                if u not in uniqUnits:
-                    uniqUnits.append(u)
-            formatted = " / ".join(uniqUnits)
-        else:
-            formatted = format(value, spec)
+    __slots__ = ()
 
-        return formatted
+    def __format__(self, spec):
+        # Dimensions are immutable, so formatted strings can be cached
+        return _formatDimension(type(self), str(self), spec)
 
     @classmethod
     def parse(cls, s):
@@ -438,6 +418,7 @@ class Dimension(Decimal):
     @classmethod
     def addUnit(cls, unit):
         cls._units.addUnit(unit)
+        _formatDimension.cache_clear()
 
     @classmethod
     def addSystemUnitFromJson(cls, systemname, **kwargs):
@@ -448,6 +429,7 @@ class Dimension(Decimal):
     def addSystemUnit(cls, systemname, systemunit):
         system = cls.getOrAddSystem(systemname)
         system.addSystemUnit(systemunit)
+        _formatDimension.cache_clear()
 
     @classmethod
     def getOrAddSystem(cls, systemname):
@@ -458,8 +440,39 @@ class Dimension(Decimal):
         return system
 
 
+@lru_cache(maxsize = 4096)
+def _formatDimension(cls, value, spec):
+    value = Decimal(value)
+    dSpec = DecimalSpec.parse(spec)
+
+    systems = dSpec.type or ""
+
+    if systems and all(s.casefold() in cls._systems.keys() for s in systems):
+        dSpec.type = None
+        numspec = str(dSpec)
+
+        formattedUnits = []
+        for s in systems:
+            preferName = s.upper() == s
+            system = cls._systems[s.casefold()]
+            unit = system.getBestUnit(value)
+            formattedUnits.append(unit.format(value, numspec, preferName))
+
+        # Remove duplicates
+        uniqUnits = []
+        for u in formattedUnits:
+            if u not in uniqUnits:
+                uniqUnits.append(u)
+        formatted = " / ".join(uniqUnits)
+    else:
+        formatted = format(value, spec)
+
+    return formatted
+
+
 class SV(Dimension):
     """Size Value (length in meters)"""
+    __slots__ = ()
     _units = UnitRegistry()
     _systems = {}
     _infinity = Decimal("8.79848e53")
@@ -498,6 +511,7 @@ class SV(Dimension):
 
 class WV(Dimension):
     """Weight Value (mass in grams)"""
+    __slots__ = ()
     _units = UnitRegistry()
     _systems = {}
     _infinity = Decimal("3.4e84")
@@ -517,6 +531,7 @@ class WV(Dimension):
 
 class TV(Dimension):
     """Time Value (time in seconds)"""
+    __slots__ = ()
     _units = UnitRegistry()
     _systems = {}
 
@@ -1,21 +1,47 @@
+import asyncio
 import json
+import logging
+import struct
+from collections import defaultdict
 from copy import copy
 from functools import total_ordering
 from typing import Literal
 
 from sizebot import conf
-from sizebot.lib import errors
+from sizebot.lib import errors, persistence
 from sizebot.lib.units import SV, WV
 
+logger = logging.getLogger("sizebot")
+
 # Defaults
-defaultheight = SV("1.754")  # meters
-defaultweight = WV("66760")  # grams
+defaultheight = SV.intern("1.754")  # meters
+defaultweight = WV.intern("66760")  # grams
 
 # Map the deprecated user array constants to the new names
 # TODO: This is used never, I think?
 #                      NICK        DISP       CHEI      BHEI          BWEI          UNIT          SPEC
 DEPRECATED_NAME_MAP = ["nickname", "display", "height", "baseheight", "baseweight", "unitsystem", "species"]
 
+# Binary user records
+# A fixed header (magic, version, guild id, user id, flags), then each field in RECORD_FIELDS as a length-prefixed
+# UTF-8 string. A length of NULL_FIELD means the field is None. Bump RECORD_VERSION whenever the layout changes.
+RECORD_MAGIC = b"SBUR"
+RECORD_VERSION = 1
+RECORD_HEADER = struct.Struct("<4sBQQB")
+FIELD_LENGTH = struct.Struct("<H")
+NULL_FIELD = 0xFFFF
+RECORD_FIELDS = ["nickname", "species", "height", "baseheight", "baseweight", "footlength", "hairlength", "taillength"]
+FLAG_DISPLAY = 0b0001
+FLAG_USCUSTOMARY = 0b0010
+FLAG_MALE = 0b0100
+FLAG_FEMALE = 0b1000
+GENDER_MASK = FLAG_MALE | FLAG_FEMALE
+GENDER_FLAGS = {None: 0, "m": FLAG_MALE, "f": FLAG_FEMALE}
+FLAG_GENDERS = {0: None, FLAG_MALE: "m", FLAG_FEMALE: "f"}
+
+# How many users loadMany() reads in each executor job
+LOAD_BATCH_SIZE = 50
+
 
 @total_ordering
 class User:
@@ -251,6 +277,98 @@ class User:
         userdata.species = jsondata["species"]
         return userdata
 
+    def toBytes(self):
+        """Encode the user as a compact binary record"""
+        flags = GENDER_FLAGS[self.gender]
+        if self.display:
+            flags |= FLAG_DISPLAY
+        if self.unitsystem == "u":
+            flags |= FLAG_USCUSTOMARY
+        parts = [RECORD_HEADER.pack(RECORD_MAGIC, RECORD_VERSION, self.guildid, self.id, flags)]
+        for value in (self.nickname, self.species, self.height, self.baseheight, self.baseweight,
+                      self.footlength, self.hairlength, self.taillength):
+            if value is None:
+                parts.append(FIELD_LENGTH.pack(NULL_FIELD))
+                continue
+            encoded = str(value).encode("utf-8")
+            if len(encoded) >= NULL_FIELD:
+                raise errors.InvalidUserRecordException("field too long")
+            parts.append(FIELD_LENGTH.pack(len(encoded)))
+            parts.append(encoded)
+        return b"".join(parts)
+
+    @classmethod
+    def fromBytes(cls, data, validate = False):
+        """Decode a record made by toBytes()
+
+        The layout is always checked, so a truncated or corrupt record raises InvalidUserRecordException. By default
+        the values are then trusted, and stored without going through the setters. Use validate = True for records
+        that didn't come from SizeBot."""
+        if len(data) < RECORD_HEADER.size:
+            raise errors.InvalidUserRecordException("truncated")
+        magic, version, guildid, userid, flags = RECORD_HEADER.unpack_from(data)
+        if magic != RECORD_MAGIC:
+            raise errors.InvalidUserRecordException("not a user record")
+        if version != RECORD_VERSION:
+            raise errors.InvalidUserRecordException(f"unsupported version {version}")
+        fields = []
+        offset = RECORD_HEADER.size
+        try:
+            for _ in RECORD_FIELDS:
+                if offset + FIELD_LENGTH.size > len(data):
+                    raise errors.InvalidUserRecordException("truncated")
+                length, = FIELD_LENGTH.unpack_from(data, offset)
+                offset += FIELD_LENGTH.size
+                if length == NULL_FIELD:
+                    fields.append(None)
+                    continue
+                if offset + length > len(data):
+                    raise errors.InvalidUserRecordException("truncated")
+                fields.append(data[offset:offset + length].decode("utf-8"))
+                offset += length
+        except UnicodeDecodeError as e:
+            raise errors.InvalidUserRecordException(str(e))
+        if offset != len(data):
+            raise errors.InvalidUserRecordException("trailing data")
+        nickname, species, height, baseheight, baseweight, footlength, hairlength, taillength = fields
+
+        userdata = cls()
+        userdata.guildid = guildid
+        userdata.id = userid
+        userdata.nickname = nickname
+        userdata.species = species
+        userdata.display = bool(flags & FLAG_DISPLAY)
+        if not validate:
+            userdata._gender = FLAG_GENDERS.get(flags & GENDER_MASK)
+            userdata._unitsystem = "u" if flags & FLAG_USCUSTOMARY else "m"
+            try:
+                userdata._height = SV(height)
+                userdata._baseheight = SV(baseheight)
+                userdata._baseweight = WV(baseweight)
+                userdata._footlength = None if footlength is None else SV(footlength)
+                userdata._hairlength = None if hairlength is None else SV(hairlength)
+                userdata._taillength = None if taillength is None else SV(taillength)
+            except (TypeError, ValueError, ArithmeticError) as e:
+                raise errors.InvalidUserRecordException(str(e))
+            return userdata
+
+        if flags & ~(FLAG_DISPLAY | FLAG_USCUSTOMARY | GENDER_MASK) or (flags & GENDER_MASK) not in FLAG_GENDERS:
+            raise errors.InvalidUserRecordException(f"invalid flags {flags:#x}")
+        if None in (height, baseheight, baseweight):
+            raise errors.InvalidUserRecordException("missing size")
+        try:
+            userdata.gender = FLAG_GENDERS[flags & GENDER_MASK]
+            userdata.unitsystem = "u" if flags & FLAG_USCUSTOMARY else "m"
+            userdata.height = height
+            userdata.baseheight = baseheight
+            userdata.baseweight = baseweight
+            userdata.footlength = footlength
+            userdata.hairlength = hairlength
+            userdata.taillength = taillength
+        except (ValueError, ArithmeticError) as e:
+            raise errors.InvalidUserRecordException(str(e))
+        return userdata
+
     def __lt__(self, other):
         return self.height < other.height
 
@@ -275,30 +393,111 @@ class User:
         return newuserdata
 
 
+USER_SUFFIXES = (".user", ".json")
+
+
+class UserIndex:
+    """Which users are registered in which guilds, so lookups don't have to touch the disk"""
+
+    def __init__(self, pairs = ()):
+        self.byGuild = defaultdict(set)
+        self.byUser = defaultdict(set)
+        for guildid, userid in pairs:
+            self.add(guildid, userid)
+
+    def add(self, guildid, userid):
+        self.byGuild[guildid].add(userid)
+        self.byUser[userid].add(guildid)
+
+    def discard(self, guildid, userid):
+        self.byGuild[guildid].discard(userid)
+        self.byUser[userid].discard(guildid)
+        if not self.byGuild[guildid]:
+            del self.byGuild[guildid]
+        if not self.byUser[userid]:
+            del self.byUser[userid]
+
+    def __contains__(self, pair):
+        guildid, userid = pair
+        return guildid in self.byUser.get(userid, ())
+
+    def __len__(self):
+        return sum(len(users) for users in self.byGuild.values())
+
+    def __iter__(self):
+        for guildid, users in self.byGuild.items():
+            for userid in users:
+                yield guildid, userid
+
+    @classmethod
+    def build(cls):
+        """Build the index from the user files on disk"""
+        userfiles = (p for p in conf.guilddbpath.glob("*/users/*") if p.suffix in USER_SUFFIXES)
+        return cls((int(p.parent.parent.name), int(p.stem)) for p in userfiles)
+
+
+# Built on first use
+_index = None
+
+
+def _getIndex():
+    global _index
+    if _index is None:
+        _index = UserIndex.build()
+    return _index
+
+
+def rebuildIndex():
+    """Rebuild the user index from disk, in case user files were changed outside of SizeBot"""
+    global _index
+    _index = UserIndex.build()
+
+
 def getGuildUsersPath(guildid):
     return conf.guilddbpath / f"{guildid}" / "users"
 
 
 def getUserPath(guildid, userid):
+    return getGuildUsersPath(guildid) / f"{userid}.user"
+
+
+def getJSONUserPath(guildid, userid):
     return getGuildUsersPath(guildid) / f"{userid}.json"
 
 
 def save(userdata):
+    """Save a user, in the binary format if conf.binaryusers is set, or as JSON otherwise
+
+    Saving as binary leaves any JSON file alone, as a backup. Saving as JSON removes the binary file, since the JSON
+    file now has the newer data, so turning conf.binaryusers back off loses nothing."""
     guildid = userdata.guildid
     userid = userdata.id
     if guildid is None or userid is None:
         raise errors.CannotSaveWithoutIDException
-    path = getUserPath(guildid, userid)
-    path.parent.mkdir(exist_ok = True, parents = True)
-    jsondata = userdata.toJSON()
-    with open(path, "w") as f:
-        json.dump(jsondata, f, indent = 4)
+    if conf.binaryusers:
+        persistence.atomicWrite(getUserPath(guildid, userid), userdata.toBytes())
+    else:
+        persistence.atomicWrite(getJSONUserPath(guildid, userid), json.dumps(userdata.toJSON(), indent = 4))
+        getUserPath(guildid, userid).unlink(missing_ok = True)
+    _getIndex().add(guildid, userid)
 
 
 def load(guildid, userid):
-    path = getUserPath(guildid, userid)
+    """Load a user, from their binary file if they have one, or from their JSON file otherwise
+
+    A binary file is only ever newer than the JSON file next to it. If it can't be read, the JSON file is used instead."""
     try:
-        with open(path, "r") as f:
+        with open(getUserPath(guildid, userid), "rb") as f:
+            return User.fromBytes(f.read())
+    except FileNotFoundError:
+        pass
+    except errors.InvalidUserRecordException as e:
+        if not getJSONUserPath(guildid, userid).exists():
+            raise
+        logger.warning(f"Couldn't read the binary file for user {userid} in guild {guildid} ({e.reason}), "
+                       "falling back to their JSON file.")
+    try:
+        with open(getJSONUserPath(guildid, userid), "r") as f:
             jsondata = json.load(f)
     except FileNotFoundError:
         raise errors.UserNotFoundException(guildid, userid)
@@ -306,27 +505,84 @@ def load(guildid, userid):
 
 
 def delete(guildid, userid):
-    path = getUserPath(guildid, userid)
-    path.unlink(missing_ok = True)
+    getUserPath(guildid, userid).unlink(missing_ok = True)
+    getJSONUserPath(guildid, userid).unlink(missing_ok = True)
+    _getIndex().discard(guildid, userid)
+
+
+def exportJSON(guildid, userid):
+    """Return a user as JSON text, for exporting or reading by hand"""
+    return json.dumps(load(guildid, userid).toJSON(), indent = 4)
+
+
+def isRegistered(guildid, userid):
+    """Check if a user is registered, without reading their file"""
+    return (guildid, userid) in _getIndex()
 
 
 # TODO: Set this up as a User's __nonzero__ function
 # e.g.: bool(user) = user.id.exists()
 def exists(guildid, userid):
-    exists = True
-    try:
-        load(guildid, userid)
-    except errors.UserNotFoundException:
-        exists = False
-    return exists
+    return isRegistered(guildid, userid)
 
 
 def count():
-    usercount = len(list(conf.guilddbpath.glob("*/users/*.json")))
-    return usercount
+    return len(_getIndex())
 
 
 def listUsers(guildid = None):
-    userfiles = conf.guilddbpath.glob("*/users/*.json")
-    users = [(int(p.parent.parent.name), int(p.stem)) for p in userfiles]
-    return users
+    """List the (guildid, userid) of every registered user, or only those in one guild"""
+    index = _getIndex()
+    if guildid is not None:
+        return [(guildid, userid) for userid in index.byGuild.get(guildid, ())]
+    return list(index)
+
+
+def listGuilds(userid):
+    """List the ids of the guilds a user is registered in"""
+    return sorted(_getIndex().byUser.get(userid, ()))
+
+
+def _loadBatch(guildid, userids):
+    """Load a batch of users, returning (userid, User or the exception it raised) for each"""
+    results = []
+    for userid in userids:
+        try:
+            results.append((userid, load(guildid, userid)))
+        except Exception as e:
+            results.append((userid, e))
+    return results
+
+
+async def loadMany(guildid, userids, *, failures = None):
+    """Load many users from one guild, yielding each User as it's read
+
+    The files are read in batches on the event loop's executor, so the loop isn't blocked while they're read.
+    Users are yielded in whatever order their batches finish.
+    Users that can't be loaded (missing or corrupt files) are skipped and logged. Pass a list as failures to also
+    collect them as (userid, exception) pairs."""
+    userids = list(userids)
+    if not userids:
+        return
+    loop = asyncio.get_running_loop()
+    batches = [loop.run_in_executor(None, _loadBatch, guildid, userids[i:i + LOAD_BATCH_SIZE])
+               for i in range(0, len(userids), LOAD_BATCH_SIZE)]
+    skipped = []
+    try:
+        for batch in asyncio.as_completed(batches):
+            for userid, result in await batch:
+                if isinstance(result, Exception):
+                    skipped.append((userid, result))
+                else:
+                    yield result
+    finally:
+        if skipped:
+            logger.warning(f"Skipped {len(skipped)} of {len(userids)} users in guild {guildid} that couldn't be loaded: "
+                           + ", ".join(f"{userid} ({e!r})" for userid, e in skipped))
+        if failures is not None:
+            failures.extend(skipped)
+
+
+def iterGuild(guildid, *, failures = None):
+    """Load every user registered in a guild, yielding each User as it's read (see loadMany)"""
+    return loadMany(guildid, [userid for _, userid in listUsers(guildid)], failures = failures)
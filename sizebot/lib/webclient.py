@@ -0,0 +1,134 @@
+import asyncio
+import json
+import logging
+import time
+from collections import OrderedDict
+
+import aiohttp
+
+logger = logging.getLogger("sizebot")
+
+
+class TTLCache:
+    """LRU cache whose entries also expire after a number of seconds"""
+
+    def __init__(self, maxsize = 256, ttl = 300):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries = OrderedDict()
+
+    def get(self, key):
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires, value = entry
+        if expires < time.monotonic():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return value
+
+    def put(self, key, value, ttl = None):
+        if ttl is None:
+            ttl = self.ttl
+        self._entries[key] = (time.monotonic() + ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last = False)
+
+    def clear(self):
+        self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+
+class Response:
+    """A fully read HTTP response"""
+    __slots__ = ["url", "status", "headers", "body"]
+
+    def __init__(self, url, status, headers, body):
+        self.url = url
+        self.status = status
+        self.headers = headers
+        self.body = body
+
+    @property
+    def ok(self):
+        return 200 <= self.status < 300
+
+    def text(self):
+        return self.body.decode("utf-8", errors = "replace")
+
+    def json(self):
+        return json.loads(self.body)
+
+
+class WebClient:
+    """Shared HTTP client for outbound lookups
+
+    Keeps one pooled aiohttp session, limits how many connections are open to each host, times out slow requests, and
+    caches successful GET responses by URL. Identical GETs made at the same time share one request.
+
+    The session is created on the first request, so the client can be made before the event loop is running.
+    """
+
+    def __init__(self, *, limit = 100, limitperhost = 4, timeout = 10, cachesize = 256, cachettl = 300, useragent = None):
+        self.limit = limit
+        self.limitperhost = limitperhost
+        self.timeout = aiohttp.ClientTimeout(total = timeout)
+        self.cache = TTLCache(cachesize, cachettl)
+        self.headers = {"User-Agent": useragent} if useragent else {}
+        self._session = None
+        self._inflight = {}
+
+    @property
+    def session(self):
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(limit = self.limit, limit_per_host = self.limitperhost)
+            self._session = aiohttp.ClientSession(connector = connector, timeout = self.timeout, headers = self.headers)
+        return self._session
+
+    async def close(self):
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+    async def get(self, url, *, cache = True, ttl = None):
+        """GET a url, returning a Response
+
+        Successful responses are cached for `ttl` seconds (or the client's default), unless cache is False."""
+        if cache:
+            response = self.cache.get(url)
+            if response is not None:
+                return response
+
+        # If the same url is already being fetched, wait for that instead
+        inflight = self._inflight.get(url)
+        if inflight is not None:
+            return await asyncio.shield(inflight)
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[url] = future
+        try:
+            async with self.session.get(url) as r:
+                response = Response(str(r.url), r.status, dict(r.headers), await r.read())
+        except BaseException as e:
+            future.set_exception(e)
+            # Nobody else might be waiting on this future, so don't let asyncio complain it was never retrieved
+            future.exception()
+            raise
+        finally:
+            del self._inflight[url]
+
+        future.set_result(response)
+        if cache and response.ok:
+            self.cache.put(url, response, ttl)
+        return response
+
+    async def getJSON(self, url, **kwargs):
+        """GET a url, and parse the response as json. Raises aiohttp.ClientResponseError if the request wasn't successful."""
+        response = await self.get(url, **kwargs)
+        if not response.ok:
+            raise aiohttp.ClientResponseError(None, (), status = response.status, message = f"GET {url} returned {response.status}")
+        return response.json()
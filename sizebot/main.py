@@ -10,8 +10,9 @@ from digiformatter import styles, logger as digilogger
 from sizebot import __version__
 from sizebot import conf
 from sizebot.cogs import edge
-from sizebot.lib import language, objs, proportions, status, units
+from sizebot.lib import language, listeners, objs, persistence, proportions, status, units, userdb, webclient
 from sizebot.lib.discordlogger import DiscordHandler
+from sizebot.lib.scheduler import scheduler
 from sizebot.plugins import monika, meicros
 
 logging.basicConfig(level=logging.INFO)
@@ -45,11 +46,32 @@ initial_cogs = [
 initial_extensions = [
     "banned",
     "errorhandler",
+    "reactions",
     "telemetry",
     "tupperbox"
 ]
 
 
+class SizeBot(Bot):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # Shared HTTP client for cogs that need to look things up online
+        self.webclient = webclient.WebClient(useragent = f"SizeBot/{__version__}")
+
+    def add_cog(self, cog):
+        super().add_cog(cog)
+        self.dispatch("commands_changed")
+
+    def remove_cog(self, name):
+        super().remove_cog(name)
+        self.dispatch("commands_changed")
+
+    async def close(self):
+        scheduler.stop()
+        await self.webclient.close()
+        await super().close()
+
+
 def main():
     try:
         conf.load()
@@ -60,7 +82,7 @@ def main():
     booting = True
     launchtime = datetime.now()
 
-    bot = Bot(command_prefix = conf.prefix, description = conf.description)
+    bot = SizeBot(command_prefix = conf.prefix, description = conf.description)
 
     bot.remove_command("help")
 
@@ -84,6 +106,10 @@ def main():
         # Load the units and objects.
         await units.init()
         await objs.init()
+        bot.dispatch("units_loaded")
+
+        # Start running scheduled jobs (naps, changes, etc.)
+        scheduler.start()
 
         # Print the splash screen.
         BANNER = digilogger.addLogLevel("banner", fg="orange_red_1", bg="deep_sky_blue_4b", attr="bold")
@@ -119,20 +145,34 @@ def main():
         else:
             await on_reconnect_ready()
 
+    def isRegisteredMember(message):
+        author = message.author
+        return isinstance(author, discord.Member) and not author.bot and userdb.isRegistered(author.guild.id, author.id)
+
+    async def on_member_message(message):
+        if edge.isEdgeUser(message.guild.id, message.author.id):
+            await edge.on_message(message)
+        await proportions.nickUpdate(message.author)
+
+    listeners.register(on_member_message, isRegisteredMember)
+    listeners.register(meicros.on_message, pattern = meicros.pattern)
+    listeners.register(monika.on_message, pattern = monika.pattern)
+
     @bot.event
     async def on_message(message):
-        await bot.process_commands(message)
-        await edge.on_message(message)
-        await proportions.nickUpdate(message.author)
-        await meicros.on_message(message)
-        await monika.on_message(message)
+        # Most messages aren't commands, so don't make discord.py parse them
+        if message.content.startswith(conf.prefix):
+            await bot.process_commands(message)
+        await listeners.dispatch(message)
 
     @bot.event
     async def on_message_edit(before, after):
         if before.content == after.content:
             return
-        await bot.process_commands(after)
-        await proportions.nickUpdate(after.author)
+        if after.content.startswith(conf.prefix):
+            await bot.process_commands(after)
+        if isRegisteredMember(after):
+            await proportions.nickUpdate(after.author)
 
     def on_disconnect():
         logger.error("SizeBot has been disconnected from Discord!")
@@ -142,6 +182,7 @@ def main():
         return
 
     bot.run(conf.authtoken)
+    persistence.flush()
     on_disconnect()
 
 
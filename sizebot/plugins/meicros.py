@@ -1,3 +1,6 @@
+pattern = r"\A!(?:stop|pause|resume|queue|current|volume)"
+
+
 async def on_message(m):
     """Meicros, or how to annoy your developer friend."""
     if m.author.bot:
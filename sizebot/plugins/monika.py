@@ -7,14 +7,13 @@ import sizebot.data
 
 logger = logging.getLogger("sizebot")
 monikalines = pkg_resources.read_text(sizebot.data, "monikalines.txt").splitlines()
+pattern = r"(?i:monika)"
 
 
 async def on_message(m):
     """Monika easter eggs."""
     if m.author.bot:
         return
-    if "monika" not in m.content.lower():
-        return
     logger.warn("Monika detected.")
     if random.randrange(6) == 1:
         logger.warn("Monika triggered.")
@@ -0,0 +1,38 @@
+from sizebot.lib import colors
+
+
+def test_hex():
+    assert colors.hexToRGB("f80") == (255, 136, 0)
+    assert colors.hexToRGB("1E90FF") == (30, 144, 255)
+    assert colors.rgbToHex((30, 144, 255)) == "1E90FF"
+
+
+def test_conversions():
+    rgb = (255, 0, 0)
+    assert colors.rgbToHSL(rgb) == (0, 100, 50)
+    assert colors.rgbToHSV(rgb) == (0, 100, 100)
+    assert colors.rgbToCMYK(rgb) == (0, 100, 100, 0)
+    assert colors.rgbToCMYK((0, 0, 0)) == (0, 0, 0, 100)
+
+
+def assertClose(rgb1, rgb2):
+    # HSL, HSV and CMYK are rounded to whole numbers, so they can be off by a little
+    assert all(abs(a - b) <= 2 for a, b in zip(rgb1, rgb2))
+
+
+def test_roundtrips():
+    rgb = (30, 144, 255)
+    assertClose(colors.hslToRGB(*colors.rgbToHSL(rgb)), rgb)
+    assertClose(colors.hsvToRGB(*colors.rgbToHSV(rgb)), rgb)
+    assertClose(colors.cmykToRGB(*colors.rgbToCMYK(rgb)), rgb)
+
+
+def test_lab_white():
+    l, a, b = colors.rgbToLab((255, 255, 255))
+    assert round(l) == 100 and abs(a) < 0.01 and abs(b) < 0.01
+
+
+def test_names():
+    assert colors.getColorName((30, 144, 255)) == "Dodger Blue"
+    assert colors.getColorName((250, 5, 3)) == "Red"
+    assert colors.getColorName((1, 1, 1)) == "Black"
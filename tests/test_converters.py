@@ -0,0 +1,44 @@
+import asyncio
+
+import pytest
+from discord.ext import commands
+
+from sizebot.lib import converters, units
+from sizebot.lib.units import SV
+
+asyncio.run(units.init())
+
+
+async def memberNotFound(ctx, argument):
+    raise commands.BadArgument(argument)
+
+
+def test_classify():
+    assert converters.classify("<@!271803699095928832>") == ["member"]
+    assert converters.classify("271803699095928832") == ["member"]
+    assert converters.classify("10ft") == ["size", "member"]
+    assert converters.classify("5'8\"") == ["size", "member"]
+    assert converters.classify(".5m") == ["size", "member"]
+    assert converters.classify("DigiDuncan") == ["member", "size"]
+
+
+def test_sizes_skip_member_lookup(monkeypatch):
+    async def noMembers(ctx, argument):
+        raise AssertionError("member lookup shouldn't happen")
+    monkeypatch.setitem(converters._converters, "member", noMembers)
+    monkeypatch.setattr(converters, "timings", converters.defaultdict(converters.Timing))
+
+    result = asyncio.run(converters.MemberOrSize.convert(None, "10m"))
+    assert result == SV("10")
+    assert converters.timings["size"].count == 1
+
+
+def test_fallbacks(monkeypatch):
+    monkeypatch.setitem(converters._converters, "member", memberNotFound)
+    monkeypatch.setattr(converters, "timings", converters.defaultdict(converters.Timing))
+
+    assert asyncio.run(converters.MemberOrSize.convert(None, "meter")) == SV("1")
+    assert asyncio.run(converters.Target.convert(None, "nobody")) == "nobody"
+    with pytest.raises(commands.BadArgument):
+        asyncio.run(converters.MemberOrSize.convert(None, "nobody"))
+    assert {k: t.count for k, t in converters.timings.items()} == {"size": 1, "text": 1, "failed": 1}
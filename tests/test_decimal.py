@@ -1,3 +1,8 @@
+import copy
+import pickle
+
+import pytest
+
 from sizebot.lib import decimal
 from sizebot.lib.decimal import Decimal, RawDecimal
 
@@ -47,3 +52,22 @@ def test_trimZeros_E():
     result = decimal.fixZeroes(RawDecimal("1E2"))
     result = str(result)
     assert result == "100"
+
+
+def test_hashable():
+    assert hash(Decimal("1.5")) == hash(Decimal("1.50")) == hash(RawDecimal("1.5"))
+    assert {Decimal("2"): "two"}[Decimal(2)] == "two"
+
+
+def test_immutable():
+    value = Decimal("1.5")
+    with pytest.raises(AttributeError):
+        value._rawvalue = RawDecimal("2")
+    assert Decimal(value) is value
+    assert copy.deepcopy(value) is value
+    assert pickle.loads(pickle.dumps(value)) == value
+
+
+def test_intern():
+    assert Decimal.intern("1.754") is Decimal.intern("1.754")
+    assert Decimal.intern("1.754") == Decimal("1.754")
@@ -0,0 +1,79 @@
+import asyncio
+import logging
+import threading
+
+from sizebot.lib.discordlogger import MAX_CHUNK_LEN, AsyncHandler, aggregateMessages, packMessages
+
+
+class CollectingHandler(AsyncHandler):
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.batches = []
+        self.received = asyncio.Event()
+
+    async def asyncemit(self, records, dropped):
+        self.batches.append(([record.getMessage() for record in records], dropped))
+        self.received.set()
+
+
+def makeRecord(message):
+    return logging.LogRecord("sizebot", logging.INFO, __file__, 0, message, None, None)
+
+
+def test_aggregate_messages():
+    assert aggregateMessages(["a", "a", "b", "a", "a", "a"]) == [["a", 2], ["b", 1], ["a", 3]]
+    assert aggregateMessages([]) == []
+
+
+def test_pack_messages():
+    chunks, suppressed = packMessages(["a", "a", "b"], 3)
+    assert chunks == ["a (x2)\nb"]
+    assert suppressed == 0
+
+
+def test_pack_messages_reserves_room_for_summary():
+    # Each message fills most of a chunk, so only maxchunks of them fit
+    messages = [f"{i:04}" + "x" * (MAX_CHUNK_LEN - 20) for i in range(10)]
+    for maxchunks in [1, 2, 3]:
+        chunks, suppressed = packMessages(messages, maxchunks)
+        assert len(chunks) <= maxchunks
+        assert all(len(chunk) <= MAX_CHUNK_LEN for chunk in chunks)
+        assert chunks[-1].endswith(f"{suppressed} messages suppressed.")
+        lines = "\n".join(chunks).split("\n")
+        assert suppressed == 10 - (len(lines) - 1)
+
+    # Exactly full chunks still leave room for the summary
+    messages = [str(i) * MAX_CHUNK_LEN for i in range(4)]
+    chunks, suppressed = packMessages(messages, 2)
+    assert len(chunks) == 2
+    assert suppressed == 3
+    assert chunks[-1] == "3 messages suppressed."
+
+
+def test_pack_messages_counts_dropped():
+    chunks, suppressed = packMessages(["a", "b"], 1, dropped = 5)
+    assert chunks == ["a\nb\n5 messages suppressed."]
+    assert suppressed == 5
+
+
+def test_queue_is_bounded():
+    async def run():
+        handler = CollectingHandler(maxqueue = 2)
+        for i in range(5):
+            handler.emit(makeRecord(str(i)))
+        await asyncio.wait_for(handler.received.wait(), 1)
+        return handler.batches
+
+    assert asyncio.run(run()) == [(["0", "1"], 3)]
+
+
+def test_emit_from_another_thread():
+    async def run():
+        handler = CollectingHandler()
+        thread = threading.Thread(target = handler.emit, args = (makeRecord("threaded"),))
+        thread.start()
+        thread.join()
+        await asyncio.wait_for(handler.received.wait(), 1)
+        return handler.batches
+
+    assert asyncio.run(run()) == [(["threaded"], 0)]
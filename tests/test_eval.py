@@ -0,0 +1,61 @@
+import asyncio
+import tracemalloc
+
+import pytest
+
+from sizebot.lib import errors
+from sizebot.lib.eval import ThreadedEval
+
+
+def runThreaded(evalStr, **kwargs):
+    threadedeval = ThreadedEval(None, evalStr, **kwargs)
+
+    async def run():
+        return await threadedeval.start()
+    return threadedeval, asyncio.run(run())
+
+
+def test_threaded_eval_result_and_output():
+    threadedeval, result = runThreaded("print('hello', 1)\n6 * 7")
+    assert result == 42
+    assert threadedeval.output.getvalue() == "hello 1\n"
+    assert threadedeval.elapsed is not None
+    assert threadedeval.peakmemory is not None
+
+
+def test_threaded_eval_timeout():
+    with pytest.raises(errors.EvalTimeoutException):
+        runThreaded("while True:\n  pass", timeout = 0.2)
+
+
+def test_threaded_eval_memory_limit():
+    with pytest.raises(errors.EvalMemoryException):
+        runThreaded("l = []\nwhile True:\n  l.append(str(len(l)) * 1000)", memorylimit = 1024 * 1024)
+
+
+def test_threaded_eval_stops_its_own_tracing():
+    runThreaded("1 + 1")
+    assert not tracemalloc.is_tracing()
+
+
+def test_threaded_eval_leaves_existing_tracing():
+    tracemalloc.start()
+    try:
+        runThreaded("1 + 1")
+        assert tracemalloc.is_tracing()
+    finally:
+        tracemalloc.stop()
+
+
+def test_threaded_eval_abandon_stops_tracing():
+    threadedeval = ThreadedEval(None, "while True:\n  pass", timeout = 10)
+
+    async def run():
+        future = threadedeval.start()
+        await asyncio.sleep(0.1)
+        assert tracemalloc.is_tracing()
+        threadedeval.abandon()
+        assert not tracemalloc.is_tracing()
+        with pytest.raises(errors.EvalCancelledException):
+            await future
+    asyncio.run(run())
@@ -0,0 +1,62 @@
+import asyncio
+
+from sizebot.lib import listeners
+
+
+def test_dispatch_filters_and_isolates_errors(monkeypatch):
+    monkeypatch.setattr(listeners, "_listeners", [])
+    seen = []
+
+    async def record(m):
+        seen.append(m)
+
+    async def broken(m):
+        raise ValueError("oops")
+
+    listeners.register(record, lambda m: m.startswith("!"))
+    listeners.register(broken)
+    asyncio.run(listeners.dispatch("hello"))
+    asyncio.run(listeners.dispatch("!hello"))
+    assert seen == ["!hello"]
+
+    listeners.unregister(broken)
+    assert len(listeners._listeners) == 1
+
+
+class FakeMessage:
+    def __init__(self, content):
+        self.content = content
+
+
+def test_dispatch_patterns(monkeypatch):
+    monkeypatch.setattr(listeners, "_listeners", [])
+    seen = []
+
+    def recorder(name):
+        async def record(m):
+            seen.append((name, m.content))
+        return record
+
+    listeners.register(recorder("monika"), pattern = r"(?i:monika)")
+    listeners.register(recorder("wink"), pattern = r"; *\)")
+    listeners.register(recorder("other"), pattern = r"(?i:monika)", invert = True)
+    listeners.register(recorder("long"), lambda m: len(m.content) > 10, pattern = r"; *\)")
+
+    for content in ["hello", "MONIKA ;)", "a long wink ;)"]:
+        asyncio.run(listeners.dispatch(FakeMessage(content)))
+    assert seen == [
+        ("other", "hello"),
+        ("monika", "MONIKA ;)"),
+        ("wink", "MONIKA ;)"),
+        ("wink", "a long wink ;)"),
+        ("other", "a long wink ;)"),
+        ("long", "a long wink ;)")
+    ]
+
+
+def test_scan_overlapping_patterns():
+    patterns = (r"this", r"th\w+", r"^agree", r"nope")
+    assert listeners.scan("this", patterns) == {r"this", r"th\w+"}
+    assert listeners.scan("agree with this", patterns) == {r"this", r"th\w+", r"^agree"}
+    assert listeners.scan("nothing here", patterns) == {r"th\w+"}
+    assert listeners.scan("hello", patterns) == set()
@@ -0,0 +1,90 @@
+import math
+import random
+
+import pytest
+
+from sizebot.lib.decimal import Decimal
+from sizebot.lib.logvalue import LogValue
+from sizebot.lib.units import SV
+
+# Floats keep about 15 significant digits, and a log of ~54 uses 2 of them up
+TOLERANCE = Decimal("1e-12")
+
+
+def assertClose(logvalue, expected):
+    result = logvalue.toDecimal()
+    if expected.is_infinite():
+        # Past Decimal's own infinity, which LogValues don't have
+        return
+    if expected == 0:
+        assert result == 0
+    else:
+        assert abs(result / expected - 1) < TOLERANCE, (result, expected)
+
+
+def randomValues(count, seed = 0):
+    """Random values spread over SizeBot's full range, from below a yoctometer to SV's infinity"""
+    rng = random.Random(seed)
+    for _ in range(count):
+        mantissa = Decimal(str(rng.uniform(1, 10)))
+        exponent = rng.randint(-30, 53)
+        yield mantissa * Decimal(10) ** exponent
+
+
+def test_roundtrip():
+    for value in randomValues(1000):
+        assertClose(LogValue(value), value)
+
+
+def test_multiply_divide():
+    values = list(randomValues(500))
+    for a, b in zip(values, reversed(values)):
+        assertClose(LogValue(a) * LogValue(b), a * b)
+        assertClose(LogValue(a) / LogValue(b), a / b)
+        assertClose(LogValue(a) * b, a * b)
+        assertClose(1 / LogValue(b), 1 / b)
+
+
+def test_power():
+    rng = random.Random(1)
+    for value in randomValues(500):
+        exponent = Decimal(str(round(rng.uniform(-1.5, 1.5), 3)))
+        assertClose(LogValue(value) ** exponent, value ** exponent)
+        assertClose(LogValue(value) ** 3, value ** 3)
+
+
+def test_add_subtract():
+    values = list(randomValues(500, seed = 2))
+    for a, b in zip(values, reversed(values)):
+        assertClose(LogValue(a) + LogValue(b), a + b)
+        # Subtracting close values loses digits in any float representation, so only check well separated ones
+        if abs(a / b - 1) > Decimal("0.01"):
+            assert abs((LogValue(a) - b).toDecimal() / (a - b) - 1) < Decimal("1e-9")
+
+
+def test_signs_and_zero():
+    assertClose(LogValue(-2) * 3, Decimal(-6))
+    assertClose(LogValue(-2) ** 3, Decimal(-8))
+    assert LogValue(0) * 5 == 0
+    assert LogValue(5) - 5 == 0
+    assert not LogValue(0)
+    assert LogValue(-3) < LogValue(0) < LogValue("1e-30") < LogValue(2) < LogValue("1e50")
+    with pytest.raises(ValueError):
+        LogValue(-2) ** Decimal("0.5")
+    with pytest.raises(ZeroDivisionError):
+        LogValue(1) / 0
+
+
+def test_infinity():
+    assert LogValue(Decimal("infinity")) > LogValue("1e300")
+    assert (LogValue(SV.infinity) * 2).toDecimal() == SV.infinity
+    # Past SV's own infinity, values clamp the same way Decimals do
+    assert SV((LogValue("1e53") * 10).toDecimal()) == SV("1e54")
+
+
+def test_float():
+    assert float(LogValue("2.5")) == pytest.approx(2.5)
+    assert float(LogValue(0)) == 0.0
+    assert float(LogValue("1e400")) == math.inf
+    assert float(LogValue("-1e400")) == -math.inf
+    assert float(LogValue("1e-400")) == 0.0
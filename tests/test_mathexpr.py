@@ -0,0 +1,40 @@
+import pytest
+
+from sizebot.lib import mathexpr
+
+
+def test_evaluate_arithmetic():
+    assert mathexpr.evaluate("(1 + 2) * 3 - 4 / 2") == 7
+    assert mathexpr.evaluate("2 ** 10 % 1000") == 24
+    assert mathexpr.evaluate("-sqrt(16)") == -4
+
+
+def test_evaluate_names():
+    assert mathexpr.evaluate("a * 2 + b", ("a", "b"), (5, 1)) == 11
+
+
+def test_compiled_once():
+    fn = mathexpr.compileExpression("a + 1", ("a",))
+    assert mathexpr.compileExpression("a + 1", ("a",)) is fn
+    assert fn([1]) == 2
+    assert fn([41]) == 42
+
+
+@pytest.mark.parametrize("expression", [
+    "__import__('os')",
+    "x",
+    "(1).real",
+    "[1, 2]",
+    "'a' * 3",
+    "1 if 1 else 2",
+    "open('f')"
+])
+def test_unsafe(expression):
+    with pytest.raises(mathexpr.UnsafeExpressionError):
+        mathexpr.evaluate(expression)
+
+
+def test_huge_power():
+    with pytest.raises(mathexpr.UnsafeExpressionError):
+        mathexpr.evaluate("9 ** 9 ** 9")
+    assert mathexpr.evaluate("1 ** 100000000") == 1
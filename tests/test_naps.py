@@ -0,0 +1,78 @@
+import asyncio
+
+import pytest
+
+from sizebot import conf
+from sizebot.lib import naps, persistence
+from sizebot.lib.scheduler import Scheduler
+
+
+class FakeMember:
+    def __init__(self, userid, invoice = True):
+        self.id = userid
+        self.voice = object() if invoice else None
+        self.moved = False
+
+    async def move_to(self, channel, reason = None):
+        self.moved = True
+
+
+class FakeGuild:
+    def __init__(self, guildid, members):
+        self.id = guildid
+        self.members = {m.id: m for m in members}
+        self.fetches = 0
+
+    def get_member(self, userid):
+        return self.members.get(userid)
+
+    async def fetch_member(self, userid):
+        self.fetches += 1
+        return FakeMember(userid)
+
+
+class FakeBot:
+    def __init__(self, guilds):
+        self.guilds = {g.id: g for g in guilds}
+
+    def get_guild(self, guildid):
+        return self.guilds.get(guildid)
+
+    async def fetch_guild(self, guildid):
+        raise AssertionError("guild should have come from the cache")
+
+
+@pytest.fixture(autouse = True)
+def nannies(tmp_path, monkeypatch):
+    monkeypatch.setattr(conf, "naptimepath", tmp_path / "naps.json")
+    monkeypatch.setattr(persistence, "_documents", {})
+    monkeypatch.setattr(naps, "_activeNannies", {})
+    monkeypatch.setattr(naps, "scheduler", Scheduler())
+
+
+def test_same_user_in_two_guilds():
+    naps._activate(naps.Nanny(1, 100, 10))
+    naps._activate(naps.Nanny(1, 200, 20))
+    assert len(naps._activeNannies) == 2
+    assert naps.stop(1, 100).guildid == 100
+    assert list(naps._activeNannies) == [(200, 1)]
+
+
+def test_wake_batches_and_uses_cache():
+    awake = FakeMember(1)
+    asleep = FakeMember(2, invoice = False)
+    guild = FakeGuild(100, [awake, asleep])
+    bot = FakeBot([guild])
+    naps._activate(naps.Nanny(1, 100, "9.5"))
+    naps._activate(naps.Nanny(2, 100, "9.9"))
+    naps._activate(naps.Nanny(3, 100, "9.1"))
+    naps._activate(naps.Nanny(4, 100, "30"))
+
+    assert [j.key for j in naps.scheduler.jobs("nap")] == [10, 30]
+
+    asyncio.run(naps.wake(bot, 10))
+    assert awake.moved
+    assert not asleep.moved
+    # Only the uncached member needed a fetch
+    assert guild.fetches == 1
+    assert list(naps._activeNannies) == [(100, 4)]
@@ -0,0 +1,47 @@
+import asyncio
+
+from sizebot.lib import persistence
+
+
+def test_document_default(tmp_path):
+    doc = persistence.Document(tmp_path / "missing.json", list)
+    assert doc.get() == []
+
+
+def test_document_bad_file(tmp_path):
+    path = tmp_path / "bad.json"
+    path.write_text("{not json")
+    doc = persistence.Document(path)
+    assert doc.get() == {}
+
+
+def test_document_sync_save(tmp_path):
+    path = tmp_path / "sub" / "data.json"
+    doc = persistence.Document(path)
+    doc.update(lambda d: {**d, "a": 1})
+    assert persistence.Document(path).get() == {"a": 1}
+    assert [p.name for p in path.parent.iterdir()] == ["data.json"]
+
+
+def test_document_async_coalesces(tmp_path, monkeypatch):
+    path = tmp_path / "count.txt"
+    writes = []
+    atomicWrite = persistence.atomicWrite
+
+    def countingWrite(path, text):
+        writes.append(text)
+        atomicWrite(path, text)
+    monkeypatch.setattr(persistence, "atomicWrite", countingWrite)
+
+    doc = persistence.Document(path, int, loads = int, dumps = str)
+    doc.delay = 0
+
+    async def run():
+        for _ in range(10):
+            doc.update(lambda n: n + 1)
+        assert not path.exists()
+        await doc._task
+
+    asyncio.run(run())
+    assert writes == ["10"]
+    assert path.read_text() == "10"
@@ -3,7 +3,7 @@ import asyncio
 from decimal import Decimal
 
 from sizebot.lib import units
-from sizebot.lib.proportions import formatShoeSize, fromShoeSize
+from sizebot.lib.proportions import PersonStats, formatShoeSize, fromShoeSize
 from sizebot.lib.units import SV, WV, TV, Mult, Rate
 
 asyncio.run(units.init())
@@ -181,3 +181,18 @@ def test_reverse_shoesize_calc():
     shoesize = formatShoeSize(insize)
     outsize = fromShoeSize(shoesize)
     assert insize == outsize
+
+
+def test_dimensions_are_hashable_and_cache_by_type():
+    assert SV.intern("1.754") is SV.intern("1.754")
+    height = SV("2")
+    assert SV(height) is height
+    assert type(SV(WV("2"))) is SV
+    assert f"{SV('1000'):m}" == "1km"
+    assert f"{WV('1000'):m}" == "1kg"
+    assert f"{SV('1000'):m}" == "1km"
+    assert len({SV("1"), SV("1.0")}) == 1
+
+
+def test_personstats_factors_are_interned():
+    assert PersonStats.footfactor is type(PersonStats.footfactor).intern(1 / Decimal("7"))
@@ -0,0 +1,75 @@
+import asyncio
+
+import pytest
+
+from sizebot import conf
+from sizebot.lib import persistence
+from sizebot.lib.reactions import ReactionRouter
+from sizebot.lib.scheduler import Scheduler
+
+
+class FakeUser:
+    def __init__(self, userid, bot = False):
+        self.id = userid
+        self.bot = bot
+
+
+class FakeMessage:
+    def __init__(self, messageid):
+        self.id = messageid
+        self.reactions = []
+
+    async def add_reaction(self, emoji):
+        self.reactions.append(emoji)
+
+
+class FakeReaction:
+    def __init__(self, message, emoji):
+        self.message = message
+        self.emoji = emoji
+
+
+@pytest.fixture
+def router(tmp_path, monkeypatch):
+    monkeypatch.setattr(conf, "schedulepath", tmp_path / "schedule.json")
+    monkeypatch.setattr(persistence, "_documents", {})
+    return ReactionRouter(Scheduler())
+
+
+def test_routes_by_message(router):
+    owner = FakeUser(1)
+    first, second = FakeMessage(100), FakeMessage(200)
+
+    async def run():
+        async with router.listen(first, ["👍"], user = owner) as a, router.listen(second, ["👎"]) as b:
+            await asyncio.sleep(0)
+            await router.on_reaction_add(FakeReaction(first, "👎"), owner)
+            await router.on_reaction_add(FakeReaction(first, "👍"), FakeUser(2))
+            await router.on_reaction_add(FakeReaction(second, "👎"), FakeUser(3, bot = True))
+            await router.on_reaction_add(FakeReaction(first, "👍"), owner)
+            await router.on_reaction_add(FakeReaction(second, "👎"), FakeUser(2))
+            reaction, user = await a.get()
+            assert (reaction.message.id, user.id) == (100, 1)
+            reaction, user = await b.get()
+            assert (reaction.message.id, user.id) == (200, 2)
+        assert router._waiters == {}
+
+    asyncio.run(run())
+    assert first.reactions == ["👍"]
+    assert second.reactions == ["👎"]
+
+
+def test_timeout(router):
+    message = FakeMessage(100)
+
+    async def run():
+        # The router starts the scheduler if nothing else has
+        assert not router.scheduler.running
+        async with router.listen(message, ["👍"], timeout = 0.01) as waiter:
+            with pytest.raises(asyncio.TimeoutError):
+                await waiter.get()
+        assert router.scheduler.running
+        router.scheduler.stop()
+
+    asyncio.run(run())
+    assert router.scheduler.depth == 0
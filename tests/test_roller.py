@@ -0,0 +1,97 @@
+import pytest
+
+from sizebot.lib import errors, roller
+
+
+def test_parse_keep():
+    rollarg = roller.RollArg.parse("5d4k2")
+    assert (rollarg.rolls, rollarg.sides, rollarg.drop) == (5, 4, 3)
+
+
+def test_drop_lowest_in_order():
+    result = roller.RollArg(1000, 6, 990).roll()
+    assert len(result.used) == 10
+    assert len(result.dropped) == 990
+    assert result.used.min() >= result.dropped.max()
+    assert result.total == result.used.sum()
+
+
+def test_keep_all():
+    result = roller.RollArg(10, 1).roll()
+    assert result.used.tolist() == [1] * 10
+    assert len(result.dropped) == 0
+
+
+def test_roll_expression():
+    result = roller.roll("2d1+3d1k1*2")
+    assert result.total == 4
+    assert [r.total for r in result.rolls] == [2, 1]
+
+
+def test_huge_sides_total():
+    result = roller.RollArg(3, roller.MAX_SIDES).roll()
+    assert result.total == sum(result.used.tolist())
+
+
+def test_too_many_dice():
+    with pytest.raises(errors.TooManyDiceException):
+        roller.roll("1000000d6+1d6")
+
+
+def test_str_caps_shown_dice():
+    result = roller.roll("100000d6k10")
+    output = str(result)
+    assert len(output) < 1000
+    assert f"...and {100000 - 10 - roller.MAX_SHOWN_DICE:,} more" in output
+
+
+def test_zero_sides():
+    with pytest.raises(errors.InvalidRollException):
+        roller.roll("1d0")
+
+
+def test_distribution_3d6():
+    dist = roller.distribution("3d6")
+    assert (dist.min, dist.max) == (3, 18)
+    assert dist.probability(10) == pytest.approx(27 / 216)
+    assert dist.mean == pytest.approx(10.5)
+    assert dist.percentile(0.5) == 10
+
+
+def test_distribution_keep_highest():
+    dist = roller.distribution("4d6k3")
+    assert dist.mean == pytest.approx(15869 / 1296)
+    assert dist.probability(18) == pytest.approx(21 / 1296)
+    assert dist.probability(3) == pytest.approx(1 / 1296)
+
+
+def test_distribution_expression():
+    dist = roller.distribution("1d6 - 1d6 + 10")
+    assert (dist.min, dist.max) == (5, 15)
+    assert dist.probability(10) == pytest.approx(1 / 6)
+    assert dist.atLeast(5) == pytest.approx(1)
+
+
+def test_distribution_large_uses_fft():
+    dist = roller.distribution("2000d100")
+    assert dist.mean == pytest.approx(2000 * 50.5)
+    assert dist.pmf.sum() == pytest.approx(1)
+
+
+def test_distribution_unsupported():
+    with pytest.raises(errors.UnsupportedRollDistributionException):
+        roller.distribution("2d6*2")
+
+
+def test_distribution_keep_highest_too_expensive():
+    with pytest.raises(errors.UnsupportedRollDistributionException):
+        roller.distribution("2000d500k1000")
+
+
+def test_distribution_out_of_memory(monkeypatch):
+    def outOfMemory(rolls, sides, keep):
+        raise MemoryError
+    monkeypatch.setattr(roller, "_keepHighestPMF", outOfMemory)
+    roller.termDistribution.cache_clear()
+    with pytest.raises(errors.UnsupportedRollDistributionException):
+        roller.distribution("5d7k2")
@@ -0,0 +1,147 @@
+import asyncio
+import time
+
+import pytest
+
+from sizebot import conf
+from sizebot.lib import persistence
+from sizebot.lib.scheduler import Scheduler
+
+
+class FakeClock:
+    def __init__(self, now = 1000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+@pytest.fixture
+def scheduler(tmp_path, monkeypatch, clock):
+    monkeypatch.setattr(conf, "schedulepath", tmp_path / "schedule.json")
+    monkeypatch.setattr(persistence, "_documents", {})
+    return Scheduler(clock = clock)
+
+
+async def settle():
+    """Let the scheduler loop and the jobs it started run, without any real waiting"""
+    for _ in range(20):
+        await asyncio.sleep(0)
+
+
+async def advance(scheduler, clock, seconds):
+    clock.now += seconds
+    scheduler._wake()
+    await settle()
+
+
+def test_runs_in_deadline_order(scheduler, clock):
+    ran = []
+
+    async def handler(job):
+        ran.append(job.key)
+
+    async def run():
+        scheduler.register("test", handler)
+        scheduler.schedule("test", "c", clock.now + 3)
+        scheduler.schedule("test", "a", clock.now + 1)
+        scheduler.schedule("test", "b", clock.now + 2)
+        scheduler.schedule("test", "cancelled", clock.now + 1)
+        scheduler.cancel("test", "cancelled")
+        scheduler.start()
+        await settle()
+        assert ran == []
+        await advance(scheduler, clock, 1)
+        assert ran == ["a"]
+        await advance(scheduler, clock, 5)
+        scheduler.stop()
+
+    asyncio.run(run())
+    assert ran == ["a", "b", "c"]
+    assert scheduler.depth == 0
+    assert scheduler.lateness.count == 3
+    assert scheduler.lateness.max == 4
+
+
+def test_interval_and_return_values(scheduler, clock):
+    ticks = []
+
+    async def handler(job):
+        ticks.append(job.key)
+        if len(ticks) == 3:
+            return False
+
+    async def run():
+        scheduler.register("tick", handler)
+        scheduler.schedule("tick", 1, clock.now, interval = 10)
+        scheduler.start()
+        await settle()
+        assert ticks == [1]
+        await advance(scheduler, clock, 5)
+        assert ticks == [1]
+        for _ in range(4):
+            await advance(scheduler, clock, 5)
+        scheduler.stop()
+
+    asyncio.run(run())
+    assert ticks == [1, 1, 1]
+    assert scheduler.get("tick", 1) is None
+
+
+def test_orphans_wait_for_handler(scheduler, clock):
+    ran = []
+
+    async def handler(job):
+        ran.append(job.key)
+
+    async def run():
+        scheduler.schedule("later", "x", clock.now)
+        scheduler.start()
+        await settle()
+        assert ran == []
+        scheduler.register("later", handler)
+        await settle()
+        scheduler.stop()
+
+    asyncio.run(run())
+    assert ran == ["x"]
+
+
+def test_reruns_dont_rewrite_saved_jobs(scheduler, clock, monkeypatch):
+    saves = []
+    monkeypatch.setattr(scheduler, "_save", lambda: saves.append(clock.now))
+
+    async def handler(job):
+        if clock.now >= 1003:
+            return False
+
+    async def run():
+        scheduler.register("runner", handler)
+        scheduler.schedule("runner", 1, clock.now, interval = 1, data = {"a": 1})
+        scheduler.start()
+        for _ in range(5):
+            await advance(scheduler, clock, 1)
+        scheduler.stop()
+
+    asyncio.run(run())
+    # Once when it was scheduled, and once when it finished
+    assert saves == [1000, 1003]
+
+
+def test_jobs_with_data_survive_restart(scheduler):
+    scheduler.schedule("saved", (1, 2), time.time() + 60, data = {"a": 1})
+    scheduler.schedule("unsaved", 3, time.time() + 60)
+
+    restarted = Scheduler()
+
+    async def run():
+        restarted.start()
+        restarted.stop()
+
+    asyncio.run(run())
+    assert [(j.kind, j.key, j.data) for j in restarted.jobs()] == [("saved", (1, 2), {"a": 1})]
@@ -0,0 +1,46 @@
+import random
+import time
+
+from sizebot.lib.sizetag import parseSizeTag, re_sizetag
+
+
+def test_parse_components():
+    tag = parseSizeTag("[DigiDuncan] [5'8\", Cat Person]")
+    assert (tag.name, tag.size, tag.species) == ("[DigiDuncan]", "5'8\"", "Cat Person")
+
+
+def test_parse_no_species():
+    tag = parseSizeTag("DigiDuncan [1,000.1Yuni]")
+    assert (tag.name, tag.size, tag.species) == ("DigiDuncan", "1,000.1Yuni", None)
+
+
+def test_parse_last_tag_wins():
+    tag = parseSizeTag("Bob [1m, cat] [2m]")
+    assert (tag.name, tag.size) == ("Bob [1m, cat]", "2m")
+
+
+def test_parse_brackets_in_species():
+    tag = parseSizeTag("Bob [1m, cat [big]]")
+    assert (tag.name, tag.size, tag.species) == ("Bob", "1m", "cat [big]")
+
+
+def test_parse_invalid():
+    assert parseSizeTag("DigiDuncan[1m]") is None
+    assert parseSizeTag("DigiDuncan [1m,]") is None
+    assert parseSizeTag("DigiDuncan [1m] ") is None
+
+
+def test_matches_old_regex():
+    rng = random.Random(42)
+    pieces = ["1", "23", "1,000", ",", ".5", ".", "½", "e5", "E-3", "E", "0", "∞", "m", "km", "Yuni", "µm", "'", '"',
+              "nuggets", " ", "[", "]", ", x", "\n", "Name"]
+    for _ in range(5000):
+        nick = "".join(rng.choice(pieces) for _ in range(rng.randint(0, 10)))
+        assert (parseSizeTag(nick) is not None) == (re_sizetag.search(nick) is not None), nick
+
+
+def test_no_backtracking():
+    nick = " " * 20000 + "[1m" + " " * 20000 + "]"
+    start = time.perf_counter()
+    assert parseSizeTag(nick) is None
+    assert time.perf_counter() - start < 0.5
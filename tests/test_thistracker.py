@@ -0,0 +1,50 @@
+from datetime import datetime
+
+from sizebot.cogs.thistracker import Leaderboard, ThisTracker
+
+
+def test_leaderboard_top():
+    board = Leaderboard({1: 5, 2: 3})
+    board.incrementPoints(2)
+    board.incrementPoints(2)
+    board.incrementPoints(2)
+    board.incrementPoints(3)
+    assert board.top(2) == [(2, 6), (1, 5)]
+    assert board.total == 12
+
+
+def test_tracker_partitions():
+    tracker = ThisTracker()
+    when = datetime(2020, 6, 15)
+    tracker.incrementPoints(1, 100, when)
+    tracker.incrementPoints(1, 200, when)
+    tracker.incrementPoints(2, 100, when)
+    assert tracker.getBoard().points == {1: 2, 2: 1}
+    assert tracker.getBoard("all", 100).points == {1: 1, 2: 1}
+    assert tracker.getBoard("2020-W25", 200).points == {1: 1}
+    assert tracker.getBoard("2020-06").points == {1: 2, 2: 1}
+    assert tracker.getBoard("2020-07").points == {}
+
+
+def test_tracker_prunes_old_weeks():
+    tracker = ThisTracker()
+    for day in range(1, 29, 7):
+        tracker.incrementPoints(1, None, datetime(2020, 6, day))
+    tracker.incrementPoints(1, None, datetime(2020, 7, 1))
+    weeks = {p for p, _ in tracker.boards if "W" in p}
+    assert len(weeks) == ThisTracker.keepweeks
+    assert "2020-W23" not in weeks
+    assert tracker.points == {1: 5}
+
+
+def test_tracker_json_roundtrip():
+    tracker = ThisTracker()
+    tracker.incrementPoints(1, 100, datetime(2020, 6, 15))
+    loaded = ThisTracker.fromJSON(tracker.toJSON())
+    assert loaded.boards.keys() == tracker.boards.keys()
+    assert loaded.getBoard("2020-W25", 100).points == {1: 1}
+
+
+def test_tracker_old_format():
+    tracker = ThisTracker.fromJSON({"points": {"1": 4, "2": 7}})
+    assert tracker.getBoard().top(10) == [(2, 7), (1, 4)]
@@ -0,0 +1,134 @@
+import asyncio
+import json
+
+import pytest
+
+from sizebot import conf
+from sizebot.lib import errors, userdb
+
+
+@pytest.fixture(autouse = True)
+def guilddb(tmp_path, monkeypatch):
+    monkeypatch.setattr(conf, "guilddbpath", tmp_path)
+    monkeypatch.setattr(userdb, "_index", None)
+
+
+def saveUser(guildid, userid):
+    userdata = userdb.User()
+    userdata.guildid = guildid
+    userdata.id = userid
+    userdata.nickname = "Test"
+    userdb.save(userdata)
+
+
+def test_index_tracks_saves_and_deletes():
+    saveUser(1, 10)
+    saveUser(1, 11)
+    saveUser(2, 10)
+    assert userdb.exists(1, 11)
+    assert userdb.count() == 3
+    assert userdb.listGuilds(10) == [1, 2]
+    assert sorted(userdb.listUsers(1)) == [(1, 10), (1, 11)]
+    assert userdb.listUsers(3) == []
+
+    userdb.delete(1, 10)
+    assert not userdb.exists(1, 10)
+    assert userdb.listGuilds(10) == [2]
+    assert sorted(userdb.listUsers()) == [(1, 11), (2, 10)]
+
+
+def test_index_rebuilds_from_disk():
+    saveUser(1, 10)
+    saveUser(2, 20)
+    userdb.rebuildIndex()
+    assert sorted(userdb.listUsers()) == [(1, 10), (2, 20)]
+    assert userdb.isRegistered(2, 20)
+    assert not userdb.isRegistered(2, 10)
+
+
+def makeUser():
+    userdata = userdb.User()
+    userdata.guildid = 350429009730994199
+    userdata.id = 271803699095928832
+    userdata.nickname = "Digi ✨"
+    userdata.gender = "f"
+    userdata.display = False
+    userdata.height = "0.0254"
+    userdata.baseheight = "1.8"
+    userdata.baseweight = "70000"
+    userdata.hairlength = "0.5"
+    userdata.unitsystem = "u"
+    userdata.species = "Cat"
+    return userdata
+
+
+def test_record_roundtrip():
+    userdata = makeUser()
+    record = userdata.toBytes()
+    assert userdb.User.fromBytes(record).toJSON() == userdata.toJSON()
+    assert userdb.User.fromBytes(record, validate = True).toJSON() == userdata.toJSON()
+    assert len(record) < len(json.dumps(userdata.toJSON()))
+
+
+def test_record_validation():
+    record = makeUser().toBytes()
+    bad = [b"XXXX" + record[4:], record[:4] + b"\x02" + record[5:], record[:-1], record + b"\x00", record[:10], b""]
+    for data in bad:
+        for validate in [False, True]:
+            with pytest.raises(errors.InvalidUserRecordException):
+                userdb.User.fromBytes(data, validate = validate)
+
+
+def test_json_is_the_default_format():
+    userdata = makeUser()
+    userdb.save(userdata)
+    assert userdb.getJSONUserPath(userdata.guildid, userdata.id).exists()
+    assert not userdb.getUserPath(userdata.guildid, userdata.id).exists()
+    assert userdb.load(userdata.guildid, userdata.id).toJSON() == userdata.toJSON()
+
+
+def test_binary_keeps_json_backup(monkeypatch):
+    userdata = makeUser()
+    jsonpath = userdb.getJSONUserPath(userdata.guildid, userdata.id)
+    binarypath = userdb.getUserPath(userdata.guildid, userdata.id)
+    userdb.save(userdata)
+    backup = jsonpath.read_text()
+
+    monkeypatch.setattr(conf, "binaryusers", True)
+    userdata.nickname = "Changed"
+    userdb.save(userdata)
+    assert jsonpath.read_text() == backup
+    assert userdb.load(userdata.guildid, userdata.id).nickname == "Changed"
+    assert userdb.count() == 1
+
+    # A corrupt binary file falls back to the JSON backup
+    binarypath.write_bytes(binarypath.read_bytes()[:-3])
+    assert userdb.load(userdata.guildid, userdata.id).nickname == "Digi ✨"
+
+    # Turning the binary format off again saves the newest data back as JSON
+    binarypath.write_bytes(userdata.toBytes())
+    monkeypatch.setattr(conf, "binaryusers", False)
+    userdb.save(userdb.load(userdata.guildid, userdata.id))
+    assert not binarypath.exists()
+    assert userdb.load(userdata.guildid, userdata.id).nickname == "Changed"
+
+
+def test_load_many_skips_bad_records(monkeypatch):
+    monkeypatch.setattr(userdb, "LOAD_BATCH_SIZE", 2)
+    monkeypatch.setattr(conf, "binaryusers", True)
+    for userid in range(10, 15):
+        saveUser(1, userid)
+    saveUser(2, 20)
+    userdb.getUserPath(1, 12).write_bytes(b"garbage")
+
+    async def run():
+        failures = []
+        users = [u async for u in userdb.iterGuild(1, failures = failures)]
+        missing = [u async for u in userdb.loadMany(1, [99])]
+        return users, failures, missing
+
+    users, failures, missing = asyncio.run(run())
+    assert sorted(u.id for u in users) == [10, 11, 13, 14]
+    assert [userid for userid, _ in failures] == [12]
+    assert isinstance(failures[0][1], errors.InvalidUserRecordException)
+    assert missing == []
@@ -0,0 +1,66 @@
+import asyncio
+
+from aiohttp import web
+
+from sizebot.lib.webclient import TTLCache, WebClient
+
+
+def test_ttlcache_lru():
+    cache = TTLCache(maxsize = 2)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    cache.get("a")
+    cache.put("c", 3)
+    assert cache.get("a") == 1
+    assert cache.get("b") is None
+    assert cache.get("c") == 3
+
+
+def test_ttlcache_expiry():
+    cache = TTLCache()
+    cache.put("a", 1, ttl = -1)
+    assert cache.get("a") is None
+    assert len(cache) == 0
+
+
+async def startStubServer(hits):
+    async def handle(request):
+        hits.append(request.path)
+        await asyncio.sleep(0.05)
+        if request.path == "/missing":
+            return web.Response(status = 404)
+        return web.json_response({"path": request.path})
+
+    app = web.Application()
+    app.router.add_get("/{tail:.*}", handle)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+    return runner, f"http://127.0.0.1:{port}"
+
+
+def test_webclient_caches_and_coalesces():
+    hits = []
+
+    async def run():
+        runner, base = await startStubServer(hits)
+        client = WebClient()
+        try:
+            first, second = await asyncio.gather(client.getJSON(base + "/a"), client.getJSON(base + "/a"))
+            third = await client.getJSON(base + "/a")
+            missing = await client.get(base + "/missing")
+            await client.get(base + "/missing")
+            uncached = await client.get(base + "/a", cache = False)
+        finally:
+            await client.close()
+            await runner.cleanup()
+        return first, second, third, missing, uncached
+
+    first, second, third, missing, uncached = asyncio.run(run())
+    assert first == second == third == {"path": "/a"}
+    assert missing.status == 404
+    assert uncached.ok
+    # One request for the three cached /a's, two for the uncacheable 404s, and one uncached
+    assert hits == ["/a", "/missing", "/missing", "/a"]